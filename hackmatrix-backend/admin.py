@@ -6,7 +6,7 @@ from datetime import datetime
 from pydantic import BaseModel
 
 from database import get_db
-from models import Article, User, Report, Comment, AuditLog, Rating
+from models import Article, User, Report, Comment, AuditLog, Rating, Feed
 from auth import get_current_user
 from schemas import ArticleListResponse, ReportResponse
 
@@ -32,6 +32,12 @@ class SoftLockRequest(BaseModel):
 class FlagUserRequest(BaseModel):
     reason: str
 
+class FeedCreateRequest(BaseModel):
+    name: str
+    url: str
+    category: str = "General"
+    poll_interval: float = 300.0
+
 # --- Routes ---
 
 @router.get("/dashboard")
@@ -87,6 +93,7 @@ def override_score(
     old_score = article.overall_credibility
     article.overall_credibility = payload.new_score
     article.nlp_score = payload.new_score # Simplification for override
+    article.analysis_version = None  # next rescore recomputes the text analysis
     
     # Log the action
     audit = AuditLog(
@@ -99,6 +106,142 @@ def override_score(
     db.commit()
     return {"message": "Score updated successfully"}
 
+@router.post("/articles/rescore")
+def rescore_articles(
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_current_admin)
+):
+    """
+    Queue every article for rescoring and return; the rescore queue scores
+    them in batches in the background. Offline: python rescoring.py
+    """
+    from rescoring import rescore_queue
+    if not rescore_queue.stats()["running"]:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Rescore queue is not running; run `python rescoring.py` instead"
+        )
+    # Flag them durably first, so a restart resumes the rescore (rescoring.recover)
+    db.query(Article).update(
+        {Article.rescore_pending: func.coalesce(Article.rescore_pending, 0) + 1},
+        synchronize_session=False
+    )
+    db.commit()
+    article_ids = [article_id for article_id, in db.query(Article.id).order_by(Article.id)]
+    rescore_queue.mark_many(article_ids)
+    return {"status": "Queued", "articles": len(article_ids)}
+
+@router.post("/community/reconcile")
+def reconcile_community_scores(
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_current_admin)
+):
+    """Rebuild every article's community aggregates from the ratings (e.g. after credibility tiers change)"""
+    import community
+    from rescoring import rescore_queue, rescore_articles as rescore_now
+    started = datetime.utcnow()
+    changed = community.reconcile(db)
+    # Rescore the articles whose community score moved
+    if changed and not all(rescore_queue.mark(article_id) for article_id in changed):
+        rescore_now(changed)
+    return {
+        "status": "Reconciled",
+        "articles_changed": len(changed),
+        "elapsed_s": round((datetime.utcnow() - started).total_seconds(), 3)
+    }
+
+@router.post("/users/recompute-credibility")
+def recompute_all_user_credibility(
+    chunk_size: int = 1000,
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_current_admin)
+):
+    """Recompute every user's credibility from rating accuracy, in bulk, a chunk of users per transaction"""
+    import user_credibility
+    from rescoring import rescore_queue, rescore_articles as rescore_now
+    started = datetime.utcnow()
+    result = user_credibility.recompute_all(db, max(1, min(chunk_size, 10000)))
+    # Rescore the articles whose community score moved with the users' tiers
+    moved = result.pop("articles_moved")
+    if moved and not all(rescore_queue.mark(article_id) for article_id in moved):
+        rescore_now(moved)
+    return {
+        "status": "Recomputed",
+        **result,
+        "articles_moved": len(moved),
+        "elapsed_s": round((datetime.utcnow() - started).total_seconds(), 3)
+    }
+
+@router.post("/manipulation/sweep")
+def sweep_manipulation(
+    apply: bool = False,
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_current_admin)
+):
+    """Check every article's ratings for manipulation in one vectorized pass; with apply, soft-lock the flagged ones"""
+    import rating_analytics
+    from sqlalchemy import update
+    from source_registry import LOOKUP_CHUNK, chunked
+    started = datetime.utcnow()
+    columns = rating_analytics.load(db)
+    signals = rating_analytics.manipulation_signals(columns, started)
+    flagged = columns.article_ids[rating_analytics.suspicious(signals)].tolist()
+    
+    locked = 0
+    if apply:
+        for chunk in chunked(flagged, LOOKUP_CHUNK):
+            locked += db.execute(
+                update(Article)
+                .where(Article.id.in_(chunk), Article.is_soft_locked.isnot(True))
+                .values(
+                    is_soft_locked=True,
+                    suspicious_activity_detected=True,
+                    soft_lock_reason="Automatic soft-lock: Suspicious activity detected (voting pattern anomaly)"
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        db.commit()
+    return {
+        "status": "Swept",
+        "articles_checked": len(columns.article_ids),
+        "ratings_checked": len(columns.values),
+        "flagged": len(flagged),
+        "by_signal": {name: int(mask.sum()) for name, mask in signals.items()},
+        "soft_locked": locked,
+        "article_ids": flagged,
+        "elapsed_s": round((datetime.utcnow() - started).total_seconds(), 3)
+    }
+
+@router.get("/{article_id}/rating-audit")
+def audit_article_ratings(
+    article_id: int,
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_current_admin)
+):
+    """Rating distribution and manipulation signals of one article, from a full pass over its ratings"""
+    import rating_analytics
+    if not db.query(Article.id).filter(Article.id == article_id).first():
+        raise HTTPException(status_code=404, detail="Article not found")
+    
+    now = datetime.utcnow()
+    columns = rating_analytics.load(db, [article_id])
+    i = columns.index(article_id)
+    if i is None:
+        return {"article_id": article_id, "total_ratings": 0, "signals": []}
+    
+    signals = rating_analytics.manipulation_signals(columns, now)
+    count = int(columns.counts[i])
+    return {
+        "article_id": article_id,
+        "total_ratings": count,
+        "average_rating": round(float(columns.per_article(columns.values)[i]) / count, 2),
+        "variance": round(float(rating_analytics.variance(columns)[i]), 2),
+        "extreme_share": round(float(rating_analytics.extreme_share(columns)[i]), 3),
+        "top_ip_share": round(int(rating_analytics.top_ip_count(columns)[i]) / count, 3),
+        "hourly_ratings_24h": rating_analytics.time_histogram(columns, now)[i].tolist(),
+        "signals": [name for name, mask in signals.items() if mask[i]]
+    }
+
 @router.post("/{article_id}/soft-lock")
 def soft_lock_article(
     article_id: int, 
@@ -171,3 +314,61 @@ def unflag_user(
     user.is_flagged = False
     db.commit()
     return {"message": "User unflagged"}
+
+@router.get("/feeds/health")
+def get_feed_health(db: Session = Depends(get_db), admin: User = Depends(get_current_admin)):
+    """Per-feed schedule, latency and error stats"""
+    from feed_registry import feed_health
+    return feed_health(db)
+
+@router.get("/outbound/metrics")
+def get_outbound_metrics(admin: User = Depends(get_current_admin)):
+    """Per-host circuit breaker state, concurrency and latency of outbound fetches"""
+    import outbound
+    return outbound.metrics()
+
+@router.get("/extraction/stats")
+def get_extraction_stats(admin: User = Depends(get_current_admin)):
+    """Content extraction queue and on-disk cache stats"""
+    from extraction import extraction_queue
+    return extraction_queue.stats()
+
+@router.get("/rescoring/stats")
+def get_rescoring_stats(admin: User = Depends(get_current_admin)):
+    """Debounced rescoring queue: dirty articles and how many votes were coalesced"""
+    from rescoring import rescore_queue
+    return rescore_queue.stats()
+
+@router.post("/feeds")
+def add_feed(
+    payload: FeedCreateRequest,
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_current_admin)
+):
+    """Register a new RSS/Atom feed (picked up by the poller on its next pass)"""
+    from source_registry import resolve_sources
+    if db.query(Feed).filter(Feed.url == payload.url).first():
+        raise HTTPException(status_code=400, detail="Feed URL already registered")
+    
+    source = resolve_sources(db, [payload.name])[payload.name]
+    feed = Feed(
+        name=payload.name,
+        url=payload.url,
+        category=payload.category,
+        source_id=source.id,
+        poll_interval=payload.poll_interval
+    )
+    db.add(feed)
+    db.commit()
+    return {"message": "Feed added", "feed_id": feed.id}
+
+@router.post("/feeds/{feed_id}/toggle")
+def toggle_feed(feed_id: int, db: Session = Depends(get_db), admin: User = Depends(get_current_admin)):
+    """Enable or disable polling for a feed"""
+    feed = db.query(Feed).filter(Feed.id == feed_id).first()
+    if not feed:
+        raise HTTPException(status_code=404, detail="Feed not found")
+    
+    feed.is_active = not feed.is_active
+    db.commit()
+    return {"message": "Feed enabled" if feed.is_active else "Feed disabled"}
@@ -1,14 +1,26 @@
 """Article management routes"""
 from fastapi import APIRouter, Depends, HTTPException, status, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from datetime import datetime
+import asyncio
 
 from database import get_db
 from models import Article, Source, Rating, Comment, User, AuditLog, Claim, CommentVote
-from schemas import ArticleCreate, ArticleResponse, ArticleDetailResponse, RatingCreate, CommentCreate, ReportCreate, CommentResponse
+from schemas import ArticleCreate, ArticleResponse, ArticleDetailResponse, RatingCreate, CommentCreate, ReportCreate, CommentResponse, ArticleBatchCreate, ArticleBatchResult
 from auth import get_current_user
-from credibility_engine import CredibilityScoreManager, demo_article_scores
+from credibility_engine import CredibilityEngine, CredibilityScoreManager, demo_article_scores
+from source_registry import resolve_sources, chunked, LOOKUP_CHUNK
+from url_index import seen_urls, url_hash
+from story_clusters import assign_clusters
+from extraction import extraction_queue, PENDING, PROCESSING, COMPLETE, MAX_WAIT_SECONDS
+from rescoring import rescore_queue
+import community
+import rating_stats
+import rating_analytics
 
 router = APIRouter()
 
@@ -190,24 +202,6 @@ def get_articles(
 
 
 
-import requests
-from bs4 import BeautifulSoup
-
-def extract_content_from_url(url: str) -> str:
-    try:
-        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            # Rudimentary text extraction: get all paragraphs
-            paragraphs = soup.find_all('p')
-            text = " ".join([p.get_text() for p in paragraphs])
-            return text
-        return ""
-    except Exception as e:
-        print(f"Extraction failed: {e}")
-        return ""
-
 @router.post("/", response_model=ArticleResponse)
 def create_article(
     article: ArticleCreate,
@@ -215,8 +209,8 @@ def create_article(
     token: Optional[str] = Depends(get_token_from_header)
 ):
     """Create a new article"""
-    # Check for duplicates
-    existing = db.query(Article).filter(Article.url == article.url).first()
+    # Check for duplicates (Bloom filter first, then an integer url_hash lookup)
+    existing = seen_urls.find_article(db, article.url)
     if existing:
         return existing
         # PREVIOUSLY:
@@ -226,37 +220,24 @@ def create_article(
         # )
     
     # Get or create source
-    source = db.query(Source).filter(Source.name == article.source_name).first()
-    if not source:
-        source = Source(
-            name=article.source_name,
-            domain=article.source_name.replace(" ", "").lower() + ".com",
-            url=article.source_name,
-            credibility_score=50.0
-        )
-        db.add(source)
-        db.flush()
+    source = resolve_sources(db, [article.source_name])[article.source_name]
     
-    # Extract content if missing (for RSS feed analysis)
-    final_content = article.content
-    if not final_content and article.url:
-        extracted = extract_content_from_url(article.url)
-        if extracted:
-            final_content = extracted
-        else:
-             # Fallback if extraction fails
-             final_content = "Content could not be extracted automatically. Analysis based on metadata only."
+    # Content missing (RSS feed analysis): fetch it in the background instead
+    # of blocking this request on the publisher
+    needs_extraction = not article.content and bool(article.url)
 
     # Create article
     new_article = Article(
         title=article.title,
-        content=final_content,
+        content=article.content,
         url=article.url,
+        url_hash=url_hash(article.url),
         source_id=source.id,
         source_name=article.source_name,
         published_date=article.published_date,
         is_user_submitted=bool(token),
-        submitted_by_user_id=None
+        submitted_by_user_id=None,
+        extraction_status=PENDING if needs_extraction else COMPLETE
     )
     
     # If user submitted, get user ID
@@ -267,24 +248,201 @@ def create_article(
         except:
             pass  # Fallback if token invalid
     
-    # Generate demo scores (no ML models yet)
-    demo_scores = demo_article_scores()
-    new_article.source_trust_score = demo_scores["source_trust_score"]
-    new_article.nlp_score = demo_scores["nlp_score"]
-    new_article.community_score = demo_scores["community_score"]
-    new_article.cross_source_score = demo_scores["cross_source_score"]
-    new_article.overall_credibility = demo_scores["overall_credibility"]
-    new_article.credibility_status = "Under Review"
+    if needs_extraction:
+        # Placeholder until the extraction worker scores the real text
+        for field, value in demo_article_scores().items():
+            setattr(new_article, field, value)
+        new_article.credibility_status = "Under Review"
     
     db.add(new_article)
-    db.commit()
+    try:
+        db.flush()
+        if not needs_extraction:
+            # Same initial scoring as POST /batch, once the article is linked to its source
+            CredibilityEngine().compute_initial_scores([new_article], db)
+        db.commit()
+    except IntegrityError:
+        # Inserted by another worker/process whose URLs this filter hasn't seen yet
+        db.rollback()
+        existing = db.query(Article).filter(Article.url == article.url).first()
+        if existing:
+            seen_urls.add(article.url)
+            return existing
+        raise
+    db.refresh(new_article)
+    seen_urls.add(article.url)
+    
+    if needs_extraction:
+        # Clustered and scored by the extraction worker once the text is in;
+        # still pending after a restart if the workers are not running
+        if not extraction_queue.enqueue(new_article.id, new_article.url):
+            print(f"Extraction queue not running; article {new_article.id} stays pending")
+        return new_article
+    
+    # Attach to an existing story cluster if another outlet already ran it
+    assign_clusters(db, [(new_article.id, new_article.title, new_article.content)])
     db.refresh(new_article)
     
     return new_article
 
 
+# How often a held request re-reads the row for jobs running on another worker
+EXTRACTION_POLL_SECONDS = 0.5
+
+@router.get("/{article_id}/extraction")
+async def get_extraction_status(article_id: int, wait: float = 0, db: Session = Depends(get_db)):
+    """
+    Content extraction state of an article. With ?wait=N (seconds, max 30)
+    the request is held until a pending extraction finishes.
+    """
+    # Sync session: keep its queries off the event loop
+    article = await run_in_threadpool(db.get, Article, article_id)
+    if not article:
+        raise HTTPException(status_code=404, detail="Article not found")
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + min(max(wait, 0), MAX_WAIT_SECONDS)
+    while article.extraction_status in (PENDING, PROCESSING):
+        interval = min(deadline - loop.time(), EXTRACTION_POLL_SECONDS)
+        if interval <= 0:
+            break
+        # Resolves as soon as the job finishes if this worker runs it; jobs on
+        # other workers are only visible in the row, so poll it
+        started = loop.time()
+        if not await extraction_queue.wait(article_id, interval):
+            await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+        await run_in_threadpool(db.refresh, article)
+    
+    return {
+        "article_id": article.id,
+        "extraction_status": article.extraction_status,
+        "extraction_error": article.extraction_error,
+        "overall_credibility": article.overall_credibility,
+        "credibility_status": article.credibility_status,
+    }
+
+
+
 
 
+MAX_BATCH_SIZE = 500
+BATCH_COMMIT_CHUNK = 100
+
+@router.post("/batch", response_model=List[ArticleBatchResult])
+def create_articles_batch(
+    batch: ArticleBatchCreate,
+    db: Session = Depends(get_db),
+    token: Optional[str] = Depends(get_token_from_header)
+):
+    """
+    Submit many articles at once (e.g. a whole RSS page). Duplicates are found
+    with one set-based lookup, Sources resolved in one pass, articles with
+    content scored in one model call, and rows committed in chunks.
+    Returns one result per submitted item, in order.
+    """
+    items = batch.articles
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} articles per batch")
+    
+    user_id = None
+    if token:
+        try:
+            user_id = get_current_user(token, db).id
+        except:
+            pass  # Fallback if token invalid
+    
+    # First occurrence of each URL wins; repeats point at the same article
+    first_index = {}
+    for i, item in enumerate(items):
+        first_index.setdefault(item.url, i)
+    
+    existing = {}
+    known = list(seen_urls.known_urls(db, first_index))
+    for chunk in chunked(known, LOOKUP_CHUNK):
+        existing.update({a.url: a for a in db.query(Article).filter(Article.url.in_(chunk))})
+    results = {url: _batch_result(article, "existing") for url, article in existing.items()}
+    
+    new_items = [items[i] for url, i in first_index.items() if url not in existing]
+    sources = resolve_sources(db, (item.source_name for item in new_items))
+    db.commit()
+    engine = CredibilityEngine()
+    
+    for chunk in chunked(new_items, BATCH_COMMIT_CHUNK):
+        articles = [_new_batch_article(item, sources[item.source_name], user_id) for item in chunk]
+        scorable = [a for a in articles if a.extraction_status == COMPLETE]
+        
+        db.add_all(articles)
+        try:
+            db.flush()
+        except IntegrityError:
+            # Some URLs were inserted by another worker since the lookup; skip them
+            db.rollback()
+            seen_urls.sync(db)
+            taken = seen_urls.known_urls(db, (a.url for a in articles))
+            for article in db.query(Article).filter(Article.url.in_(list(taken))):
+                results[article.url] = _batch_result(article, "existing")
+            articles = [a for a in articles if a.url not in taken]
+            scorable = [a for a in scorable if a.url not in taken]
+            db.add_all(articles)
+            db.flush()
+        
+        # Scored once flushed, when article.source resolves from source_id
+        engine.compute_initial_scores(scorable, db)
+        
+        # Read ids and scores before the commit expires the objects
+        for article in articles:
+            results[article.url] = _batch_result(article, "created")
+        clusters = [(a.id, a.title, a.content) for a in scorable]
+        pending = [(a.id, a.url) for a in articles if a.extraction_status == PENDING]
+        db.commit()
+        
+        for article in articles:
+            seen_urls.add(article.url)
+        assign_clusters(db, clusters)
+        for article_id, url in pending:
+            if not extraction_queue.enqueue(article_id, url):
+                print(f"Extraction queue not running; article {article_id} stays pending")
+    
+    response = []
+    for i, item in enumerate(items):
+        result = dict(results.get(item.url) or {"status": "error", "error": "Not stored"})
+        if first_index[item.url] != i and result["status"] != "error":
+            result["status"] = "duplicate"
+        response.append(ArticleBatchResult(index=i, url=item.url, **result))
+    return response
+
+
+def _new_batch_article(item: ArticleCreate, source: Source, user_id: Optional[int]) -> Article:
+    needs_extraction = not item.content and bool(item.url)
+    article = Article(
+        title=item.title,
+        content=item.content,
+        url=item.url,
+        url_hash=url_hash(item.url),
+        source_id=source.id,
+        source_name=item.source_name,
+        published_date=item.published_date,
+        is_user_submitted=user_id is not None,
+        submitted_by_user_id=user_id,
+        extraction_status=PENDING if needs_extraction else COMPLETE
+    )
+    if needs_extraction:
+        # Placeholder until the extraction worker scores the real text
+        for field, value in demo_article_scores().items():
+            setattr(article, field, value)
+        article.credibility_status = "Under Review"
+    return article
+
+
+def _batch_result(article: Article, status: str) -> dict:
+    return {
+        "status": status,
+        "article_id": article.id,
+        "overall_credibility": article.overall_credibility,
+        "credibility_status": article.credibility_status,
+        "extraction_status": article.extraction_status,
+    }
+
 
 @router.post("/{article_id}/rate")
 def rate_article(
@@ -319,17 +477,21 @@ def rate_article(
     if existing_rating:
         # Toggle functionality: If clicking same rating, remove it
         if existing_rating.credibility_rating == rating_value:
+            community.remove_rating(db, existing_rating)
+            rating_stats.remove_rating(db, existing_rating, current_user)
             db.delete(existing_rating)
+            _flag_rescore(article)
             db.commit()
             
-            # Recompute article scores
-            score_manager = CredibilityScoreManager(db)
-            score_manager.update_article_scores(article)
+            # Recompute article scores (debounced, off the request path)
+            pending = _schedule_rescore(article, db)
             
-            return {"status": "Rating removed", "new_score": article.overall_credibility}
+            return {"status": "Rating removed", "new_score": article.overall_credibility, "rescore_pending": pending}
             
-        existing_rating.credibility_rating = rating_value
+        old_value, old_ip = existing_rating.credibility_rating, existing_rating.ip_address
+        community.change_rating(db, existing_rating, rating_value, current_user)
         existing_rating.ip_address = client_ip
+        rating_stats.change_rating(db, existing_rating, current_user, old_value, old_ip)
     else:
         new_rating = Rating(
             article_id=article_id,
@@ -339,14 +501,34 @@ def rate_article(
             ip_address=client_ip
         )
         db.add(new_rating)
+        community.add_rating(db, new_rating, current_user)
+        rating_stats.add_rating(db, new_rating, current_user)
     
+    # The rating, the article's community aggregates, its rolling rating state
+    # and its rescore flag commit together
+    _flag_rescore(article)
     db.commit()
     
-    # Recompute article scores
-    score_manager = CredibilityScoreManager(db)
-    score_manager.update_article_scores(article)
+    # Recompute article scores (debounced, off the request path)
+    pending = _schedule_rescore(article, db)
     
-    return {"status": "Rating saved", "new_score": article.overall_credibility}
+    return {"status": "Rating saved", "new_score": article.overall_credibility, "rescore_pending": pending}
+
+
+def _flag_rescore(article: Article):
+    """Count the vote in the article's durable rescore flag (see rescoring.py)"""
+    article.rescore_pending = func.coalesce(Article.rescore_pending, 0) + 1
+
+
+def _schedule_rescore(article: Article, db: Session) -> bool:
+    """
+    Queue the article for the next rescoring window; new_score is then the
+    score before this vote. Without the queue (e.g. scripts), rescore inline.
+    """
+    if rescore_queue.mark(article.id):
+        return True
+    CredibilityScoreManager(db).update_article_scores(article)
+    return False
 
 
 @router.post("/{article_id}/comment")
@@ -431,38 +613,5 @@ def report_article(
 @router.get("/{article_id}/ratings-breakdown")
 def get_ratings_breakdown(article_id: int, db: Session = Depends(get_db)):
     """Get distribution of community ratings"""
-    ratings = db.query(Rating).filter(Rating.article_id == article_id).all()
-    
-    if not ratings:
-        return {
-            "total_ratings": 0,
-            "average_rating": 0,
-            "distribution": {}
-        }
-    
-    # Create bins: 0-20, 20-40, 40-60, 60-80, 80-100
-    distribution = {
-        "very_low": 0,      # 0-25
-        "low": 0,           # 25-50
-        "neutral": 0,       # 50-75
-        "high": 0,          # 75-100
-    }
-    
-    for rating in ratings:
-        score = rating.credibility_rating
-        if score < 25:
-            distribution["very_low"] += 1
-        elif score < 50:
-            distribution["low"] += 1
-        elif score < 75:
-            distribution["neutral"] += 1
-        else:
-            distribution["high"] += 1
-    
-    avg_rating = sum(r.credibility_rating for r in ratings) / len(ratings)
-    
-    return {
-        "total_ratings": len(ratings),
-        "average_rating": round(avg_rating, 2),
-        "distribution": distribution
-    }
+    # Bins: very_low 0-25, low 25-50, neutral 50-75, high 75-100
+    return rating_analytics.breakdown(rating_analytics.rating_values(db, article_id))
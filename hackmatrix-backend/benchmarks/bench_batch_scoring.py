@@ -0,0 +1,101 @@
+"""
+Corpus rescoring: compute_article_score per article vs compute_scores in batches.
+
+    python benchmarks/bench_batch_scoring.py [--articles 400] [--ratings 8] [--chunk 200]
+
+Seeds an in-memory database with articles, users, ratings and claims and
+trains a tiny model, then rescores the corpus both ways, reporting wall
+time, articles/sec and SQL statements issued. Scores must match.
+"""
+import argparse
+import tempfile
+import time
+
+from sqlalchemy import event
+
+from common import make_session, fake_text, train_tiny_model
+
+import credibility_engine
+from credibility_engine import CredibilityEngine
+from ml_models.registry import registry
+from models import Article, Claim, Rating, Source, User
+
+
+def seed(db, n_articles: int, n_ratings: int):
+    sources = [Source(name=f"Source {i}", domain=f"s{i}.example", url=f"https://s{i}.example") for i in range(10)]
+    users = [User(username=f"u{i}", email=f"u{i}@bench.example", password_hash="x",
+                  credibility_score=30 + (i * 7) % 60) for i in range(max(1, n_ratings * 3))]
+    db.add_all(sources + users)
+    db.flush()
+    for i in range(n_articles):
+        source = sources[i % len(sources)]
+        article = Article(
+            title=f"Story {i}", content=fake_text(200, seed=i), url=f"https://bench.example/{i}",
+            source_id=source.id, source_name=source.name, story_cluster_id=i // 3 + 1,
+        )
+        db.add(article)
+        db.flush()
+        for j in range(n_ratings):
+            user = users[(i + j * 3) % len(users)]
+            db.add(Rating(article_id=article.id, user_id=user.id, credibility_rating=(i * 31 + j * 17) % 100,
+                          ip_address=f"10.0.0.{j % 4}"))
+        db.add(Claim(article_id=article.id, claim_text=f"Statistic: {i}%", corroboration_count=i % 5))
+    db.commit()
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def run(label, db, counter, fn):
+    articles = db.query(Article).order_by(Article.id).all()
+    counter.count = 0
+    started = time.perf_counter()
+    scores = fn(articles)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<26} {elapsed * 1000:>9.1f}ms  {len(articles) / elapsed:>8.1f} articles/s  {counter.count:>6} SQL statements")
+    db.rollback()  # discard claims/flags so both runs see the same data
+    return elapsed, scores
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=400)
+    parser.add_argument("--ratings", type=int, default=8)
+    parser.add_argument("--chunk", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path, vectorizer_path = train_tiny_model(tmp)
+        registry.reset()
+        registry.get(model_path, vectorizer_path)
+        credibility_engine.get_inference = lambda: registry.get(model_path, vectorizer_path)
+
+        db = make_session()
+        seed(db, args.articles, args.ratings)
+        counter = QueryCounter(db.get_bind())
+        engine = CredibilityEngine()
+
+        def one_by_one(articles):
+            return [engine.compute_article_score(a, db)[0] for a in articles]
+
+        def batched(articles):
+            scores = []
+            for i in range(0, len(articles), args.chunk):
+                scores.extend(s for s, _, _ in engine.compute_scores(articles[i:i + args.chunk], db))
+            return scores
+
+        before, expected = run("per article", db, counter, one_by_one)
+        after, actual = run(f"compute_scores (chunk {args.chunk})", db, counter, batched)
+
+    assert all(abs(a - b) < 1e-9 for a, b in zip(expected, actual)), "batch scores differ from per-article scores"
+    print(f"speedup: {before / after:.1f}x (scores identical)")
+
+
+if __name__ == "__main__":
+    main()
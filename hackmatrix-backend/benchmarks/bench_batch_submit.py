@@ -0,0 +1,103 @@
+"""
+Article submission: N single POST /api/articles/ calls vs one POST /api/articles/batch.
+
+    python benchmarks/bench_batch_submit.py [--items 300] [--sources 10]
+
+Both run in-process against an in-memory database with a tiny trained
+model loaded in the registry. The single path stores demo scores; the
+batch path additionally runs real NLP scoring for every item, in one call.
+"""
+import argparse
+import tempfile
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from common import make_session, fake_text, train_tiny_model
+
+import credibility_engine
+from articles import router as articles_router
+from database import get_db
+from ml_models.registry import registry
+from story_clusters import story_index
+from url_index import seen_urls
+
+
+def make_client():
+    """App with only the articles router, backed by a fresh in-memory database"""
+    bind = make_session().get_bind()
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=bind)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(articles_router, prefix="/api/articles")
+    app.dependency_overrides[get_db] = override_get_db
+    # Reset the process-local indexes, as after a restart on an empty database
+    db = Session()
+    seen_urls.rebuild(db)
+    story_index.rebuild(db)
+    db.close()
+    return TestClient(app)
+
+
+def make_items(n: int, n_sources: int, prefix: str):
+    return [
+        {
+            "title": f"Benchmark story {i}",
+            "content": fake_text(150, seed=i),
+            "url": f"https://bench.example/{prefix}/{i}",
+            "source_name": f"Bench Source {i % n_sources}",
+        }
+        for i in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--sources", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path, vectorizer_path = train_tiny_model(tmp)
+        registry.reset()
+        registry.get(model_path, vectorizer_path)
+        credibility_engine.get_inference = lambda: registry.get(model_path, vectorizer_path)
+
+        client = make_client()
+        items = make_items(args.items, args.sources, "single")
+        started = time.perf_counter()
+        for item in items:
+            client.post("/api/articles/", json=item).raise_for_status()
+        single = time.perf_counter() - started
+
+        client = make_client()
+        items = make_items(args.items, args.sources, "batch")
+        started = time.perf_counter()
+        response = client.post("/api/articles/batch", json={"articles": items})
+        response.raise_for_status()
+        batch = time.perf_counter() - started
+        created = sum(1 for r in response.json() if r["status"] == "created")
+
+        # Same batch again: everything is answered by the duplicate lookup
+        started = time.perf_counter()
+        client.post("/api/articles/batch", json={"articles": items}).raise_for_status()
+        resubmit = time.perf_counter() - started
+
+    print(f"{args.items} items over {args.sources} sources")
+    print(f"single calls     : {single * 1000:>8.1f}ms  ({args.items / single:>7.1f} items/s)")
+    print(f"batch endpoint   : {batch * 1000:>8.1f}ms  ({args.items / batch:>7.1f} items/s, {created} created)")
+    print(f"batch resubmit   : {resubmit * 1000:>8.1f}ms  (all existing)")
+    print(f"speedup          : {single / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
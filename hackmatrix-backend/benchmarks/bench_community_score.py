@@ -0,0 +1,113 @@
+"""
+Community score per vote: full pass over ratings vs running aggregates.
+
+    python benchmarks/bench_community_score.py [--ratings 100 1000 10000] [--votes 20]
+
+Seeds an article with N ratings from N users, then applies --votes new votes,
+changes and removals through community.py the way rate_article does. After
+each vote it times the community score both ways: "full pass" is the old
+_compute_community_score (load every rating, lazily load each rating's user,
+weighted mean in Python); "aggregates" reads the article's running sums.
+Finally some users change tier and the aggregates are re-weighed and
+reconciled; every score must match the full pass.
+"""
+import argparse
+import random
+
+from common import make_session, percentiles, timed
+
+import community
+from models import Article, Rating, Source, User
+
+
+def full_pass(db, article_id):
+    """The previous implementation, O(ratings) with one user query per rating"""
+    ratings = db.query(Rating).filter(Rating.article_id == article_id).all()
+    total_weight = 0
+    weighted_sum = 0
+    for rating in ratings:
+        weight = rating.vote_weight * community.user_impact(rating.user.credibility_score)
+        weighted_sum += rating.credibility_rating * weight
+        total_weight += weight
+    return 50.0 if total_weight == 0 else weighted_sum / total_weight
+
+
+def aggregate(db, article_id):
+    return community.score(db.get(Article, article_id))
+
+
+def seed(db, n_ratings: int, rng: random.Random):
+    source = Source(name=f"Source {n_ratings}", domain=f"s{n_ratings}.example", url=f"https://s{n_ratings}.example")
+    article = Article(title="Story", content="Text.", url=f"https://bench.example/{n_ratings}", source=source,
+                      source_name=source.name)
+    users = [User(username=f"u{n_ratings}-{i}", email=f"u{n_ratings}-{i}@bench.example", password_hash="x",
+                  credibility_score=rng.uniform(20, 95)) for i in range(n_ratings * 2)]
+    db.add_all([article] + users)
+    db.flush()
+    ratings = [Rating(article_id=article.id, user=user, credibility_rating=rng.uniform(0, 100), vote_weight=1.0)
+               for user in users[:n_ratings]]
+    db.add_all(ratings)
+    db.flush()
+    # Built from the table, like an article rated before the aggregates existed
+    article.community_weighted_sum = article.community_total_weight = None
+    db.flush()
+    community.build(db, article)
+    db.commit()
+    return article.id, users
+
+
+def vote(db, article_id, users, rng):
+    """One rate_article call: a new vote, a changed vote or a toggle-off"""
+    user = rng.choice(users)
+    existing = db.query(Rating).filter(Rating.article_id == article_id, Rating.user_id == user.id).first()
+    value = rng.uniform(0, 100)
+    if existing is None:
+        rating = Rating(article_id=article_id, user_id=user.id, credibility_rating=value, vote_weight=1.0)
+        db.add(rating)
+        community.add_rating(db, rating, user)
+    elif rng.random() < 0.3:
+        community.remove_rating(db, existing)
+        db.delete(existing)
+    else:
+        community.change_rating(db, existing, value, user)
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ratings", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--votes", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    db = make_session()
+    print(f"{'ratings':>8}  {'full pass p50':>14}  {'aggregates p50':>15}  speedup")
+    for n_ratings in args.ratings:
+        article_id, users = seed(db, n_ratings, rng)
+        before, after = [], []
+        for _ in range(args.votes):
+            vote(db, article_id, users, rng)
+            db.expire_all()  # each request starts from a fresh session
+            expected, full_s = timed(full_pass, db, article_id)
+            db.expire_all()
+            actual, agg_s = timed(aggregate, db, article_id)
+            assert abs(expected - actual) < 1e-6, (expected, actual)
+            before.append(full_s * 1000)
+            after.append(agg_s * 1000)
+        before, after = percentiles(before), percentiles(after)
+        print(f"{n_ratings:>8}  {before['p50']:>12.2f}ms  {after['p50']:>13.3f}ms  {before['p50'] / after['p50']:>6.0f}x")
+
+        # Credibility tiers move: targeted re-weigh, then a full reconcile finds nothing left to fix
+        for user in rng.sample(users, len(users) // 10):
+            user.credibility_score = rng.uniform(20, 95)
+        db.flush()
+        community.reweigh_users(db, [u.id for u in users])
+        db.commit()
+        db.expire_all()
+        assert abs(full_pass(db, article_id) - aggregate(db, article_id)) < 1e-6
+        assert article_id not in community.reconcile(db)
+    print("aggregates match the full pass after votes, changes, removals and tier changes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Article extractor backends over a corpus of HTML pages.
+
+    python benchmarks/bench_extractors.py [--corpus DIR] [--pages 40] [--kib 400]
+
+Without --corpus a synthetic corpus of heavy news pages is generated (inline
+scripts, JSON blobs, nav menus and styles around a few paragraphs). Each
+backend is timed per page and its peak Python allocation measured with
+tracemalloc; output text is compared with the bs4 baseline.
+"""
+import argparse
+import os
+import random
+import time
+import tracemalloc
+
+from common import WORDS, fake_text, percentiles
+from extractors import EXTRACTORS, MAX_EXTRACT_BYTES, extract_text
+
+CHUNK_SIZE = 64 * 1024
+
+
+def synthetic_page(seed: int, kib: int) -> bytes:
+    """A news-page-shaped document of roughly `kib` KiB"""
+    rng = random.Random(seed)
+    nav = "".join(f'<li><a href="/section/{w}">{w.title()}</a></li>' for w in WORDS)
+    paragraphs = "".join(f"<p>{fake_text(60, seed * 100 + i)}</p>" for i in range(rng.randint(8, 20)))
+    filler = []
+    size = len(paragraphs)
+    while size < kib * 1024:
+        blob = "var data = %s;" % [rng.random() for _ in range(200)]
+        filler.append(f"<script>{blob}</script><style>.c{len(filler)} {{ color: #{rng.randrange(4096):03x}; }}</style>")
+        filler.append(f'<div class="promo"><span>{" ".join(rng.choice(WORDS) for _ in range(30))}</span></div>')
+        size += len(filler[-1]) + len(filler[-2])
+    half = len(filler) // 2
+    page = (
+        f"<!doctype html><html><head><title>Story {seed}</title>{''.join(filler[:half])}</head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        f"<article><h1>Story {seed}</h1>{paragraphs}</article>"
+        f"<aside><p>Related: {fake_text(20, seed)}</p></aside>{''.join(filler[half:])}"
+        f"<footer><p>Copyright</p></footer></body></html>"
+    )
+    return page.encode("utf-8")
+
+
+def load_corpus(args):
+    if args.corpus:
+        pages = []
+        for name in sorted(os.listdir(args.corpus)):
+            with open(os.path.join(args.corpus, name), "rb") as f:
+                pages.append(f.read())
+        return pages
+    return [synthetic_page(i, args.kib) for i in range(args.pages)]
+
+
+def chunked(page: bytes):
+    return [page[i:i + CHUNK_SIZE] for i in range(0, len(page), CHUNK_SIZE)]
+
+
+def run(backend: str, pages, baseline=None):
+    samples, peaks, texts = [], [], []
+    for page in pages:
+        chunks = chunked(page)
+        tracemalloc.start()
+        started = time.perf_counter()
+        text = extract_text(chunks, "utf-8", backend=backend)
+        samples.append((time.perf_counter() - started) * 1000)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        texts.append(text)
+
+    stats = percentiles(samples)
+    line = (
+        f"{backend:<8} p50={stats['p50']:>8.2f}ms  p95={stats['p95']:>8.2f}ms  "
+        f"peak mem mean={sum(peaks) / len(peaks) / 1024:>8.1f} KiB  max={max(peaks) / 1024:>8.1f} KiB"
+    )
+    if baseline is not None:
+        # Word-level agreement: the stream backend also drops <aside>/<footer> paragraphs
+        overlap = [
+            len(set(a.split()) & set(b.split())) / max(1, len(set(b.split())))
+            for a, b in zip(texts, baseline)
+        ]
+        line += f"  word overlap vs bs4={sum(overlap) / len(overlap):.1%}"
+    print(line)
+    return stats, texts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default=None, help="directory of saved .html pages")
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--kib", type=int, default=400, help="synthetic page size")
+    args = parser.parse_args()
+
+    pages = load_corpus(args)
+    print(
+        f"{len(pages)} pages, mean {sum(map(len, pages)) / len(pages) / 1024:.0f} KiB, "
+        f"cap {MAX_EXTRACT_BYTES // 1024} KiB"
+    )
+    base_stats, baseline = run("bs4", pages)
+    for backend in EXTRACTORS:
+        if backend == "bs4":
+            continue
+        stats, _ = run(backend, pages, baseline)
+        print(f"speedup vs bs4 (p50): {base_stats['p50'] / max(stats['p50'], 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Keyword heuristics on long articles: one scan per pattern vs the shared matcher.
+
+    python benchmarks/bench_keyword_matcher.py [--words 2000 20000 100000] [--repeat 5]
+
+"per-pattern scans" is the previous implementation of the four heuristics
+(nlp score, fact/opinion ratio, engine signals, NewsInference signals),
+kept here as the baseline: every keyword is an `in` or re.search over the
+text or over each sentence. "shared matcher" analyzes the text once
+(ml_models.document) and answers all four from the same keyword hits.
+Results must match.
+"""
+import argparse
+import random
+import re
+import time
+
+from common import percentiles
+
+from credibility_engine import CredibilityEngine
+from ml_models.inference import NewsInference
+from ml_models.document import AnalyzedDocument
+from ml_models.keywords import KEYWORDS
+
+# Filler words that contain none of the keywords
+PLAIN = (
+    "the a of in on and to for with at by from city council members local residents "
+    "week morning plan new road school water center public meeting office town "
+    "people year month area state county group people said told asked one two "
+    "three after before during while river bridge housing transit budget vote"
+).split()
+
+SPLIT = r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s'
+NLP_FACTUAL = [r'\b\d+%\b', r'\b\d{4}-\d{2}-\d{2}\b', r'according to', r'research shows', r'study found', r'data indicates']
+FACT = [r'\d+%', r'\d{4}', r'\$', r'according to', r'report', r'study', r'evidence', r'data', r'statistics', r'record', r'official']
+OPINION = [r'i think', r'believe', r'feel', r'opinion', r'should', r'must', r'best', r'worst', r'amazing', r'terrible', r'wrong']
+
+
+def legacy_nlp(text):
+    content = text.lower()
+    score = 50.0
+    score -= sum(1 for w in KEYWORDS["sensational"] if w in content) * 3
+    score += sum(1 for p in NLP_FACTUAL if re.search(p, content)) * 5
+    if len(content) > 500:
+        score += 5
+    elif len(content) < 100:
+        score -= 10
+    return max(0, min(100, score))
+
+
+def legacy_ratio(text):
+    content = text.lower()
+    fact = sum(1 for p in FACT if re.search(p, content))
+    opinion = sum(1 for p in OPINION if re.search(p, content))
+    return 0.5 if fact + opinion == 0 else fact / (fact + opinion)
+
+
+def legacy_signals(text, hype_keywords, factual_keywords, shouting=False):
+    hype, factual = [], []
+    for sent in re.split(SPLIT, text):
+        s_lower = sent.lower()
+        if any(k in s_lower for k in hype_keywords) or (shouting and sent.isupper() and len(sent) > 20) or "!!!" in sent:
+            hype.append(sent)
+        elif any(k in s_lower for k in factual_keywords) or re.search(r'\d+', sent):
+            factual.append(sent)
+    return hype, factual
+
+
+def legacy(text):
+    strip = lambda words: [w for w in words if w != "!!!"]
+    return (
+        legacy_nlp(text),
+        legacy_ratio(text),
+        legacy_signals(text, strip(KEYWORDS["hype"]), KEYWORDS["factual"]),
+        legacy_signals(text, strip(KEYWORDS["model_hype"]), KEYWORDS["model_factual"], shouting=True),
+    )
+
+
+def shared(engine, inference, text):
+    document = AnalyzedDocument(text)
+    signals = engine._extract_signals(text, document)
+    model_signals = inference.extract_signals(text, document)
+    return (
+        engine._heuristic_nlp_score(text, document),
+        engine._analyze_fact_opinion_ratio(text, document),
+        (signals["hype_sentences"], signals["factual_sentences"]),
+        (model_signals["hype_sentences"], model_signals["factual_sentences"]),
+    )
+
+
+def article(n_words: int, seed: int, density: float = 0.04) -> str:
+    """News-like prose: mostly plain words, `density` of them keywords, plus numbers, dates, money"""
+    rng = random.Random(seed)
+    keywords = [w for words in KEYWORDS.values() for w in words]
+    extras = ["12%", "2024-03-01", "$40", "1999", "Dr. Smith", "U.S. officials", "WOW THIS IS HUGE NEWS TODAY"]
+    sentences, count = [], 0
+    while count < n_words:
+        words = [rng.choice(keywords) if rng.random() < density else rng.choice(PLAIN) for _ in range(rng.randint(8, 20))]
+        if rng.random() < 0.2:
+            words.insert(rng.randrange(len(words)), rng.choice(extras))
+        count += len(words)
+        sentences.append(" ".join(words).capitalize() + rng.choice([".", ".", "?", "!!!"]))
+    return " ".join(sentences)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--words", type=int, nargs="+", default=[2000, 20000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--density", type=float, default=0.04, help="share of words drawn from the keyword lists")
+    args = parser.parse_args()
+
+    engine = CredibilityEngine()
+    engine.ml_inference = None
+    inference = NewsInference.__new__(NewsInference)  # extract_signals needs no model
+
+    print(f"{'words':>7}  {'per-pattern p50':>16}  {'shared matcher p50':>19}  speedup")
+    for n_words in args.words:
+        text = article(n_words, seed=n_words, density=args.density)
+        assert legacy(text) == shared(engine, inference, text), "matcher results differ"
+        before, after = [], []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            legacy(text)
+            before.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            shared(engine, inference, text)
+            after.append((time.perf_counter() - started) * 1000)
+        before, after = percentiles(before), percentiles(after)
+        print(f"{n_words:>7}  {before['p50']:>14.2f}ms  {after['p50']:>17.2f}ms  {before['p50'] / after['p50']:>6.1f}x")
+    print("results identical")
+
+
+if __name__ == "__main__":
+    main()
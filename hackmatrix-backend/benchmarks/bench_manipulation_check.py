@@ -0,0 +1,172 @@
+"""
+Manipulation check per score update: full rescan of the ratings vs rolling state.
+
+    python benchmarks/bench_manipulation_check.py [--ratings 100 1000 10000] [--votes 200]
+
+For each size, seeds one article per voting pattern (organic, spike, new
+accounts, uniform, extreme, brigade and a near-miss brigade). Half the
+ratings are built into the rolling state at once, the rest arrive as votes,
+changes and removals through rating_stats the way rate_article sends them.
+"full rescan" is the old _detect_manipulation (load every rating and its
+user, rebuild the lists); "rolling" reads the article's stats row. Verdicts
+must match. Rating and account times stay clear of the window edges, which
+the rolling state resolves to the minute.
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from common import make_session, percentiles, timed
+
+from sqlalchemy.orm import joinedload
+
+import rating_stats
+from models import Article, ArticleRatingStats, Rating, Source, User
+
+PATTERNS = ["organic", "spike", "new accounts", "uniform", "extreme", "brigade", "near brigade"]
+
+
+def full_rescan(db, article_id):
+    """The previous implementation: O(ratings) lists per check"""
+    ratings = db.query(Rating).options(joinedload(Rating.user)).filter(Rating.article_id == article_id).all()
+    if len(ratings) < 3:
+        return False
+    now = datetime.utcnow()
+    recent_ratings = [r for r in ratings if (now - r.created_at).total_seconds() < 3600]
+    if len(recent_ratings) >= 5 and len(recent_ratings) > len(ratings) * 0.7:
+        return True
+    new_accounts = [r for r in ratings if (now - r.user.created_at).days < 1]
+    if len(new_accounts) > len(ratings) * 0.5 and len(ratings) >= 5:
+        return True
+    if len(ratings) >= 5:
+        scores = [r.credibility_rating for r in ratings]
+        avg_score = sum(scores) / len(scores)
+        score_variance = sum((s - avg_score) ** 2 for s in scores) / len(scores)
+        if score_variance < 50:
+            return True
+    if len(ratings) >= 10:
+        scores = [r.credibility_rating for r in ratings]
+        high_ratings = len([s for s in scores if s > 75])
+        low_ratings = len([s for s in scores if s < 25])
+        if (high_ratings + low_ratings) / len(scores) > 0.8:
+            return True
+    if len(ratings) >= 5:
+        valid_ips = [r.ip_address for r in ratings if getattr(r, 'ip_address', None)]
+        if valid_ips:
+            most_common_ip, count = Counter(valid_ips).most_common(1)[0]
+            if count > len(ratings) * 0.4 and count > 2:
+                return True
+    return False
+
+
+def rolling(db, article_id):
+    return rating_stats.is_suspicious(db, db.get(ArticleRatingStats, article_id))
+
+
+def ago(rng, low_minutes, high_minutes):
+    """A time between low and high minutes ago, at least 3 minutes from either"""
+    return datetime.utcnow() - timedelta(minutes=rng.uniform(low_minutes + 3, high_minutes - 3))
+
+
+def rating_for(pattern, i, n, rng):
+    """(value, created_at, ip, account created_at) for the i-th of n ratings"""
+    value = rng.uniform(0, 100)
+    created_at = ago(rng, 60, 30 * 24 * 60)
+    ip = f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}" if rng.random() < 0.9 else None
+    account = ago(rng, 24 * 60, 365 * 24 * 60)
+    if pattern == "spike" and rng.random() < 0.8:
+        created_at = ago(rng, 0, 60)
+    elif pattern == "new accounts" and rng.random() < 0.6:
+        account = ago(rng, 0, 24 * 60)
+        created_at = ago(rng, 0, (datetime.utcnow() - account).total_seconds() / 60)
+    elif pattern == "uniform":
+        value = rng.uniform(57, 63)
+    elif pattern == "extreme" and rng.random() < 0.9:
+        value = rng.choice([rng.uniform(0, 24), rng.uniform(76, 100)])
+    elif pattern == "brigade" and rng.random() < 0.45:
+        ip = "203.0.113.7"
+    elif pattern == "near brigade" and rng.random() < 0.37:
+        ip = "203.0.113.7"
+    return value, created_at, ip, account
+
+
+def seed(db, pattern, n_ratings, rng):
+    key = f"{pattern}-{n_ratings}".replace(" ", "-")
+    source = Source(name=f"Source {key}", domain=f"{key}.example", url=f"https://{key}.example")
+    article = Article(title="Story", content="Text.", url=f"https://bench.example/{key}", source=source,
+                      source_name=source.name)
+    db.add(article)
+    db.flush()
+    users, ratings = [], []
+    for i in range(n_ratings):
+        value, created_at, ip, account = rating_for(pattern, i, n_ratings, rng)
+        user = User(username=f"{key}-{i}", email=f"{key}-{i}@bench.example", password_hash="x", created_at=account)
+        users.append(user)
+        ratings.append(Rating(article_id=article.id, user=user, credibility_rating=value, vote_weight=1.0,
+                              ip_address=ip, created_at=created_at))
+    half = n_ratings // 2
+    db.add_all(users + ratings[:half])
+    db.flush()
+    rating_stats.build(db, [article.id])
+    db.add_all(ratings[half:])
+    db.commit()
+    return article.id, ratings[half:]
+
+
+def stream(db, article_id, pending, n_votes, rng):
+    """Add the remaining ratings as votes, with some changes and removals; returns vote timings"""
+    timings = []
+    live = []
+    for rating in pending:
+        started = time.perf_counter()
+        rating_stats.add_rating(db, rating, rating.user)
+        timings.append((time.perf_counter() - started) * 1000)
+        live.append(rating)
+    for _ in range(n_votes):
+        rating = rng.choice(live)
+        started = time.perf_counter()
+        if rng.random() < 0.5:
+            old_value, old_ip = rating.credibility_rating, rating.ip_address
+            rating.credibility_rating = min(100.0, max(0.0, old_value + rng.uniform(-5, 5)))
+            rating_stats.change_rating(db, rating, rating.user, old_value, old_ip)
+        else:
+            rating_stats.remove_rating(db, rating, rating.user)
+            db.delete(rating)
+            live.remove(rating)
+        timings.append((time.perf_counter() - started) * 1000)
+    db.commit()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ratings", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--votes", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    db = make_session()
+    print(f"{'ratings':>8}  {'full rescan p50':>16}  {'rolling p50':>12}  speedup  {'vote update p50':>16}  verdicts")
+    for n_ratings in args.ratings:
+        before, after, votes, verdicts = [], [], [], []
+        for pattern in PATTERNS:
+            article_id, pending = seed(db, pattern, n_ratings, rng)
+            votes += stream(db, article_id, pending, min(args.votes, len(pending) // 2), rng)
+            db.expire_all()
+            expected, full_s = timed(full_rescan, db, article_id)
+            db.expire_all()
+            actual, rolling_s = timed(rolling, db, article_id)
+            assert expected == actual, (pattern, n_ratings, expected, actual)
+            before.append(full_s * 1000)
+            after.append(rolling_s * 1000)
+            verdicts.append("Y" if actual else "n")
+        before, after, votes = percentiles(before), percentiles(after), percentiles(votes)
+        print(f"{n_ratings:>8}  {before['p50']:>14.2f}ms  {after['p50']:>10.3f}ms  {before['p50'] / after['p50']:>6.0f}x"
+              f"  {votes['p50']:>14.3f}ms  {''.join(verdicts)}")
+    print("rolling verdicts match the full rescan for: " + ", ".join(PATTERNS))
+
+
+if __name__ == "__main__":
+    main()
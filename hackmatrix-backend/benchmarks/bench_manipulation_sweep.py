@@ -0,0 +1,130 @@
+"""
+Corpus-wide manipulation sweep: per-article rescans vs the columnar NumPy pass.
+
+    python benchmarks/bench_manipulation_sweep.py [--articles 2000] [--ratings-per-article 50]
+
+Seeds articles whose ratings follow a random voting pattern (organic, spike,
+new accounts, uniform, extreme, brigade) from a shared pool of users.
+"per article" runs the old _detect_manipulation on each article (load its
+ratings and raters, rebuild the lists); "columnar" is the admin sweep: one
+query into arrays, every rule vectorized. Flagged sets must match, and so
+must get_ratings_breakdown against the old loop for a sample of articles.
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from common import make_session, timed
+
+from sqlalchemy import insert
+
+import rating_analytics
+from bench_manipulation_check import full_rescan
+from models import Article, Rating, Source, User
+
+PATTERNS = ["organic", "organic", "organic", "spike", "new accounts", "uniform", "extreme", "brigade"]
+
+
+def ago(rng, low_minutes, high_minutes):
+    """A time between low and high minutes ago, clear of either edge for the whole run"""
+    return datetime.utcnow() - timedelta(minutes=rng.uniform(low_minutes + 15, high_minutes - 15))
+
+
+def seed(db, n_articles, per_article, rng):
+    source = Source(name="Sweep Source", domain="sweep.example", url="https://sweep.example")
+    db.add(source)
+    db.flush()
+    n_users = per_article * 20
+    old_users = [{"username": f"old{i}", "email": f"old{i}@bench.example", "password_hash": "x",
+                  "created_at": ago(rng, 24 * 60, 365 * 24 * 60)} for i in range(n_users)]
+    new_users = [{"username": f"new{i}", "email": f"new{i}@bench.example", "password_hash": "x",
+                  "created_at": ago(rng, 0, 20 * 60)} for i in range(n_users)]
+    db.execute(insert(User), old_users + new_users)
+    user_ids = [row[0] for row in db.query(User.id).order_by(User.id)]
+    old_ids, new_ids = user_ids[:n_users], user_ids[n_users:]
+
+    db.execute(insert(Article), [
+        {"title": f"Story {i}", "content": "Text.", "url": f"https://sweep.example/{i}",
+         "source_id": source.id, "source_name": source.name}
+        for i in range(n_articles)
+    ])
+    ratings = []
+    for article_id, in db.query(Article.id):
+        pattern = rng.choice(PATTERNS)
+        n = rng.randint(1, per_article * 2)
+        pool = new_ids if pattern == "new accounts" else old_ids
+        for user_id in rng.sample(pool, n):
+            value = rng.uniform(0, 100)
+            created_at = ago(rng, 60, 30 * 24 * 60)
+            ip = f"10.{rng.randrange(4)}.{rng.randrange(256)}.{rng.randrange(256)}" if rng.random() < 0.9 else None
+            if pattern == "spike" and rng.random() < 0.8:
+                created_at = ago(rng, 0, 60)
+            elif pattern == "uniform":
+                value = rng.uniform(57, 63)
+            elif pattern == "extreme" and rng.random() < 0.9:
+                value = rng.choice([rng.uniform(0, 24), rng.uniform(76, 100)])
+            elif pattern == "brigade" and rng.random() < 0.5:
+                ip = "203.0.113.7"
+            ratings.append({"article_id": article_id, "user_id": user_id, "credibility_rating": value,
+                            "vote_weight": 1.0, "ip_address": ip, "created_at": created_at})
+    db.execute(insert(Rating), ratings)
+    db.commit()
+    return len(ratings)
+
+
+def per_article_sweep(db):
+    return {article_id for article_id, in db.query(Article.id) if full_rescan(db, article_id)}
+
+
+def columnar_sweep(db):
+    columns = rating_analytics.load(db)
+    return set(columns.article_ids[rating_analytics.suspicious(rating_analytics.manipulation_signals(columns))].tolist())
+
+
+def legacy_breakdown(db, article_id):
+    ratings = db.query(Rating).filter(Rating.article_id == article_id).all()
+    if not ratings:
+        return {"total_ratings": 0, "average_rating": 0, "distribution": {}}
+    distribution = {"very_low": 0, "low": 0, "neutral": 0, "high": 0}
+    for rating in ratings:
+        score = rating.credibility_rating
+        if score < 25:
+            distribution["very_low"] += 1
+        elif score < 50:
+            distribution["low"] += 1
+        elif score < 75:
+            distribution["neutral"] += 1
+        else:
+            distribution["high"] += 1
+    avg_rating = sum(r.credibility_rating for r in ratings) / len(ratings)
+    return {"total_ratings": len(ratings), "average_rating": round(avg_rating, 2), "distribution": distribution}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--ratings-per-article", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    db = make_session()
+    n_ratings = seed(db, args.articles, args.ratings_per_article, rng)
+
+    db.expire_all()
+    expected, before = timed(per_article_sweep, db)
+    db.expire_all()
+    actual, after = timed(columnar_sweep, db)
+    assert expected == actual, (len(expected ^ actual), sorted(expected ^ actual)[:10])
+    print(f"{args.articles} articles, {n_ratings} ratings, {len(actual)} flagged")
+    print(f"per article  {before:>8.2f}s")
+    print(f"columnar     {after:>8.2f}s   {before / after:.0f}x")
+
+    for article_id in rng.sample(range(1, args.articles + 1), min(200, args.articles)):
+        assert legacy_breakdown(db, article_id) == rating_analytics.breakdown(
+            rating_analytics.rating_values(db, article_id)
+        ), article_id
+    print("flagged articles and ratings breakdowns match the per-article loops")
+
+
+if __name__ == "__main__":
+    main()
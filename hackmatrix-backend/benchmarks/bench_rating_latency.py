@@ -0,0 +1,84 @@
+"""
+Rating latency: per-request model loading vs the shared model registry.
+
+    python benchmarks/bench_rating_latency.py [--votes 50]
+
+"Before" rebuilds NewsInference (unpickling model.pkl/vectorizer.pkl) on every
+update_article_scores call, which is what rate_article used to do. "After"
+uses the process-wide registry.
+"""
+import argparse
+import tempfile
+import time
+
+from common import make_session, fake_text, train_tiny_model, percentiles
+
+import credibility_engine
+from credibility_engine import CredibilityScoreManager
+from ml_models.inference import NewsInference
+from ml_models.registry import registry
+from models import Article, Rating, Source, User
+
+
+def seed(db, n_ratings: int) -> Article:
+    source = Source(name="Bench Source", domain="bench.example", url="https://bench.example")
+    db.add(source)
+    db.flush()
+    article = Article(
+        title="Benchmark article",
+        content=fake_text(800),
+        url="https://bench.example/article",
+        source_id=source.id,
+        source_name=source.name,
+    )
+    db.add(article)
+    db.flush()
+    for i in range(n_ratings):
+        user = User(username=f"u{i}", email=f"u{i}@bench.example", password_hash="x")
+        db.add(user)
+        db.flush()
+        db.add(Rating(article_id=article.id, user_id=user.id, credibility_rating=(i * 37) % 100))
+    db.commit()
+    return article
+
+
+def run(label, factory, votes, db, article):
+    credibility_engine.get_inference = factory
+    samples = []
+    for _ in range(votes):
+        started = time.perf_counter()
+        CredibilityScoreManager(db).update_article_scores(article)
+        samples.append((time.perf_counter() - started) * 1000)
+    stats = percentiles(samples)
+    print(f"{label:<22} p50={stats['p50']:>8.2f}ms  p95={stats['p95']:>8.2f}ms  mean={stats['mean']:>8.2f}ms")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--votes", type=int, default=50)
+    parser.add_argument("--ratings", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path, vectorizer_path = train_tiny_model(tmp)
+        db = make_session()
+        article = seed(db, args.ratings)
+
+        before = run(
+            "before (load per vote)",
+            lambda: NewsInference(model_path, vectorizer_path),
+            args.votes, db, article,
+        )
+        registry.reset()
+        registry.get(model_path, vectorizer_path)  # warm, as main.py does at startup
+        after = run(
+            "after (registry)",
+            lambda: registry.get(model_path, vectorizer_path),
+            args.votes, db, article,
+        )
+        print(f"speedup (p50): {before['p50'] / max(after['p50'], 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
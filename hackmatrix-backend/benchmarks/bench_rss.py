@@ -0,0 +1,124 @@
+"""
+Feed path benchmark against the offline fixture server (no live publishers).
+
+    python benchmarks/bench_rss.py [--feeds 20] [--items 50] [--words 60]
+        [--format rss|atom|mixed] [--hosts 4] [--slow 2 --slow-ms 500]
+        [--failing 1] [--iterations 20] [--recorded DIR]
+
+Two phases, each reporting p50/p95/p99 latency, items/sec and peak RSS:
+
+    get_all_feeds     every feed fetched and merged, per call
+    /api/rss/feed     the route through ASGI; "cold" gives each request a
+                      fresh poller (full upstream fetch), "warm" serves the
+                      poller snapshot the way production does between polls
+"""
+import argparse
+import asyncio
+import resource
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from common import percentiles
+from feed_fixtures import FixtureServer
+
+import outbound
+import rss
+import rss_service
+from rss_service import FeedPoller, get_all_feeds
+
+
+def peak_rss_mib() -> float:
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def report(label: str, samples_ms, items: int, elapsed: float, rss_before: float):
+    stats = percentiles(samples_ms)
+    print(
+        f"{label:<20} p50={stats['p50']:>8.2f}ms  p95={stats['p95']:>8.2f}ms  p99={stats['p99']:>8.2f}ms  "
+        f"{items / elapsed if elapsed else 0:>9.1f} items/s  "
+        f"peak RSS {peak_rss_mib():.1f} MiB (+{peak_rss_mib() - rss_before:.1f})"
+    )
+    return stats
+
+
+async def bench_get_all_feeds(feeds, iterations: int):
+    rss_before = peak_rss_mib()
+    samples, items = [], 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t = time.perf_counter()
+        items += len(await get_all_feeds(feeds))
+        samples.append((time.perf_counter() - t) * 1000)
+    return report("get_all_feeds", samples, items, time.perf_counter() - started, rss_before)
+
+
+async def bench_route(feeds, iterations: int, mode: str):
+    app = FastAPI()
+    app.include_router(rss.router, prefix="/api/rss")
+    rss_before = peak_rss_mib()
+    samples, items = [], 0
+
+    rss.feed_poller = FeedPoller(feeds)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        if mode == "warm":
+            await client.get("/api/rss/feed")  # first request waits on upstream
+        started = time.perf_counter()
+        for _ in range(iterations):
+            if mode == "cold":
+                rss.feed_poller = FeedPoller(feeds)
+            t = time.perf_counter()
+            response = await client.get("/api/rss/feed")
+            samples.append((time.perf_counter() - t) * 1000)
+            response.raise_for_status()
+            items += len(response.json())
+        elapsed = time.perf_counter() - started
+    await rss.feed_poller.stop()
+    return report(f"/api/rss/feed {mode}", samples, items, elapsed, rss_before)
+
+
+async def run(args, feeds):
+    try:
+        await bench_get_all_feeds(feeds, args.iterations)
+        for mode in args.route_modes:
+            await bench_route(feeds, args.iterations, mode)
+    finally:
+        await outbound.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--feeds", type=int, default=20)
+    parser.add_argument("--items", type=int, default=50, help="items per feed document")
+    parser.add_argument("--words", type=int, default=60, help="words per item summary")
+    parser.add_argument("--format", choices=("rss", "atom", "mixed"), default="mixed")
+    parser.add_argument("--hosts", type=int, default=4)
+    parser.add_argument("--slow", type=int, default=0, help="number of slow feeds")
+    parser.add_argument("--slow-ms", type=int, default=500)
+    parser.add_argument("--failing", type=int, default=0, help="number of feeds answering 500")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--route-modes", nargs="+", choices=("cold", "warm"), default=["cold", "warm"])
+    parser.add_argument("--recorded", default=None, help="directory of saved feeds (see feed_fixtures.py record)")
+    args = parser.parse_args()
+
+    with FixtureServer(hosts=args.hosts, recorded_dir=args.recorded) as server:
+        feeds = server.feeds(
+            args.feeds, args.items, args.words, args.format,
+            slow=args.slow, slow_ms=args.slow_ms, failing=args.failing,
+        )
+        print(
+            f"{len(feeds)} feeds over {args.hosts} hosts, {args.items} items x {args.words} words, "
+            f"{args.slow} slow ({args.slow_ms}ms), {args.failing} failing, "
+            f"MAX_ITEMS_PER_FEED={rss_service.MAX_ITEMS_PER_FEED}"
+        )
+        asyncio.run(run(args, feeds))
+
+
+if __name__ == "__main__":
+    main()
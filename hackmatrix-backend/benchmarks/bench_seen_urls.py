@@ -0,0 +1,59 @@
+"""
+Seen-URL Bloom filter: false-positive rate, memory and lookup cost.
+
+    python benchmarks/bench_seen_urls.py [--urls 100000] [--probes 100000]
+
+Inserts N synthetic article URLs, probes N URLs that were never inserted
+and reports the measured false-positive rate against the configured one,
+plus bytes used versus a plain Python set of the same URLs.
+"""
+import argparse
+import sys
+import time
+
+import common  # noqa: F401  (puts the backend on sys.path)
+from url_index import BloomFilter, DEFAULT_ERROR_RATE
+
+
+def make_url(i: int, prefix: str = "story") -> str:
+    return f"https://news.example.com/world/2024/{prefix}-{i:09d}.html"
+
+
+def set_memory(urls) -> int:
+    s = set(urls)
+    return sys.getsizeof(s) + sum(sys.getsizeof(u) for u in s)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--urls", type=int, default=100_000)
+    parser.add_argument("--probes", type=int, default=100_000)
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_ERROR_RATE)
+    args = parser.parse_args()
+
+    bloom = BloomFilter(args.urls, args.error_rate)
+    inserted = [make_url(i) for i in range(args.urls)]
+
+    started = time.perf_counter()
+    for url in inserted:
+        bloom.add(url)
+    add_us = (time.perf_counter() - started) / args.urls * 1e6
+
+    assert all(url in bloom for url in inserted[:1000]), "Bloom filter returned a false negative"
+
+    started = time.perf_counter()
+    false_positives = sum(1 for i in range(args.probes) if make_url(i, "unseen") in bloom)
+    probe_us = (time.perf_counter() - started) / args.probes * 1e6
+
+    print(f"urls inserted         : {args.urls}")
+    print(f"bits / hash functions : {bloom.num_bits} / {bloom.num_hashes}")
+    print(f"bloom memory          : {bloom.memory_bytes / 1024:.1f} KiB "
+          f"({bloom.memory_bytes * 8 / args.urls:.2f} bits per URL)")
+    print(f"python set memory     : {set_memory(inserted) / 1024:.1f} KiB")
+    print(f"false-positive rate   : {false_positives / args.probes:.4%} measured, "
+          f"{bloom.expected_false_positive_rate():.4%} expected, {args.error_rate:.2%} target")
+    print(f"add / probe cost      : {add_us:.2f} us / {probe_us:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
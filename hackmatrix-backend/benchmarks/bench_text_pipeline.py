@@ -0,0 +1,81 @@
+"""
+Per-article text work: separate passes per component vs one AnalyzedDocument.
+
+    python benchmarks/bench_text_pipeline.py [--words 2000 20000 100000] [--repeat 5]
+
+"separate passes" is what scoring an article used to cost: the four keyword
+heuristics with their own scans and sentence splits (bench_keyword_matcher's
+baseline), clean_text for the vectorizer, and the claim extractor's quote and
+statistic regexes. "AnalyzedDocument" builds the document once and feeds the
+same consumers from it. Outputs must match.
+"""
+import argparse
+import re
+import time
+
+from common import percentiles
+from bench_keyword_matcher import article, legacy
+
+from credibility_engine import CredibilityEngine
+from ml_models.document import AnalyzedDocument
+from ml_models.inference import NewsInference
+from ml_models.preprocess import clean_text
+
+
+def separate_passes(text):
+    return (
+        legacy(text),
+        clean_text(text),
+        re.findall(r'"([^"]*)"', text),
+        re.findall(r'(\d+(?:%| percent| million| billion))', text),
+    )
+
+
+def analyzed(engine, inference, text):
+    document = AnalyzedDocument(text)
+    signals = engine._extract_signals(text, document)
+    model_signals = inference.extract_signals(text, document)
+    heuristics = (
+        engine._heuristic_nlp_score(text, document),
+        engine._analyze_fact_opinion_ratio(text, document),
+        (signals["hype_sentences"], signals["factual_sentences"]),
+        (model_signals["hype_sentences"], model_signals["factual_sentences"]),
+    )
+    return (
+        heuristics,
+        document.cleaned,
+        [text[start:end] for start, end in document.quotes],
+        [text[start:end] for start, end in document.statistics],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--words", type=int, nargs="+", default=[2000, 20000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = CredibilityEngine()
+    engine.ml_inference = None
+    inference = NewsInference.__new__(NewsInference)  # extract_signals needs no model
+
+    print(f"{'words':>7}  {'separate passes p50':>20}  {'AnalyzedDocument p50':>21}  speedup")
+    for n_words in args.words:
+        text = article(n_words, seed=n_words).replace(" said ", ' said "').replace(" told ", '" told ')
+        text += " Turnout rose 12 percent to 3 million voters."
+        assert separate_passes(text) == analyzed(engine, inference, text), "pipeline results differ"
+        before, after = [], []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            separate_passes(text)
+            before.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            analyzed(engine, inference, text)
+            after.append((time.perf_counter() - started) * 1000)
+        before, after = percentiles(before), percentiles(after)
+        print(f"{n_words:>7}  {before['p50']:>18.2f}ms  {after['p50']:>19.2f}ms  {before['p50'] / after['p50']:>6.1f}x")
+    print("results identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Refreshing every user's credibility: the per-user method vs the bulk job.
+
+    python benchmarks/bench_user_credibility.py [--users 2000] [--ratings-per-user 20]
+
+Seeds the same users, articles and ratings (with built community
+aggregates) into two databases. "per user" is the old
+recompute_user_credibility called once per user (load their ratings, lazily
+load each article, compare in Python, commit); "bulk" is
+user_credibility.recompute_all. Final scores, community aggregates and the
+set of users that changed tier must match.
+"""
+import argparse
+import random
+
+from common import make_session, timed
+
+from sqlalchemy import insert
+
+import community
+import user_credibility
+from models import Article, Rating, Source, User
+
+
+def seed(n_users, per_user, seed_value):
+    rng = random.Random(seed_value)
+    db = make_session()
+    source = Source(name="Users Source", domain="users.example", url="https://users.example")
+    db.add(source)
+    db.flush()
+    n_articles = max(per_user * 2, n_users // 4)
+    db.execute(insert(Article), [
+        {"title": f"Story {i}", "content": "Text.", "url": f"https://users.example/{i}", "source_id": source.id,
+         "source_name": source.name, "overall_credibility": rng.uniform(20, 90)}
+        for i in range(n_articles)
+    ])
+    db.execute(insert(User), [
+        {"username": f"u{i}", "email": f"u{i}@bench.example", "password_hash": "x",
+         "credibility_score": rng.choice([50.0, rng.uniform(30, 90)])}
+        for i in range(n_users)
+    ])
+    scores = dict(db.query(Article.id, Article.overall_credibility))
+    article_ids = list(scores)
+    user_ids = [user_id for user_id, in db.query(User.id)]
+    ratings = []
+    for user_id in user_ids:
+        # Some users rate close to the consensus, some do not; some have too few ratings
+        skill = rng.random()
+        for article_id in rng.sample(article_ids, rng.randint(1, per_user * 2)):
+            value = scores[article_id] + rng.uniform(-8, 8) if rng.random() < skill else rng.uniform(0, 100)
+            ratings.append({"article_id": article_id, "user_id": user_id, "credibility_rating": value,
+                            "vote_weight": 1.0})
+    db.execute(insert(Rating), ratings)
+    db.commit()
+    community.reconcile(db)
+    return db, len(ratings)
+
+
+def per_user(db):
+    """The previous recompute_user_credibility, once per user"""
+    tier_changes = 0
+    for user in db.query(User).order_by(User.id).all():
+        ratings = db.query(Rating).filter(Rating.user_id == user.id).all()
+        if not ratings or len(ratings) < 5:
+            continue
+        accurate_ratings = 0
+        for rating in ratings:
+            difference = abs(rating.credibility_rating - rating.article.overall_credibility)
+            if difference < 10:
+                accurate_ratings += 1
+        accuracy_percentage = (accurate_ratings / len(ratings)) * 100
+        credibility = 40 + (accuracy_percentage / 100) * 40
+        old_impact = community.user_impact(user.credibility_score)
+        user.credibility_score = credibility
+        if community.user_impact(credibility) != old_impact:
+            db.flush()
+            community.reweigh_users(db, [user.id])
+            tier_changes += 1
+        db.commit()
+    return tier_changes
+
+
+def bulk(db):
+    return user_credibility.recompute_all(db, progress=None)["tier_changes"]
+
+
+def snapshot(db):
+    users = dict(db.query(User.id, User.credibility_score))
+    aggregates = {a: (s, w) for a, s, w in db.query(Article.id, Article.community_weighted_sum,
+                                                    Article.community_total_weight)}
+    return users, aggregates
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--ratings-per-user", type=int, default=20)
+    args = parser.parse_args()
+
+    before_db, n_ratings = seed(args.users, args.ratings_per_user, 3)
+    after_db, _ = seed(args.users, args.ratings_per_user, 3)
+
+    before_tiers, before = timed(per_user, before_db)
+    after_tiers, after = timed(bulk, after_db)
+
+    expected_users, expected_aggregates = snapshot(before_db)
+    actual_users, actual_aggregates = snapshot(after_db)
+    assert before_tiers == after_tiers, (before_tiers, after_tiers)
+    assert expected_users.keys() == actual_users.keys()
+    assert all(abs(expected_users[u] - actual_users[u]) < 1e-9 for u in expected_users)
+    for article_id, (weighted, weight) in expected_aggregates.items():
+        assert abs(weighted - actual_aggregates[article_id][0]) < 1e-6
+        assert abs(weight - actual_aggregates[article_id][1]) < 1e-6
+    assert not community.reconcile(after_db), "aggregates drifted from the ratings"
+
+    print(f"{args.users} users, {n_ratings} ratings, {after_tiers} tier changes")
+    print(f"per user  {before:>8.2f}s")
+    print(f"bulk      {after:>8.2f}s   {before / after:.0f}x")
+    print("scores and community aggregates identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+A burst of votes on one trending article: inline rescoring vs the debounced queue.
+
+    python benchmarks/bench_vote_burst.py [--votes 200] [--debounce 0.5]
+
+Each vote is a POST /api/articles/{id}/rate from a different user, in-process
+against an in-memory database with a tiny trained model. "inline" is the old
+behaviour (queue not running, so rate_article rescores before returning);
+"queued" runs the RescoreQueue, which rescores once per debounce window.
+Reports vote latency, full rescores (audit rows) and database commits.
+"""
+import argparse
+import tempfile
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from common import make_session, fake_text, train_tiny_model, percentiles
+
+import credibility_engine
+import rescoring
+from articles import router as articles_router
+from auth import create_access_token
+from database import get_db
+from ml_models.registry import registry
+from models import Article, AuditLog, Source, User
+from rescoring import rescore_queue
+
+
+class CommitCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "commit", self._on_commit)
+
+    def _on_commit(self, *args):
+        self.count += 1
+
+
+def make_app(n_users: int):
+    """Articles router over a fresh in-memory database with one article and n users"""
+    bind = make_session().get_bind()
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=bind)
+    rescoring.SessionLocal = Session  # the queue opens its own sessions
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    db = Session()
+    source = Source(name="Bench Source", domain="bench.example", url="https://bench.example")
+    db.add(source)
+    db.flush()
+    article = Article(title="Trending story", content=fake_text(800, seed=1), url="https://bench.example/trending",
+                      source_id=source.id, source_name=source.name)
+    users = [User(username=f"voter{i}", email=f"voter{i}@bench.example", password_hash="x") for i in range(n_users)]
+    db.add_all([article] + users)
+    db.commit()
+    tokens = [create_access_token({"sub": user.email}) for user in users]
+    article_id = article.id
+    db.close()
+
+    app = FastAPI()
+    app.include_router(articles_router, prefix="/api/articles")
+    app.dependency_overrides[get_db] = override_get_db
+    return app, Session, bind, article_id, tokens
+
+
+def burst(label: str, n_votes: int, queue=None, debounce: float = 0.5):
+    app, Session, bind, article_id, tokens = make_app(n_votes)
+    if queue is not None:
+        app.router.on_startup.append(queue.start)
+        app.router.on_shutdown.append(queue.stop)
+    commits = CommitCounter(bind)
+
+    latencies = []
+    started = time.perf_counter()
+    with TestClient(app) as client:
+        for i, token in enumerate(tokens):
+            t0 = time.perf_counter()
+            client.post(
+                f"/api/articles/{article_id}/rate",
+                json={"rating_value": (i * 37) % 100},
+                headers={"Authorization": f"Bearer {token}"},
+            ).raise_for_status()
+            latencies.append((time.perf_counter() - t0) * 1000)
+        if queue is not None:
+            time.sleep(debounce * 1.5)  # let the last window close
+    elapsed = time.perf_counter() - started
+
+    db = Session()
+    rescores = db.query(AuditLog).filter(AuditLog.article_id == article_id).count()
+    final = db.get(Article, article_id).overall_credibility
+    db.close()
+    p = percentiles(latencies)
+    print(f"{label:<8} vote p50 {p['p50']:>7.2f}ms  p95 {p['p95']:>7.2f}ms  "
+          f"{rescores:>4} rescores  {commits.count:>4} commits  ({elapsed:.1f}s, final score {final:.2f})")
+    return final
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--votes", type=int, default=200)
+    parser.add_argument("--debounce", type=float, default=0.5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path, vectorizer_path = train_tiny_model(tmp)
+        registry.reset()
+        registry.get(model_path, vectorizer_path)
+        credibility_engine.get_inference = lambda: registry.get(model_path, vectorizer_path)
+
+        inline = burst("inline", args.votes)
+        rescore_queue.debounce = args.debounce
+        queued = burst("queued", args.votes, rescore_queue, args.debounce)
+
+    assert abs(inline - queued) < 1e-9, "final scores differ"
+    print("final scores identical")
+
+
+if __name__ == "__main__":
+    main()
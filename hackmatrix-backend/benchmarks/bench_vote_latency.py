@@ -0,0 +1,83 @@
+"""
+Vote latency vs article length, with and without memoized text analysis.
+
+    python benchmarks/bench_vote_latency.py [--votes 20] [--lengths 200 2000 20000]
+
+For each article length, runs update_article_scores (what a vote triggers)
+repeatedly. "full analysis" invalidates the stored analysis key before each
+call, which is what every vote used to cost; "memoized" reuses it, so only
+the community and manipulation parts are recomputed.
+"""
+import argparse
+import tempfile
+import time
+
+from common import make_session, fake_text, train_tiny_model, percentiles
+
+import credibility_engine
+from credibility_engine import CredibilityScoreManager
+from ml_models.registry import registry
+from models import Article, Rating, Source, User
+
+
+def seed(db, words: int, n_ratings: int) -> Article:
+    source = db.query(Source).first()
+    if source is None:
+        source = Source(name="Bench Source", domain="bench.example", url="https://bench.example")
+        db.add(source)
+        db.flush()
+    article = Article(
+        title=f"Article of {words} words",
+        content=fake_text(words, seed=words),
+        url=f"https://bench.example/{words}",
+        source_id=source.id,
+        source_name=source.name,
+    )
+    db.add(article)
+    db.flush()
+    for i in range(n_ratings):
+        user = User(username=f"u{words}-{i}", email=f"u{words}-{i}@bench.example", password_hash="x")
+        db.add(user)
+        db.flush()
+        db.add(Rating(article_id=article.id, user_id=user.id, credibility_rating=(i * 37) % 100))
+    db.commit()
+    return article
+
+
+def run(db, article, votes: int, memoized: bool):
+    manager = CredibilityScoreManager(db)
+    manager.update_article_scores(article)  # first scoring always analyzes the text
+    samples = []
+    for _ in range(votes):
+        if not memoized:
+            article.analysis_version = None
+        started = time.perf_counter()
+        manager.update_article_scores(article)
+        samples.append((time.perf_counter() - started) * 1000)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--votes", type=int, default=20)
+    parser.add_argument("--ratings", type=int, default=20)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[200, 2000, 20000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path, vectorizer_path = train_tiny_model(tmp)
+        registry.reset()
+        registry.get(model_path, vectorizer_path)
+        credibility_engine.get_inference = lambda: registry.get(model_path, vectorizer_path)
+
+        db = make_session()
+        print(f"{'words':>7}  {'full analysis p50':>18}  {'memoized p50':>13}  speedup")
+        for words in args.lengths:
+            article = seed(db, words, args.ratings)
+            before = run(db, article, args.votes, memoized=False)
+            after = run(db, article, args.votes, memoized=True)
+            print(f"{words:>7}  {before['p50']:>16.2f}ms  {after['p50']:>11.2f}ms  {before['p50'] / max(after['p50'], 1e-9):>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Shared helpers for the benchmark scripts (run from hackmatrix-backend/)"""
+import os
+import sys
+import pickle
+import random
+import statistics
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models import Base
+
+WORDS = (
+    "government official report study data according evidence percent minister "
+    "shocking secret miracle exposed crisis market economy election health police "
+    "court parliament researchers statistics confirmed policy budget climate vote"
+).split()
+
+
+def make_session():
+    """In-memory SQLite session so benchmarks never touch hackmatrix.db"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def fake_text(n_words: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(max(1, n_words // 12)):
+        sentence = " ".join(rng.choice(WORDS) for _ in range(12))
+        sentences.append(sentence.capitalize() + ".")
+    return " ".join(sentences)
+
+
+def train_tiny_model(target_dir: str):
+    """Train a TF-IDF + LogisticRegression pair shaped like train.py's output"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    # A wide synthetic vocabulary so the pickled vectorizer is realistically sized
+    rng = random.Random(42)
+    vocab = WORDS + ["w%05d" % i for i in range(20000)]
+    texts = [" ".join(rng.choice(vocab) for _ in range(300)) for _ in range(400)]
+    labels = [i % 2 for i in range(400)]
+    vectorizer = TfidfVectorizer(max_features=5000, ngram_range=(1, 2))
+    model = LogisticRegression(max_iter=1000).fit(vectorizer.fit_transform(texts), labels)
+
+    model_path = os.path.join(target_dir, "model.pkl")
+    vectorizer_path = os.path.join(target_dir, "vectorizer.pkl")
+    with open(model_path, "wb") as f:
+        pickle.dump(model, f)
+    with open(vectorizer_path, "wb") as f:
+        pickle.dump(vectorizer, f)
+    return model_path, vectorizer_path
+
+
+def timed(fn, *args):
+    """(fn(*args), elapsed seconds)"""
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def percentiles(samples_ms):
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0}
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "p50": round(pick(0.50), 3),
+        "p95": round(pick(0.95), 3),
+        "p99": round(pick(0.99), 3),
+        "mean": round(statistics.fmean(ordered), 3),
+    }
@@ -0,0 +1,243 @@
+"""
+Offline stand-in for the news publishers' RSS/Atom endpoints.
+
+Everything is encoded in the URL so the server keeps no state:
+
+    /rss/<seed>?items=50&words=60       synthetic RSS 2.0 document
+    /atom/<seed>?items=50&words=60      synthetic Atom document
+    /slow/<ms>/<rss|atom>/<seed>?...    same document after a delay
+    /fail/<status>/<seed>               error response (500, 503, ...)
+    /recorded/<file name>               a saved real feed from --recorded DIR
+
+Responses carry an ETag and honour If-None-Match, like the real feeds do.
+The server runs in a child process (one listener per 127.0.0.x "host") so
+the benchmark process' RSS and GIL only reflect the client side.
+
+    python benchmarks/feed_fixtures.py serve [--port 8765] [--hosts 4] [--recorded DIR]
+    python benchmarks/feed_fixtures.py record DIR     # save the live FEEDS once
+"""
+import argparse
+import hashlib
+import http.server
+import multiprocessing
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+from common import WORDS
+
+BASE_TIME = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _sentence(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n_words)).capitalize()
+
+
+@lru_cache(maxsize=256)
+def synthetic_feed(fmt: str, seed: int, items: int, words: int) -> bytes:
+    """Deterministic RSS or Atom document with `items` entries of ~`words` words"""
+    rng = random.Random(seed)
+    entries = []
+    for i in range(items):
+        title = escape(_sentence(rng, 8))
+        summary = escape(_sentence(rng, words) + ".")
+        link = f"https://fixtures.example/{seed}/story-{i}"
+        published = BASE_TIME - timedelta(minutes=seed * 7 + i * 13)
+        if fmt == "atom":
+            entries.append(
+                f"<entry><title>{title}</title><link href=\"{link}\"/><id>{link}</id>"
+                f"<updated>{published.isoformat()}</updated><summary>{summary}</summary></entry>"
+            )
+        else:
+            entries.append(
+                f"<item><title>{title}</title><link>{link}</link><guid>{link}</guid>"
+                f"<pubDate>{format_datetime(published)}</pubDate><description>{summary}</description></item>"
+            )
+    if fmt == "atom":
+        doc = (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            f'<feed xmlns="http://www.w3.org/2005/Atom"><title>Fixture {seed}</title>{"".join(entries)}</feed>'
+        )
+    else:
+        doc = (
+            '<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+            f'<title>Fixture {seed}</title>{"".join(entries)}</channel></rss>'
+        )
+    return doc.encode("utf-8")
+
+
+class FixtureHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real publishers
+    recorded_dir: Optional[str] = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "application/rss+xml"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if status == 200:
+            self.send_header("ETag", '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest())
+        self.end_headers()
+        if body:
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client gave up (timeout, circuit breaker, item cap)
+
+    def _document(self, parts: List[str], query: Dict) -> Optional[bytes]:
+        if len(parts) != 2 or parts[0] not in ("rss", "atom"):
+            return None
+        items = int(query.get("items", ["50"])[0])
+        words = int(query.get("words", ["60"])[0])
+        return synthetic_feed(parts[0], int(parts[1]), items, words)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        query = parse_qs(url.query)
+
+        if parts[:1] == ["fail"] and len(parts) >= 2:
+            return self._send(int(parts[1]), b"upstream error", "text/plain")
+        if parts[:1] == ["slow"] and len(parts) >= 2:
+            time.sleep(int(parts[1]) / 1000)
+            parts = parts[2:]
+
+        if parts[:1] == ["recorded"] and self.recorded_dir and len(parts) == 2:
+            path = os.path.join(self.recorded_dir, os.path.basename(parts[1]))
+            body = open(path, "rb").read() if os.path.isfile(path) else None
+        else:
+            body = self._document(parts, query)
+        if body is None:
+            return self._send(404, b"not found", "text/plain")
+
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304)
+        self._send(200, body, "application/atom+xml" if parts[:1] == ["atom"] else "application/rss+xml")
+
+
+def host_address(index: int) -> str:
+    """127.0.0.1, 127.0.0.2, ... so per-host limits see distinct publishers"""
+    return f"127.0.0.{index + 1}"
+
+
+def serve(port: int, hosts: int, recorded_dir: Optional[str], ready=None):
+    """Run one threaded listener per host address until the process is killed"""
+    FixtureHandler.recorded_dir = recorded_dir
+    servers = []
+    for i in range(hosts):
+        server = http.server.ThreadingHTTPServer((host_address(i), port), FixtureHandler)
+        server.daemon_threads = True
+        port = server.server_address[1]  # port=0 picks one; the other hosts reuse it
+        servers.append(server)
+    for server in servers[1:]:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    if ready is not None:
+        ready.send(port)
+    servers[0].serve_forever()
+
+
+class FixtureServer:
+    """Start the fixture server in a child process: `with FixtureServer(hosts=4) as server:`"""
+
+    def __init__(self, hosts: int = 1, port: int = 0, recorded_dir: Optional[str] = None):
+        self.hosts = max(1, hosts)
+        self.port = port
+        self.recorded_dir = recorded_dir
+        self._process = None
+
+    def __enter__(self):
+        parent, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=serve, args=(self.port, self.hosts, self.recorded_dir, child), daemon=True
+        )
+        self._process.start()
+        self.port = parent.recv()
+        return self
+
+    def __exit__(self, *exc):
+        self._process.terminate()
+        self._process.join()
+
+    def url(self, host: int, path: str) -> str:
+        return f"http://{host_address(host % self.hosts)}:{self.port}/{path.lstrip('/')}"
+
+    def feeds(
+        self,
+        count: int,
+        items: int = 50,
+        words: int = 60,
+        fmt: str = "rss",
+        slow: int = 0,
+        slow_ms: int = 2000,
+        failing: int = 0,
+    ) -> List[Dict]:
+        """
+        feed_info dicts for rss_service: `count` feeds spread over the hosts,
+        the last `slow` of them delayed and the last `failing` returning 500.
+        fmt is "rss", "atom" or "mixed"; recorded files are appended as extra feeds.
+        """
+        feeds = []
+        for i in range(count):
+            kind = fmt if fmt != "mixed" else ("rss", "atom")[i % 2]
+            path = f"{kind}/{i}?items={items}&words={words}"
+            if i >= count - failing:
+                path = f"fail/500/{i}"
+            elif i >= count - failing - slow:
+                path = f"slow/{slow_ms}/{path}"
+            feeds.append({"name": f"Fixture {i}", "url": self.url(i, path), "category": "Benchmark"})
+
+        if self.recorded_dir:
+            for j, name in enumerate(sorted(os.listdir(self.recorded_dir))):
+                feeds.append({"name": name, "url": self.url(j, f"recorded/{name}"), "category": "Recorded"})
+        return feeds
+
+
+def record(target_dir: str):
+    """Download each live feed in rss_service.FEEDS once, for offline replays"""
+    import requests
+    from rss_service import FEEDS
+
+    os.makedirs(target_dir, exist_ok=True)
+    for feed in FEEDS:
+        name = feed["name"].replace(" ", "_").lower() + ".xml"
+        try:
+            response = requests.get(feed["url"], timeout=10)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"skip {feed['name']}: {e}")
+            continue
+        with open(os.path.join(target_dir, name), "wb") as f:
+            f.write(response.content)
+        print(f"saved {name} ({len(response.content)} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_cmd = sub.add_parser("serve")
+    serve_cmd.add_argument("--port", type=int, default=8765)
+    serve_cmd.add_argument("--hosts", type=int, default=1)
+    serve_cmd.add_argument("--recorded", default=None)
+    record_cmd = sub.add_parser("record")
+    record_cmd.add_argument("dir")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.dir)
+    else:
+        print(f"Serving fixtures on {host_address(0)}..{host_address(args.hosts - 1)}:{args.port}")
+        serve(args.port, args.hosts, args.recorded)
+
+
+if __name__ == "__main__":
+    main()
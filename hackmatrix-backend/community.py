@@ -0,0 +1,224 @@
+"""
+Running community-score aggregates.
+Each article keeps the weighted sum of its ratings and their total weight
+(community_weighted_sum / community_total_weight). rate_article adjusts
+them with SQL increments in the same transaction as the rating insert,
+change or delete, so the community score is O(1) per vote instead of a
+pass over every rating and its user. Each rating remembers the weight it
+was counted with (applied_weight), so changing or removing it subtracts
+exactly that.
+
+A user's weight depends on their credibility tier; reweigh_users re-applies
+the ratings of users whose tier changed, and reconcile() rebuilds every
+aggregate from the ratings table. NULL aggregates mean "not built yet"
+(articles from before this existed): the engine builds them from the
+ratings the first time it scores the article.
+"""
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, case, func, select, update
+from sqlalchemy.orm import Session
+
+from models import Article, Rating, User
+from source_registry import LOOKUP_CHUNK, chunked
+
+NEUTRAL_SCORE = 50.0
+
+
+def user_impact(credibility_score: Optional[float]) -> float:
+    """
+    Users with high credibility (>75) get 2x impact,
+    users with low credibility (<40) get 0.5x impact
+    """
+    if credibility_score is None:
+        return 1.0
+    if credibility_score > 75:
+        return 2.0
+    if credibility_score < 40:
+        return 0.5
+    return 1.0
+
+
+def rating_weight(rating: Rating, user: User) -> float:
+    # Base weight comes from rating.vote_weight (defaults to 1.0)
+    return (rating.vote_weight if rating.vote_weight is not None else 1.0) * user_impact(user.credibility_score)
+
+
+def _mean(weighted_sum: Optional[float], total_weight: Optional[float]) -> float:
+    if not total_weight or total_weight <= 1e-9:
+        return NEUTRAL_SCORE
+    return weighted_sum / total_weight
+
+
+def score(article: Article) -> float:
+    """Weighted mean of the article's ratings, neutral when there are none"""
+    return _mean(article.community_weighted_sum, article.community_total_weight)
+
+
+def _increment(db: Session, article_id: int, weighted: float, weight: float):
+    # Stays NULL while the article's aggregates have not been built
+    db.execute(
+        update(Article)
+        .where(Article.id == article_id)
+        .values(
+            community_weighted_sum=Article.community_weighted_sum + weighted,
+            community_total_weight=Article.community_total_weight + weight,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def add_rating(db: Session, rating: Rating, user: User):
+    """Count a new (or re-valued) rating in its article's aggregates"""
+    weight = rating_weight(rating, user)
+    rating.applied_weight = weight
+    _increment(db, rating.article_id, rating.credibility_rating * weight, weight)
+
+
+def remove_rating(db: Session, rating: Rating):
+    """Take a rating out of its article's aggregates, before deleting or changing it"""
+    if rating.applied_weight is None:
+        # Counted before aggregates existed (or never): rebuild them on next scoring
+        db.execute(
+            update(Article)
+            .where(Article.id == rating.article_id)
+            .values(community_weighted_sum=None, community_total_weight=None)
+            .execution_options(synchronize_session=False)
+        )
+        return
+    _increment(db, rating.article_id, -rating.credibility_rating * rating.applied_weight, -rating.applied_weight)
+    rating.applied_weight = None
+
+
+def change_rating(db: Session, rating: Rating, value: float, user: User):
+    remove_rating(db, rating)
+    rating.credibility_rating = value
+    add_rating(db, rating, user)
+
+
+def _sql_weight(credibility):
+    """rating_weight as a SQL expression over the rater's credibility score"""
+    impact = case((credibility > 75, 2.0), (credibility < 40, 0.5), else_=1.0)
+    return func.coalesce(Rating.vote_weight, 1.0) * impact
+
+
+def build(db: Session, article: Article) -> bool:
+    """
+    Build an article's aggregates from the ratings table if they are still
+    NULL, and stamp each rating with the weight it was counted with, in the
+    current transaction. The sums come from the table inside the UPDATE
+    itself, which on SQLite holds the write lock: a vote committed earlier
+    is summed, a later one increments the built aggregates. False if
+    another worker built them first. Does not commit.
+    """
+    rater = select(User.credibility_score).where(User.id == Rating.user_id).scalar_subquery()
+    rated = select().where(Rating.article_id == article.id)
+    built = db.execute(
+        update(Article)
+        .where(Article.id == article.id, Article.community_total_weight.is_(None))
+        .values(
+            community_weighted_sum=rated.add_columns(
+                func.coalesce(func.sum(Rating.credibility_rating * _sql_weight(rater)), 0.0)
+            ).scalar_subquery(),
+            community_total_weight=rated.add_columns(
+                func.coalesce(func.sum(_sql_weight(rater)), 0.0)
+            ).scalar_subquery(),
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if built:
+        db.execute(
+            update(Rating)
+            .where(Rating.article_id == article.id)
+            .values(applied_weight=_sql_weight(rater))
+            .execution_options(synchronize_session=False)
+        )
+    db.refresh(article, ["community_weighted_sum", "community_total_weight"])
+    return bool(built)
+
+
+def reweigh_users(db: Session, user_ids: Iterable[int]) -> List[int]:
+    """
+    Re-apply the ratings of users whose credibility tier may have changed:
+    adjust each affected article by the difference between the new and the
+    counted weight. Returns the ids of articles whose aggregates moved.
+    Does not commit.
+    """
+    user_ids = list(user_ids)
+    deltas: Dict[int, List[float]] = {}
+    reweighed = []
+    for chunk in chunked(user_ids, LOOKUP_CHUNK):
+        rows = db.execute(
+            select(Rating.id, Rating.article_id, Rating.credibility_rating, Rating.vote_weight,
+                   Rating.applied_weight, User.credibility_score)
+            .join(User, User.id == Rating.user_id)
+            .where(Rating.user_id.in_(chunk))
+        )
+        for rating_id, article_id, value, vote_weight, applied, credibility in rows:
+            weight = (vote_weight if vote_weight is not None else 1.0) * user_impact(credibility)
+            if applied is None or weight == applied:
+                continue  # uncounted ratings are picked up when the article is rebuilt
+            delta = deltas.setdefault(article_id, [0.0, 0.0])
+            delta[0] += value * (weight - applied)
+            delta[1] += weight - applied
+            reweighed.append({"rid": rating_id, "weight": weight})
+
+    if reweighed:
+        # Core tables: executemany with per-row increments, not the ORM's bulk-by-primary-key mode
+        ratings, articles = Rating.__table__, Article.__table__
+        db.execute(
+            update(ratings).where(ratings.c.id == bindparam("rid")).values(applied_weight=bindparam("weight")),
+            reweighed,
+        )
+        db.execute(
+            update(articles)
+            .where(articles.c.id == bindparam("aid"))
+            .values(
+                community_weighted_sum=articles.c.community_weighted_sum + bindparam("dsum"),
+                community_total_weight=articles.c.community_total_weight + bindparam("dweight"),
+            ),
+            [{"aid": article_id, "dsum": d[0], "dweight": d[1]} for article_id, d in deltas.items()],
+        )
+    return list(deltas)
+
+
+def reconcile(db: Session) -> List[int]:
+    """
+    Rebuild every article's aggregates from the ratings table with set-based
+    SQL: one UPDATE re-derives each rating's weight from its user's current
+    tier, one GROUP BY sums them per article. Commits. Returns the ids of
+    articles whose community score changed (they need rescoring).
+    """
+    credibility = (
+        select(User.credibility_score).where(User.id == Rating.user_id).scalar_subquery()
+    )
+    db.execute(
+        update(Rating)
+        .values(applied_weight=_sql_weight(credibility))
+        .execution_options(synchronize_session=False)
+    )
+
+    totals = {
+        article_id: (weighted or 0.0, weight or 0.0)
+        for article_id, weighted, weight in db.execute(
+            select(Rating.article_id, func.sum(Rating.credibility_rating * Rating.applied_weight),
+                   func.sum(Rating.applied_weight))
+            .group_by(Rating.article_id)
+        )
+    }
+
+    changed = []
+    updates = []
+    current = db.execute(select(Article.id, Article.community_weighted_sum, Article.community_total_weight))
+    for article_id, weighted, weight in current:
+        new_weighted, new_weight = totals.get(article_id, (0.0, 0.0))
+        if weighted is not None and weight is not None and abs(weighted - new_weighted) < 1e-6 and abs(weight - new_weight) < 1e-6:
+            continue
+        updates.append({"id": article_id, "community_weighted_sum": new_weighted, "community_total_weight": new_weight})
+        old_score = _mean(weighted, weight) if weight is not None else None
+        if old_score is None or abs(old_score - _mean(new_weighted, new_weight)) > 1e-6:
+            changed.append(article_id)
+    for chunk in chunked(updates, LOOKUP_CHUNK):
+        db.execute(update(Article), chunk)
+    db.commit()
+    return changed
@@ -5,18 +5,32 @@ Combines ML models with rule-based logic for transparent credibility assessment
 
 import random
 import json
-from typing import Dict, List, Tuple
-from datetime import datetime, timedelta
+import hashlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, func, update
 from sqlalchemy.orm import Session
-from models import Article, Rating, User, Claim, AuditLog
-import re
+from models import Article, ArticleRatingStats, User, Claim, AuditLog, Source
+from story_clusters import cluster_source_count
+from source_registry import LOOKUP_CHUNK, chunked
+import community
+import rating_stats
+import user_credibility
+from ml_models.document import AnalyzedDocument
 try:
-    from ml_models.inference import NewsInference
+    from ml_models.registry import get_inference
     ML_AVAILABLE = True
 except ImportError:
     ML_AVAILABLE = False
     print("Warning: ML models not available, falling back to heuristics")
 
+# Bump when the text heuristics change so stored analysis is recomputed
+ANALYSIS_VERSION = "1"
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
 
 class CredibilityEngine:
     """Main credibility scoring engine"""
@@ -28,7 +42,10 @@ class CredibilityEngine:
             "community_feedback": 0.30,
             "cross_source": 0.15
         }
-        self.ml_inference = NewsInference() if ML_AVAILABLE else None
+        # Shared per-process handle; the model is unpickled once, not per engine
+        self.ml_inference = get_inference() if ML_AVAILABLE else None
+        model_version = getattr(self.ml_inference, "version", None) or "heuristic"
+        self.analysis_version = f"{ANALYSIS_VERSION}:{model_version}"
     
     def compute_article_score(
         self, 
@@ -39,78 +56,140 @@ class CredibilityEngine:
         Compute overall credibility score for an article
         Returns: (score, status)
         """
+        return self.compute_scores([article], db)[0]
+    
+    def compute_scores(self, articles: List[Article], db: Session) -> List[Tuple[float, str, bool]]:
+        """
+        Batch version of compute_article_score: one model call for all texts,
+        and claims, rolling rating state, sources and story-cluster counts
+        loaded with one grouped query each instead of per article.
+        Returns (score, status, is_suspicious) per article, in order.
+        """
+        if not articles:
+            return []
+        article_ids = [a.id for a in articles]
+        
+        claims_by_article = defaultdict(list)
+        stats_by_article = {}
+        for chunk in chunked(article_ids, LOOKUP_CHUNK):
+            for claim in db.query(Claim).filter(Claim.article_id.in_(chunk)):
+                claims_by_article[claim.article_id].append(claim)
+            for stats in db.query(ArticleRatingStats).filter(ArticleRatingStats.article_id.in_(chunk)):
+                stats_by_article[stats.article_id] = stats
+        
+        # Rolling rating state not built yet (older articles): derive it from the ratings once
+        unbuilt = [a.id for a in articles if a.id not in stats_by_article]
+        if unbuilt:
+            stats_by_article.update(rating_stats.build(db, unbuilt))
+        
+        # Loaded into the identity map so article.source needs no extra query
+        source_ids = list({a.source_id for a in articles if a.source_id})
+        for chunk in chunked(source_ids, LOOKUP_CHUNK):
+            db.query(Source).filter(Source.id.in_(chunk)).all()
+        
+        cluster_ids = list({a.story_cluster_id for a in articles if getattr(a, "story_cluster_id", None)})
+        cluster_sources = {}
+        for chunk in chunked(cluster_ids, LOOKUP_CHUNK):
+            cluster_sources.update(
+                db.query(Article.story_cluster_id, func.count(func.distinct(Article.source_id)))
+                .filter(Article.story_cluster_id.in_(chunk))
+                .group_by(Article.story_cluster_id)
+            )
         
-        # Get component scores
-        source_score = self._compute_source_trust(article, db)
-        nlp_score = self._compute_nlp_score(article)
-        community_score = self._compute_community_score(article, db)
-        cross_source_score = self._compute_cross_source_score(article, db)
-        
-        # Fact vs Opinion Logic (Feature 3)
-        article.fact_opinion_ratio = self._analyze_fact_opinion_ratio(article.content)
-        
-        # Compute weighted average
-        overall_score = (
-            source_score * self.weights["source_trust"] +
-            nlp_score * self.weights["nlp_analysis"] +
-            community_score * self.weights["community_feedback"] +
-            cross_source_score * self.weights["cross_source"]
-        )
-        
-        # Determine status
-        status = self._determine_status(overall_score, article)
-
-        # Extract Signals for Highlighting (Feature 1)
-        signals = self._extract_signals(article.content)
-        article.hype_sentences = json.dumps(signals['hype_sentences'])
-        article.factual_sentences = json.dumps(signals['factual_sentences'])
-        
-        # Check for manipulation
-        is_suspicious = self._detect_manipulation(article, db)
+        # Text-derived parts only change with the content or the model
+        analyzed = {article.id: document for article, document in self.analyze_text(articles)}
         
-        # Auto soft-lock if suspicious
-        if is_suspicious and not article.is_soft_locked:
-            article.is_soft_locked = True
-            article.suspicious_activity_detected = True
-            article.soft_lock_reason = "Automatic soft-lock: Suspicious activity detected (voting pattern anomaly)"
+        results = []
+        for article in articles:
+            nlp_score = article.nlp_score
+            claims = claims_by_article.get(article.id, [])
             
-        # Extract claims if none exist (one-time extraction)
-        if not article.claims:
-            self._extract_claims(article, db)
-        
-        return overall_score, status, is_suspicious
-        return overall_score, status, is_suspicious
+            # Get component scores
+            source_score = self._compute_source_trust(article, db)
+            community_score = self._compute_community_score(article, db)
+            cross_source_score = self._compute_cross_source_score(
+                article, db, claims, cluster_sources.get(article.story_cluster_id, 0)
+            )
+            
+            # Compute weighted average
+            overall_score = (
+                source_score * self.weights["source_trust"] +
+                nlp_score * self.weights["nlp_analysis"] +
+                community_score * self.weights["community_feedback"] +
+                cross_source_score * self.weights["cross_source"]
+            )
+            
+            # Determine status
+            status = self._determine_status(overall_score, article)
+            
+            # Check for manipulation
+            is_suspicious = self._detect_manipulation(article, db, stats_by_article.get(article.id))
+            
+            # Auto soft-lock if suspicious
+            if is_suspicious and not article.is_soft_locked:
+                article.is_soft_locked = True
+                article.suspicious_activity_detected = True
+                article.soft_lock_reason = "Automatic soft-lock: Suspicious activity detected (voting pattern anomaly)"
+                
+            # Extract claims if none exist (once per content version)
+            if not claims and article.id in analyzed:
+                self._extract_claims(article, db, analyzed[article.id])
+            
+            results.append((overall_score, status, is_suspicious))
+        return results
+    
+    def analyze_text(self, articles: List[Article]) -> List[Tuple[Article, AnalyzedDocument]]:
+        """
+        Refresh the text-derived fields (nlp_score, fact/opinion ratio, hype and
+        factual sentences) of articles whose content hash or analysis version
+        changed; the rest keep their stored results. Returns the analyzed ones
+        with their AnalyzedDocument, for claim extraction.
+        """
+        stale = []
+        for article in articles:
+            digest = content_hash(article.content)
+            if (
+                article.content_hash != digest
+                or article.analysis_version != self.analysis_version
+                or article.nlp_score is None
+            ):
+                stale.append((article, digest))
+        if not stale:
+            return []
+        
+        # Each text is analyzed once; every component below reads the same document
+        documents = [AnalyzedDocument(article.content) for article, _ in stale]
+        nlp_scores = self.compute_nlp_scores([article.content for article, _ in stale], documents)
+        for (article, digest), nlp_score, document in zip(stale, nlp_scores, documents):
+            article.nlp_score = nlp_score
+            
+            # Fact vs Opinion Logic (Feature 3)
+            article.fact_opinion_ratio = self._analyze_fact_opinion_ratio(article.content, document)
+            
+            # Extract Signals for Highlighting (Feature 1)
+            signals = self._extract_signals(article.content, document)
+            article.hype_sentences = json.dumps(signals['hype_sentences'])
+            article.factual_sentences = json.dumps(signals['factual_sentences'])
+            
+            article.content_hash = digest
+            article.analysis_version = self.analysis_version
+        return [(article, document) for (article, _), document in zip(stale, documents)]
 
-    def _extract_signals(self, text: str) -> Dict[str, List[str]]:
+    def _extract_signals(self, text: str, document: Optional[AnalyzedDocument] = None) -> Dict[str, List[str]]:
         """Extract sentences for highlighting"""
-        import re
-        # Rudimentary sentence splitting
-        sentences = re.split(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s', text)
+        document = document or AnalyzedDocument(text)
+        hits = document.keywords
         
         hype = []
         factual = []
         
-        hype_keywords = [
-            "shocking", "bombshell", "destroyed", "eviscerated", "you won't believe", 
-            "miracle", "secret", "exposed", "shameful", "betrayal", "crisis", 
-            "catastrophe", "urgent", "breaking", "nightmare"
-        ]
-        
-        factual_keywords = [
-            "according to", "reported by", "study shows", "data indicates", 
-            "percent", "%", "evidence", "confirmed", "official", "stated",
-            "researchers", "statistics"
-        ]
-        
-        for sent in sentences:
-            s_lower = sent.lower()
-            
+        for start, end in document.sentences:
             # Hype priority
-            if any(k in s_lower for k in hype_keywords) or "!!!" in sent:
-                hype.append(sent)
+            if hits.within("hype", start, end):
+                hype.append(text[start:end])
             # Factual
-            elif any(k in s_lower for k in factual_keywords) or re.search(r'\d+', sent):
-                factual.append(sent)
+            elif hits.within("factual", start, end) or hits.within("number", start, end):
+                factual.append(text[start:end])
                 
         return {"hype_sentences": hype, "factual_sentences": factual}
     
@@ -140,29 +219,36 @@ class CredibilityEngine:
         NLP-based analysis: Hybrid approach using ML Model (if available) + Heuristics
         Returns 0-100 score
         """
+        heuristic_score = self._heuristic_nlp_score(article.content)
+        
+        # --- ML Layer ---
+        if self.ml_inference:
+            res = self.ml_inference.predict(article.content)
+            return self._blend_ml_score(heuristic_score, res)
+        
+        return heuristic_score
+    
+    def compute_nlp_scores(self, texts: List[str], documents: Optional[List[AnalyzedDocument]] = None) -> List[float]:
+        """Batch version of _compute_nlp_score: all texts go through the model in one call"""
+        documents = documents or [AnalyzedDocument(text) for text in texts]
+        heuristic_scores = [self._heuristic_nlp_score(text, document) for text, document in zip(texts, documents)]
+        if not self.ml_inference:
+            return heuristic_scores
+        results = self.ml_inference.predict_batch(texts, documents)
+        return [self._blend_ml_score(h, res) for h, res in zip(heuristic_scores, results)]
+    
+    def _heuristic_nlp_score(self, text: str, document: Optional[AnalyzedDocument] = None) -> float:
         heuristic_score = 50.0
-        content = article.content.lower()
+        document = document or AnalyzedDocument(text)
+        content = document.normalized
+        hits = document.keywords
         
         # --- Heuristic Layer ---
         # Sensationalism detection (negative indicators)
-        sensational_words = [
-            "shocking", "amazing", "unbelievable", "viral", "explosive",
-            "exclusive", "breaking", "urgent", "scandal", "bizarre"
-        ]
-        sensational_count = sum(1 for word in sensational_words if word in content)
-        heuristic_score -= sensational_count * 3
-        
-        # Factuality indicators (positive)
-        factual_patterns = [
-            r'\b\d+%\b',  # percentages
-            r'\b\d{4}-\d{2}-\d{2}\b',  # dates
-            r'according to',
-            r'research shows',
-            r'study found',
-            r'data indicates'
-        ]
-        factual_count = sum(1 for pattern in factual_patterns if re.search(pattern, content))
-        heuristic_score += factual_count * 5
+        heuristic_score -= hits.count("sensational") * 3
+        
+        # Factuality indicators (positive): percentages, dates, attributions
+        heuristic_score += hits.count("nlp_factual") * 5
         
         # Length check (longer = usually more detailed)
         if len(content) > 500:
@@ -170,85 +256,76 @@ class CredibilityEngine:
         elif len(content) < 100:
             heuristic_score -= 10
             
-        heuristic_score = max(0, min(100, heuristic_score))
-
-        # --- ML Layer ---
-        if self.ml_inference:
-            res = self.ml_inference.predict(article.content)
-            if "error" not in res:
-                # Prediction: 1 = Credible, 0 = Unreliable
-                # Confidence: 0.5 - 1.0 (usually)
-                ml_confidence = res['confidence']
-                is_credible = res['prediction'] == 1
-                
-                # Map to 0-100 score
-                if is_credible:
-                    ml_score = 50 + (ml_confidence * 50) # 75-100 usually
-                else:
-                    ml_score = 50 - (ml_confidence * 50) # 0-25 usually
-                
-                # Weighted average: 70% ML, 30% Heuristic
-                final_score = (ml_score * 0.7) + (heuristic_score * 0.3)
-                return final_score
+        return max(0, min(100, heuristic_score))
+    
+    def _blend_ml_score(self, heuristic_score: float, res: Dict) -> float:
+        if "error" in res:
+            return heuristic_score
+        # Prediction: 1 = Credible, 0 = Unreliable
+        # Confidence: 0.5 - 1.0 (usually)
+        ml_confidence = res['confidence']
+        is_credible = res['prediction'] == 1
+        
+        # Map to 0-100 score
+        if is_credible:
+            ml_score = 50 + (ml_confidence * 50) # 75-100 usually
+        else:
+            ml_score = 50 - (ml_confidence * 50) # 0-25 usually
         
-        return heuristic_score
+        # Weighted average: 70% ML, 30% Heuristic
+        return (ml_score * 0.7) + (heuristic_score * 0.3)
+    
+    def compute_initial_scores(self, articles: List[Article], db: Optional[Session] = None) -> List[Tuple[float, str]]:
+        """
+        Score freshly submitted articles (no ratings or claims yet) in one batch.
+        Sets the breakdown fields on each article; community and cross-source
+        parts start neutral until votes/claims arrive. With db, the articles
+        must be flushed: their claims are extracted here, since later rescores
+        only extract them when the text is re-analyzed.
+        """
+        analyzed = self.analyze_text(articles)
+        if db is not None:
+            for article, document in analyzed:
+                self._extract_claims(article, db, document)
+        results = []
+        for article in articles:
+            nlp_score = article.nlp_score
+            article.source_trust_score = self._compute_source_trust(article, None)
+            article.community_score = 50.0
+            article.cross_source_score = 40.0
+            
+            overall_score = (
+                article.source_trust_score * self.weights["source_trust"] +
+                nlp_score * self.weights["nlp_analysis"] +
+                article.community_score * self.weights["community_feedback"] +
+                article.cross_source_score * self.weights["cross_source"]
+            )
+            status = self._determine_status(overall_score, article)
+            article.overall_credibility = overall_score
+            article.credibility_status = status
+            results.append((overall_score, status))
+        return results
     
     def _compute_community_score(self, article: Article, db: Session) -> float:
         """
         Community weighted opinion score
-        Based on user ratings weighted by user credibility
+        Based on user ratings weighted by user credibility, kept as running
+        aggregates on the article and updated with each vote (community.py)
         """
-        ratings = db.query(Rating).filter(Rating.article_id == article.id).all()
-        
-        if not ratings:
-            return 50.0  # Neutral if no ratings
-        
-        # Calculate weighted average
-        total_weight = 0
-        weighted_sum = 0
-        
-        for rating in ratings:
-            user = rating.user
-            # Vote weight logic:
-            # Base weight comes from rating.vote_weight (defaults to 1.0)
-            # Users with high credibility (>75) get 2x impact
-            # Users with low credibility (<40) get 0.5x impact
-            user_impact = 1.0
-            if user.credibility_score > 75:
-                user_impact = 2.0
-            elif user.credibility_score < 40:
-                user_impact = 0.5
-                
-            vote_weight = rating.vote_weight * user_impact
-            
-            weighted_sum += rating.credibility_rating * vote_weight
-            total_weight += vote_weight
-        
-        if total_weight == 0:
-            return 50.0
-        
-        return weighted_sum / total_weight
+        if article.community_total_weight is None:
+            # Aggregates not built yet (older article): derive them from the ratings once
+            community.build(db, article)
+        return community.score(article)
     
-    def _analyze_fact_opinion_ratio(self, content: str) -> float:
+    def _analyze_fact_opinion_ratio(self, content: str, document: Optional[AnalyzedDocument] = None) -> float:
         """
         Estimate Fact vs Opinion ratio (0.0 = Pure Opinion, 1.0 = Pure Fact)
         """
-        content = content.lower()
-        
-        # Fact indicators
-        fact_patterns = [
-            r'\d+%', r'\d{4}', r'\$', r'according to', r'report', r'study', 
-            r'evidence', r'data', r'statistics', r'record', r'official'
-        ]
-        
-        # Opinion indicators
-        opinion_patterns = [
-            r'i think', r'believe', r'feel', r'opinion', r'should', 
-            r'must', r'best', r'worst', r'amazing', r'terrible', r'wrong'
-        ]
+        hits = (document or AnalyzedDocument(content)).keywords
         
-        fact_hits = sum(1 for p in fact_patterns if re.search(p, content))
-        opinion_hits = sum(1 for p in opinion_patterns if re.search(p, content))
+        # Distinct fact indicators (numbers, money, attributions) vs opinion indicators
+        fact_hits = hits.count("fact")
+        opinion_hits = hits.count("opinion")
         
         total = fact_hits + opinion_hits
         if total == 0:
@@ -256,29 +333,46 @@ class CredibilityEngine:
             
         return fact_hits / total
     
-    def _compute_cross_source_score(self, article: Article, db: Session) -> float:
+    def _compute_cross_source_score(
+        self,
+        article: Article,
+        db: Session,
+        claims: Optional[List[Claim]] = None,
+        cluster_sources: Optional[int] = None
+    ) -> float:
         """
         Check corroboration across independent sources
         Higher = more sources confirm the claim
         """
-        claims = db.query(Claim).filter(Claim.article_id == article.id).all()
+        # Other outlets that carried the same story (near-duplicate cluster)
+        cluster_id = getattr(article, "story_cluster_id", None)
+        if cluster_sources is None:
+            cluster_sources = cluster_source_count(db, cluster_id) if cluster_id else 0
+        other_sources = max(0, cluster_sources - 1)
+        cluster_score = self._corroboration_tier(other_sources) if other_sources else 0
+        
+        if claims is None:
+            claims = db.query(Claim).filter(Claim.article_id == article.id).all()
         
         if not claims:
-            return 40.0  # Low score if no claims extracted
+            return max(40.0, cluster_score)  # Low score if no claims extracted
         
         total_corroboration = 0
         for claim in claims:
-            corr_count = claim.corroboration_count
-            # Score based on # of sources: 1=20, 2-3=50, 4+=90
-            if corr_count >= 4:
-                total_corroboration += 90
-            elif corr_count >= 2:
-                total_corroboration += 50
-            elif corr_count >= 1:
-                total_corroboration += 20
+            total_corroboration += self._corroboration_tier(claim.corroboration_count)
         
         avg_corroboration = total_corroboration / len(claims) if claims else 40
-        return avg_corroboration
+        return max(avg_corroboration, cluster_score)
+    
+    def _corroboration_tier(self, corr_count: int) -> float:
+        """Score based on # of sources: 1=20, 2-3=50, 4+=90"""
+        if corr_count >= 4:
+            return 90
+        elif corr_count >= 2:
+            return 50
+        elif corr_count >= 1:
+            return 20
+        return 0
     
     def _determine_status(self, score: float, article: Article) -> str:
         """Determine credibility status badge"""
@@ -289,79 +383,34 @@ class CredibilityEngine:
         else:
             return "High Risk"
     
-    def _detect_manipulation(self, article: Article, db: Session) -> bool:
+    def _detect_manipulation(
+        self,
+        article: Article,
+        db: Session,
+        stats: Optional[ArticleRatingStats] = None,
+    ) -> bool:
         """
-        Detect suspicious activity patterns:
-        - Sudden voting spikes
-        - New account mass voting
-        - Coordinated rating patterns
-        - Extreme score divergence
+        Detect suspicious activity patterns from the article's rolling rating
+        state, kept up to date with each vote (rating_stats.py)
         """
-        ratings = db.query(Rating).filter(Rating.article_id == article.id).all()
-        
-        if len(ratings) < 3:
-            return False
-        
-        # 1. Check for time-based spike (many ratings in short time)
-        now = datetime.utcnow()
-        recent_ratings = [r for r in ratings if (now - r.created_at).total_seconds() < 3600]
-        
-        if len(recent_ratings) >= 5 and len(recent_ratings) > len(ratings) * 0.7:
-            # 70% of ratings in last hour = suspicious
-            return True
-        
-        # 2. Check for new account activity
-        new_accounts = [r for r in ratings if (now - r.user.created_at).days < 1]
-        if len(new_accounts) > len(ratings) * 0.5 and len(ratings) >= 5:
-            return True
-        
-        # 3. Check for extreme score clustering
-        if len(ratings) >= 5:
-            scores = [r.credibility_rating for r in ratings]
-            avg_score = sum(scores) / len(scores)
-            
-            # If all ratings are similar (within 15 points) = suspicious uniformity
-            score_variance = sum((s - avg_score) ** 2 for s in scores) / len(scores)
-            if score_variance < 50:  # Very low variance = coordinated voting
-                return True
-        
-        
-        if len(ratings) >= 10:
-            scores = [r.credibility_rating for r in ratings]
-            high_ratings = len([s for s in scores if s > 75])
-            low_ratings = len([s for s in scores if s < 25])
-            
-            if (high_ratings + low_ratings) / len(scores) > 0.8:
-                # More than 80% are extreme = manipulation
-                return True
-        
-        # 5. Check for IP Clustering (Brigading)
-        # Assuming model has ip_address field now
-        if len(ratings) >= 5:
-            # Filter for ratings with IP
-            valid_ips = [r.ip_address for r in ratings if getattr(r, 'ip_address', None)]
-            if valid_ips:
-                from collections import Counter
-                ip_counts = Counter(valid_ips)
-                # If any single IP accounts for > 40% of votes
-                most_common_ip, count = ip_counts.most_common(1)[0]
-                if count > len(ratings) * 0.4 and count > 2:
-                    return True
+        if stats is None:
+            stats = db.get(ArticleRatingStats, article.id)
+        if stats is None:
+            # Rolling state not built yet (older article): derive it from the ratings once
+            stats = rating_stats.build(db, [article.id])[article.id]
+        return rating_stats.is_suspicious(db, stats)
 
-        return False
-
-    def _extract_claims(self, article: Article, db: Session):
+    def _extract_claims(self, article: Article, db: Session, document: Optional[AnalyzedDocument] = None):
         """
         Extract checkable claims from content using regex heuristics
         Examples: quotes, statistics, 'according to'
         """
-        content = article.content
-        
-        # Regex for quotes
-        quotes = re.findall(r'"([^"]*)"', content)
+        document = document or AnalyzedDocument(article.content)
+        content = document.text
         
-        # Regex for stats
-        stats = re.findall(r'(\d+(?:%| percent| million| billion))', content)
+        # Quoted passages and stats, as located by the document's scan
+        quotes = [content[start:end] for start, end in document.quotes]
+        stats = [content[start:end] for start, end in document.statistics]
         
         for quote in quotes:
             if len(quote.split()) > 5: # Only long enough quotes
@@ -394,6 +443,7 @@ class CredibilityScoreManager:
     
     def update_article_scores(self, article: Article) -> float:
         """Update article credibility scores"""
+        pending = {article.id: article.rescore_pending}
         score, status, is_suspicious = self.engine.compute_article_score(article, self.db)
         
         # Log the change
@@ -418,36 +468,93 @@ class CredibilityScoreManager:
         )
         self.db.add(audit_log)
         
+        self._clear_rescore_pending(pending)
         self.db.commit()
         return score
     
+    def update_scores_batch(self, articles: List[Article]) -> List[float]:
+        """Batch version of update_article_scores with a single commit"""
+        pending = {article.id: article.rescore_pending for article in articles}
+        results = self.engine.compute_scores(articles, self.db)
+        for article, (score, status, is_suspicious) in zip(articles, results):
+            old_score = article.overall_credibility
+            article.overall_credibility = score
+            article.credibility_status = status
+            article.suspicious_activity_detected = is_suspicious
+            if is_suspicious:
+                article.is_soft_locked = True
+                article.soft_lock_reason = "Unusual voting activity detected"
+            self.db.add(AuditLog(
+                article_id=article.id,
+                old_score=old_score,
+                new_score=score,
+                reason=f"Auto-computed: {status}",
+                is_admin_action=False
+            ))
+        self._clear_rescore_pending(pending)
+        self.db.commit()
+        return [score for score, _, _ in results]
+    
+    def _clear_rescore_pending(self, pending: Dict[int, Optional[int]]):
+        """
+        Reset the pending-vote counts read with the articles, just before the
+        scoring commit. A count that moved since (a vote committed while
+        scoring) is left for the next rescore.
+        """
+        seen = [{"aid": article_id, "seen": count} for article_id, count in pending.items() if count]
+        if seen:
+            articles = Article.__table__
+            self.db.execute(
+                update(articles)
+                .where(articles.c.id == bindparam("aid"), articles.c.rescore_pending == bindparam("seen"))
+                .values(rescore_pending=0),
+                seen,
+            )
+    
+    def rescore_all(self, chunk_size: int = 200) -> int:
+        """Rescore every article in id order, one batch per chunk. Returns the count."""
+        total = 0
+        last_id = 0
+        while True:
+            articles = (
+                self.db.query(Article)
+                .filter(Article.id > last_id)
+                .order_by(Article.id)
+                .limit(chunk_size)
+                .all()
+            )
+            if not articles:
+                return total
+            last_id = articles[-1].id
+            self.update_scores_batch(articles)
+            total += len(articles)
+    
     def recompute_user_credibility(self, user: User) -> float:
         """
         Recompute user credibility based on rating accuracy
         Compare user ratings to actual article scores
         """
-        ratings = self.db.query(Rating).filter(Rating.user_id == user.id).all()
+        # Accuracy: how close user ratings are to actual scores (one aggregate query)
+        total, accurate_ratings = user_credibility.rating_accuracy(self.db, user.id)
         
-        if not ratings or len(ratings) < 5:
+        if total < user_credibility.MIN_RATINGS:
             return 50.0  # Need minimum sample
         
-        # Check accuracy: how close user ratings are to actual scores
-        accurate_ratings = 0
-        for rating in ratings:
-            article = rating.article
-            difference = abs(rating.credibility_rating - article.overall_credibility)
-            
-            if difference < 10:  # Within 10 points = accurate
-                accurate_ratings += 1
-        
-        accuracy_percentage = (accurate_ratings / len(ratings)) * 100
-        
-        # Map accuracy to credibility score (40-80 range)
-        credibility = 40 + (accuracy_percentage / 100) * 40
+        credibility = user_credibility.credibility_from_accuracy(accurate_ratings, total)
         
+        old_impact = community.user_impact(user.credibility_score)
         user.credibility_score = credibility
+        moved = []
+        if community.user_impact(credibility) != old_impact:
+            # Tier changed: re-weigh this user's votes in the community aggregates
+            self.db.flush()
+            moved = community.reweigh_users(self.db, [user.id])
         self.db.commit()
         
+        from rescoring import rescore_queue
+        for article_id in moved:
+            rescore_queue.mark(article_id)
+        
         return credibility
 
 
@@ -0,0 +1,268 @@
+"""
+Background article content extraction.
+create_article no longer fetches the page on the request thread: articles
+submitted without content are stored with extraction_status="pending" and
+queued here. A small pool of asyncio workers fetches the page through the
+shared outbound client (at most EXTRACT_MAX_BYTES of it), extracts the
+text off the event loop (extractors.py), then writes it and rescores the
+article. Clients poll (or long-poll with ?wait=) the
+/api/articles/{id}/extraction endpoint for completion.
+
+Every process (gunicorn worker) runs its own queue, and each re-queues the
+pending articles at startup, so a job is claimed in the database before it
+runs: only the worker that moves the row from "pending" to "processing"
+extracts it. A claim left behind by a crashed worker is taken over once
+EXTRACTION_LEASE_SECONDS pass without the row changing.
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import or_, update
+
+import outbound
+from database import SessionLocal
+from extraction_cache import extraction_cache
+from extractors import MAX_EXTRACT_BYTES, extract_text
+from models import Article
+
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "4"))
+MAX_WAIT_SECONDS = 30
+EXTRACTION_LEASE_SECONDS = int(os.getenv("EXTRACTION_LEASE_SECONDS", "600"))
+
+# Publishers serve bot user agents a consent page or nothing at all
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+FALLBACK_CONTENT = "Content could not be extracted automatically. Analysis based on metadata only."
+
+PENDING = "pending"
+PROCESSING = "processing"  # claimed by a worker (still pending for clients)
+COMPLETE = "complete"
+FAILED = "failed"
+
+
+async def read_capped(response, max_bytes: int = MAX_EXTRACT_BYTES) -> List[bytes]:
+    """Download at most max_bytes of the body; the rest is never read"""
+    chunks, received = [], 0
+    async for chunk in response.aiter_bytes():
+        chunks.append(chunk)
+        received += len(chunk)
+        if received >= max_bytes:
+            break
+    return chunks
+
+
+async def fetch_article_text(url: str) -> Tuple[str, Optional[str]]:
+    """
+    Returns (text, error); text is empty when the page could not be used.
+    Served from the extraction cache while fresh, revalidated with a
+    conditional GET once stale.
+    """
+    cached = await asyncio.to_thread(extraction_cache.get, url)
+    if cached and cached.is_fresh():
+        return cached.text, None
+
+    headers = dict(BROWSER_HEADERS, **(cached.validators() if cached else {}))
+    try:
+        async with outbound.stream(url, headers=headers) as response:
+            if response.status_code == 304 and cached:
+                await asyncio.to_thread(
+                    extraction_cache.touch, url, response.headers.get("etag"), response.headers.get("last-modified")
+                )
+                return cached.text, None
+            if response.status_code != 200:
+                return "", f"HTTP {response.status_code}"
+            chunks = await read_capped(response)
+            encoding = response.charset_encoding
+            etag, last_modified = response.headers.get("etag"), response.headers.get("last-modified")
+        # Parsing is CPU-bound: keep it off the event loop
+        text = await asyncio.to_thread(extract_text, chunks, encoding)
+        if not text:
+            return "", "No paragraph text found"
+        await asyncio.to_thread(extraction_cache.put, url, text, etag, last_modified)
+        return text, None
+    except Exception as e:
+        print(f"Extraction failed for {url}: {e}")
+        if cached:
+            # Publisher unreachable: a stale copy beats no content
+            return cached.text, None
+        return "", str(e)[:255] or type(e).__name__
+
+
+def _claimable():
+    """Rows a worker may claim: pending, or claimed by a worker that stopped touching them"""
+    lease_expired = datetime.utcnow() - timedelta(seconds=EXTRACTION_LEASE_SECONDS)
+    return or_(
+        Article.extraction_status == PENDING,
+        (Article.extraction_status == PROCESSING) & (Article.updated_at < lease_expired),
+    )
+
+
+def claim_extraction(article_id: int) -> bool:
+    """Atomically claim an article's extraction for this worker; False if another has it"""
+    db = SessionLocal()
+    try:
+        claimed = db.execute(
+            update(Article)
+            .where(Article.id == article_id, _claimable())
+            .values(extraction_status=PROCESSING)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return claimed == 1
+    finally:
+        db.close()
+
+
+def finish_extraction(article_id: int, text: str, error: Optional[str]) -> Optional[str]:
+    """Store the extracted text, cluster and rescore the article. Returns the final status."""
+    # Imported here: credibility_engine pulls in the ML stack
+    from credibility_engine import CredibilityScoreManager
+    from story_clusters import assign_clusters
+
+    db = SessionLocal()
+    try:
+        article = db.get(Article, article_id)
+        if article is None:
+            return None
+        content = text or FALLBACK_CONTENT
+        assign_clusters(db, [(article.id, article.title, content)])
+        db.refresh(article)
+
+        article.content = content
+        db.commit()
+        try:
+            CredibilityScoreManager(db).update_article_scores(article)
+        except Exception as e:
+            print(f"Scoring after extraction failed for article {article_id}: {e}")
+            db.rollback()
+
+        # Only flip the status once the scores match the new content
+        article.extraction_status = COMPLETE if text else FAILED
+        article.extraction_error = None if text else error
+        db.commit()
+        return article.extraction_status
+    finally:
+        db.close()
+
+
+class ExtractionQueue:
+    """
+    In-process job queue drained by EXTRACTION_WORKERS asyncio tasks.
+    enqueue() is safe to call from FastAPI's sync endpoint threads. Jobs that
+    were pending when the process stopped are re-queued by recover().
+    """
+
+    def __init__(self, workers: int = EXTRACTION_WORKERS):
+        self.workers = workers
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._queued: Set[int] = set()
+        self._waiters: Dict[int, List[asyncio.Future]] = {}
+        self.processed = 0
+        self.failed = 0
+
+    def start(self):
+        """Spawn the workers on the running loop (call from the app startup hook)"""
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queued.clear()
+        self._loop = None
+
+    def enqueue(self, article_id: int, url: str) -> bool:
+        """Queue an article for extraction; False if the workers are not running"""
+        if self._loop is None or self._loop.is_closed():
+            return False
+        self._loop.call_soon_threadsafe(self._put, article_id, url)
+        return True
+
+    def _put(self, article_id: int, url: str):
+        if article_id not in self._queued:
+            self._queued.add(article_id)
+            self._queue.put_nowait((article_id, url))
+
+    def recover(self) -> int:
+        """
+        Re-queue every article still waiting for extraction (e.g. after a
+        restart). Every worker does this; the claim in process() makes sure
+        only one of them runs each job.
+        """
+        db = SessionLocal()
+        try:
+            rows = db.query(Article.id, Article.url).filter(_claimable()).all()
+        finally:
+            db.close()
+        for article_id, url in rows:
+            self.enqueue(article_id, url)
+        return len(rows)
+
+    async def wait(self, article_id: int, timeout: float) -> bool:
+        """Wait until a queued article finishes; False on timeout or if it is not queued"""
+        if article_id not in self._queued or self._loop is None:
+            return False
+        future = self._loop.create_future()
+        self._waiters.setdefault(article_id, []).append(future)
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            waiters = self._waiters.get(article_id)
+            if waiters and future in waiters:
+                waiters.remove(future)
+                if not waiters:
+                    del self._waiters[article_id]
+
+    def _notify(self, article_id: int, status: Optional[str]):
+        for future in self._waiters.pop(article_id, []):
+            if not future.done():
+                future.set_result(status)
+
+    async def process(self, article_id: int, url: str) -> Optional[str]:
+        """Extract one article; None if it is gone or another worker claimed it"""
+        if not await asyncio.to_thread(claim_extraction, article_id):
+            return None
+        text, error = await fetch_article_text(url)
+        return await asyncio.to_thread(finish_extraction, article_id, text, error)
+
+    async def _worker(self):
+        while True:
+            article_id, url = await self._queue.get()
+            status = None
+            try:
+                status = await self.process(article_id, url)
+                if status is not None:
+                    self.processed += 1
+                if status == FAILED:
+                    self.failed += 1
+            except Exception as e:
+                print(f"Extraction job for article {article_id} failed: {e}")
+            finally:
+                self._queued.discard(article_id)
+                self._notify(article_id, status)
+                self._queue.task_done()
+
+    def stats(self) -> Dict:
+        return {
+            "workers": len(self._tasks),
+            "queued": len(self._queued),
+            "processed": self.processed,
+            "failed": self.failed,
+            "cache": extraction_cache.stats(),
+        }
+
+
+extraction_queue = ExtractionQueue()
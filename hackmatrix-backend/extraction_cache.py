@@ -0,0 +1,248 @@
+"""
+Persistent cache of extracted article text.
+Entries are keyed by canonical URL and point at content-addressed blobs
+(sha256 of the text, zstd-compressed when `zstandard` is installed, gzip
+otherwise), so the same wire story under several URLs is stored once. The
+index keeps fetch time and the HTTP validators used to revalidate with a
+conditional GET; total blob size is bounded with LRU eviction.
+
+    fresh entry (< EXTRACTION_CACHE_TTL)  -> no network at all
+    stale entry                           -> If-None-Match / If-Modified-Since
+"""
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", "./extraction_cache")
+MAX_CACHE_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+CACHE_TTL_SECONDS = int(os.getenv("EXTRACTION_CACHE_TTL", str(24 * 3600)))
+
+# Query parameters that never change the page content
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "cmpid", "ocid"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonical_url(url: str) -> str:
+    """Lowercase scheme/host, drop fragment, default port and tracking params, sort the query"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _compress(data: bytes):
+    if ZSTD_AVAILABLE:
+        return zstandard.ZstdCompressor(level=10).compress(data), "zstd"
+    return gzip.compress(data, compresslevel=6), "gzip"
+
+
+def _decompress(blob: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise ValueError("zstd blob but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    if codec != "gzip":
+        raise ValueError(f"unknown codec {codec!r}")
+    return gzip.decompress(blob)
+
+
+# What reading a lost, truncated or corrupt blob raises (UnicodeDecodeError is a ValueError)
+BLOB_ERRORS = (OSError, ValueError, EOFError, zlib.error) + ((zstandard.ZstdError,) if ZSTD_AVAILABLE else ())
+
+
+@dataclass
+class CachedExtraction:
+    url: str
+    text: str
+    content_hash: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def is_fresh(self, ttl: float = CACHE_TTL_SECONDS) -> bool:
+        return time.time() - self.fetched_at < ttl
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional-GET headers for revalidating this entry"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ExtractionCache:
+    """SQLite index + compressed blob files under `directory`; safe to share between threads"""
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.join(self.directory, "blobs"), exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.directory, "index.db"), check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " url TEXT PRIMARY KEY, content_hash TEXT NOT NULL, codec TEXT NOT NULL,"
+                " size INTEGER NOT NULL, fetched_at REAL NOT NULL, last_access REAL NOT NULL,"
+                " etag TEXT, last_modified TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_last_access ON entries (last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_content_hash ON entries (content_hash)")
+            self._conn = conn
+        return self._conn
+
+    def _blob_path(self, digest: str, codec: str) -> str:
+        return os.path.join(self.directory, "blobs", digest[:2], f"{digest}.{codec}")
+
+    def get(self, url: str) -> Optional[CachedExtraction]:
+        """Cached extraction for url (fresh or not), or None"""
+        key = canonical_url(url)
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT content_hash, codec, fetched_at, etag, last_modified FROM entries WHERE url = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            digest, codec, fetched_at, etag, last_modified = row
+            try:
+                with open(self._blob_path(digest, codec), "rb") as f:
+                    text = _decompress(f.read(), codec).decode("utf-8")
+            except BLOB_ERRORS as e:
+                # Blob lost or corrupt: forget the entry so the page is refetched
+                print(f"Extraction cache blob unreadable for {key}: {e}")
+                db.execute("DELETE FROM entries WHERE url = ?", (key,))
+                db.commit()
+                self.misses += 1
+                return None
+            db.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), key))
+            db.commit()
+            self.hits += 1
+        return CachedExtraction(key, text, digest, fetched_at, etag, last_modified)
+
+    def put(self, url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> str:
+        """Store extracted text for url; returns its content hash"""
+        key = canonical_url(url)
+        digest = content_hash(text)
+        blob, codec = _compress(text.encode("utf-8"))
+        path = self._blob_path(digest, codec)
+        now = time.time()
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(blob)
+                os.replace(tmp, path)
+            db = self._db()
+            old = db.execute("SELECT content_hash, codec FROM entries WHERE url = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO entries (url, content_hash, codec, size, fetched_at, last_access, etag, last_modified)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, digest, codec, len(blob), now, now, etag, last_modified),
+            )
+            if old and old[0] != digest:
+                self._drop_blob_if_unused(db, *old)
+            db.commit()
+            self._evict(db)
+        return digest
+
+    def touch(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Mark an entry as just revalidated (HTTP 304)"""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "UPDATE entries SET fetched_at = ?, last_access = ?,"
+                " etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (now, now, etag, last_modified, canonical_url(url)),
+            )
+            db.commit()
+
+    def _drop_blob_if_unused(self, db: sqlite3.Connection, digest: str, codec: str):
+        if db.execute("SELECT 1 FROM entries WHERE content_hash = ? LIMIT 1", (digest,)).fetchone() is None:
+            try:
+                os.remove(self._blob_path(digest, codec))
+            except OSError:
+                pass
+
+    def _total_bytes(self, db: sqlite3.Connection) -> int:
+        # Shared blobs are stored once, so count each content hash once
+        return db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM entries GROUP BY content_hash)"
+        ).fetchone()[0]
+
+    def _evict(self, db: sqlite3.Connection):
+        """Drop least recently used entries until the blobs fit in max_bytes"""
+        total = self._total_bytes(db)
+        if total <= self.max_bytes:
+            return
+        for url, digest, codec in db.execute(
+            "SELECT url, content_hash, codec FROM entries ORDER BY last_access"
+        ).fetchall():
+            db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self.evictions += 1
+            if db.execute("SELECT 1 FROM entries WHERE content_hash = ? LIMIT 1", (digest,)).fetchone() is None:
+                total -= self._blob_size(digest, codec)
+                self._drop_blob_if_unused(db, digest, codec)
+            if total <= self.max_bytes:
+                break
+        db.commit()
+
+    def _blob_size(self, digest: str, codec: str) -> int:
+        try:
+            return os.path.getsize(self._blob_path(digest, codec))
+        except OSError:
+            return 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            db = self._db()
+            entries = db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            total = self._total_bytes(db)
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "codec": "zstd" if ZSTD_AVAILABLE else "gzip",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+        }
+
+
+extraction_cache = ExtractionCache()
@@ -0,0 +1,116 @@
+"""
+Article text extractors.
+The default "stream" backend feeds the page through the stdlib incremental
+HTMLParser chunk by chunk: no tree is built, script/style/nav/etc. content is
+dropped as soon as it is seen and only <p> text is kept. The previous
+BeautifulSoup(html.parser) + find_all("p") behaviour is the "bs4" backend and
+the fallback when the stream backend finds nothing. Pick one with
+EXTRACTOR_BACKEND; register more in EXTRACTORS.
+"""
+import codecs
+import os
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterable, List, Optional
+
+from bs4 import BeautifulSoup
+
+MAX_EXTRACT_BYTES = int(os.getenv("EXTRACT_MAX_BYTES", str(2 * 1024 * 1024)))
+EXTRACTOR_BACKEND = os.getenv("EXTRACTOR_BACKEND", "stream")
+
+# Never article text, and often most of a news page's bytes
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "nav", "header", "footer", "aside", "form", "iframe"}
+
+
+class ParagraphParser(HTMLParser):
+    """Collects the text of <p> elements outside SKIP_TAGS while the page is fed in"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs: List[str] = []
+        self._current: Optional[List[str]] = None
+        self._skip_depth = 0
+
+    def _flush(self):
+        if self._current is not None:
+            self.paragraphs.append("".join(self._current))
+            self._current = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "p":
+            self._flush()  # </p> is optional in HTML
+            self._current = []
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "p":
+            self._flush()
+
+    def handle_data(self, data):
+        if self._current is not None and not self._skip_depth:
+            self._current.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def capped(chunks: Iterable[bytes], max_bytes: int = MAX_EXTRACT_BYTES) -> Iterable[bytes]:
+    """Yield chunks until max_bytes have been produced"""
+    remaining = max_bytes
+    for chunk in chunks:
+        if remaining <= 0:
+            return
+        yield chunk[:remaining]
+        remaining -= len(chunk)
+
+
+def extract_stream(chunks: Iterable[bytes], encoding: Optional[str] = None) -> str:
+    decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    parser = ParagraphParser()
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk))
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    return " ".join(parser.paragraphs)
+
+
+def extract_bs4(chunks: Iterable[bytes], encoding: Optional[str] = None) -> str:
+    """Rudimentary text extraction: all paragraphs joined"""
+    soup = BeautifulSoup(b"".join(chunks), "html.parser", from_encoding=encoding)
+    return " ".join(p.get_text() for p in soup.find_all("p"))
+
+
+EXTRACTORS: Dict[str, Callable[[Iterable[bytes], Optional[str]], str]] = {
+    "stream": extract_stream,
+    "bs4": extract_bs4,
+}
+
+
+def extract_text(
+    chunks: Iterable[bytes],
+    encoding: Optional[str] = None,
+    backend: Optional[str] = None,
+    max_bytes: int = MAX_EXTRACT_BYTES,
+) -> str:
+    """Paragraph text of an HTML page given as byte chunks (at most max_bytes are read)"""
+    backend = backend or EXTRACTOR_BACKEND
+    if backend not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor backend: {backend}")
+    chunks = list(capped(chunks, max_bytes))
+    if encoding:
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            encoding = None  # bogus charset header
+    try:
+        text = EXTRACTORS[backend](chunks, encoding).strip()
+    except Exception as e:
+        print(f"Extractor '{backend}' failed: {e}")
+        text = ""
+    if not text and backend != "bs4":
+        # Markup the streaming parser could not make sense of
+        text = extract_bs4(chunks, encoding).strip()
+    return text
@@ -0,0 +1,143 @@
+"""
+Incremental RSS/Atom parsing.
+Items are emitted as soon as their closing tag is seen and parsing stops
+once the per-feed limit is reached, so cost scales with the items we keep
+rather than with the size of the document.
+"""
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+import xml.etree.ElementTree as ET
+
+ITEM_TAGS = {"item", "entry"}
+MEDIA_NS = "http://search.yahoo.com/mrss/"
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1] if "}" in tag else tag
+
+
+def _text(elem: Optional[ET.Element]) -> str:
+    return (elem.text or "").strip() if elem is not None else ""
+
+
+def _parse_datetime(value: str) -> Optional[datetime]:
+    """RFC 822 (RSS) or ISO 8601 (Atom, dc:date) to naive UTC, like parse_date()"""
+    if not value:
+        return None
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def element_to_item(elem: ET.Element, feed_info: Dict) -> Dict:
+    """Normalize an <item>/<entry> element into the dict shape get_all_feeds produces"""
+    children = {}
+    link = ""
+    image_url = None
+    media_url = None
+
+    for child in elem:
+        name = _local(child.tag)
+        if name == "link":
+            href = child.get("href")
+            if href is None:
+                # RSS: <link>url</link>
+                link = link or _text(child)
+            elif child.get("type", "").startswith("image/"):
+                image_url = image_url or href
+            elif child.get("rel", "alternate") == "alternate":
+                link = link or href
+        elif name == "content" and child.tag.startswith("{" + MEDIA_NS):
+            media_url = media_url or child.get("url")
+        elif name == "enclosure" and child.get("type", "").startswith("image/"):
+            image_url = image_url or child.get("url")
+        else:
+            children.setdefault(name, child)
+
+    summary = _text(children.get("description")) or _text(children.get("summary")) or _text(children.get("content"))
+    published = None
+    for field in ("pubDate", "published", "date", "updated"):
+        published = _parse_datetime(_text(children.get(field)))
+        if published:
+            break
+
+    return {
+        "title": _text(children.get("title")),
+        "link": link or _text(children.get("guid")) or _text(children.get("id")),
+        "summary": summary,
+        "published_at": published or datetime.utcnow(),
+        "source": feed_info["name"],
+        "category": feed_info["category"],
+        # media:content wins, matching normalize_entries()
+        "image_url": media_url or image_url,
+    }
+
+
+class IncrementalFeedParser:
+    """
+    Push-based parser: feed() it byte chunks as they arrive and it returns the
+    items completed so far. Raises xml.etree.ElementTree.ParseError on
+    malformed documents so callers can fall back to feedparser.
+    """
+
+    def __init__(self, feed_info: Dict, limit: int = 10):
+        self.feed_info = feed_info
+        self.limit = limit
+        self.count = 0
+        self.bytes_read = 0
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._stack: List[ET.Element] = []
+
+    @property
+    def done(self) -> bool:
+        return self.count >= self.limit
+
+    def feed(self, chunk: bytes) -> List[Dict]:
+        if self.done:
+            return []
+        self.bytes_read += len(chunk)
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> List[Dict]:
+        if self.done:
+            return []
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> List[Dict]:
+        items = []
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._stack.append(elem)
+                continue
+            self._stack.pop()
+            if _local(elem.tag) not in ITEM_TAGS:
+                continue
+            items.append(element_to_item(elem, self.feed_info))
+            self.count += 1
+            # Release the parsed subtree; only the kept dict survives
+            elem.clear()
+            if self._stack:
+                self._stack[-1].remove(elem)
+            if self.done:
+                break
+        return items
+
+
+def iter_feed_items(chunks: Iterable[bytes], feed_info: Dict, limit: int = 10) -> Iterator[Dict]:
+    """Yield normalized items from a chunked document, stopping after `limit`"""
+    parser = IncrementalFeedParser(feed_info, limit)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
+    yield from parser.close()
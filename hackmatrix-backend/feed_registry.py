@@ -0,0 +1,155 @@
+"""
+Database-backed feed registry.
+Feeds live in the `feeds` table next to their Source. The poller schedules
+each one individually and this module persists its schedule, validators and
+health counters after every poll pass.
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Feed
+from rss_service import FEEDS, FeedPoller, FeedState, POLL_INTERVAL_SECONDS
+from source_registry import resolve_sources
+
+COUNTERS = ("fetch_count", "error_count", "not_modified_count", "change_count", "total_latency_ms")
+
+# Counter values already written per feed url, so several workers can add
+# their own deltas instead of overwriting each other's totals
+_persisted: Dict[str, Dict[str, float]] = {}
+
+
+def _to_datetime(ts):
+    return datetime.utcfromtimestamp(ts) if ts else None
+
+
+def seed_default_feeds(db: Session) -> int:
+    """Register the built-in FEEDS (and their Sources) if they are missing"""
+    known = {url for (url,) in db.query(Feed.url)}
+    missing = [f for f in FEEDS if f["url"] not in known]
+    if not missing:
+        return 0
+    sources = resolve_sources(db, (f["name"] for f in missing))
+    for f in missing:
+        db.add(Feed(
+            name=f["name"],
+            url=f["url"],
+            category=f["category"],
+            source_id=sources[f["name"]].id,
+            poll_interval=float(POLL_INTERVAL_SECONDS),
+        ))
+    db.commit()
+    return len(missing)
+
+
+def feed_to_info(feed: Feed) -> Dict:
+    """Feed row -> the feed_info dict rss_service works with"""
+    return {
+        "id": feed.id,
+        "name": feed.name,
+        "url": feed.url,
+        "category": feed.category or "General",
+        "poll_interval": feed.poll_interval,
+        "consecutive_failures": feed.consecutive_failures,
+        "etag": feed.etag,
+        "last_modified": feed.last_modified,
+    }
+
+
+def load_active_feeds(db: Session) -> List[Dict]:
+    return [feed_to_info(f) for f in db.query(Feed).filter(Feed.is_active == True).order_by(Feed.id)]
+
+
+def persist_states(db: Session, states: List[FeedState]):
+    """Write schedule, validators and counter deltas for polled feeds"""
+    by_id = {s.feed_id: s for s in states if s.feed_id}
+    if not by_id:
+        return
+    for feed in db.query(Feed).filter(Feed.id.in_(list(by_id))):
+        state = by_id[feed.id]
+        feed.poll_interval = state.poll_interval
+        feed.next_poll_at = _to_datetime(state.next_poll_at)
+        feed.consecutive_failures = state.consecutive_failures
+        feed.etag = state.etag
+        feed.last_modified = state.modified
+        feed.last_status = state.last_status
+        feed.last_latency_ms = state.last_latency_ms
+        feed.last_error = state.last_error
+        feed.last_fetched_at = _to_datetime(state.fetched_at)
+        if state.last_changed_at:
+            feed.last_changed_at = _to_datetime(state.last_changed_at)
+
+        # Counters are incremented in SQL so workers polling concurrently don't lose each other's deltas
+        written = _persisted.setdefault(feed.url, {})
+        increments = {}
+        for name in COUNTERS:
+            current = getattr(state, name)
+            delta = current - written.get(name, 0)
+            if delta:
+                increments[name] = func.coalesce(getattr(Feed, name), 0) + delta
+            written[name] = current
+        if increments:
+            db.execute(
+                update(Feed).where(Feed.id == feed.id).values(**increments)
+                .execution_options(synchronize_session=False)
+            )
+    db.commit()
+
+
+def _sync(states: List[FeedState]) -> List[Dict]:
+    db = SessionLocal()
+    try:
+        persist_states(db, states)
+        return load_active_feeds(db)
+    finally:
+        db.close()
+
+
+def attach(poller: FeedPoller):
+    """Seed the registry, point the poller at the active feeds and persist after each pass"""
+    db = SessionLocal()
+    try:
+        seed_default_feeds(db)
+        poller.set_feeds(load_active_feeds(db))
+    finally:
+        db.close()
+
+    async def on_polled(states: List[FeedState]):
+        # Picks up feeds added/disabled through the admin API as well
+        feeds = await asyncio.to_thread(_sync, states)
+        poller.set_feeds(feeds)
+
+    poller.on_polled = on_polled
+
+
+def feed_health(db: Session) -> List[Dict]:
+    """Per-feed schedule and health stats for the admin dashboard"""
+    return [
+        {
+            "id": f.id,
+            "name": f.name,
+            "url": f.url,
+            "source_id": f.source_id,
+            "category": f.category,
+            "is_active": f.is_active,
+            "poll_interval": round(f.poll_interval or 0, 1),
+            "next_poll_at": f.next_poll_at,
+            "consecutive_failures": f.consecutive_failures,
+            "last_status": f.last_status,
+            "fetch_count": f.fetch_count,
+            "error_count": f.error_count,
+            "not_modified_count": f.not_modified_count,
+            "change_count": f.change_count,
+            "error_rate": round(f.error_count / f.fetch_count, 3) if f.fetch_count else None,
+            "avg_latency_ms": round(f.total_latency_ms / f.fetch_count, 2) if f.fetch_count else None,
+            "last_latency_ms": f.last_latency_ms,
+            "last_error": f.last_error,
+            "last_fetched_at": f.last_fetched_at,
+            "last_changed_at": f.last_changed_at,
+        }
+        for f in db.query(Feed).order_by(Feed.id)
+    ]
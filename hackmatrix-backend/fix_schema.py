@@ -3,12 +3,13 @@ import os
 
 DB_PATH = "hackmatrix.db"
 
-def migrate():
-    if not os.path.exists(DB_PATH):
-        print(f"Database {DB_PATH} not found!")
+def migrate(db_path=DB_PATH):
+    """Add the columns, tables and indexes of newer models to an existing database"""
+    if not os.path.exists(db_path):
+        print(f"Database {db_path} not found!")
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
     try:
@@ -105,6 +106,115 @@ def migrate():
         print(f"Skipping category column (might exist): {e}")
         conn.rollback()
 
+    # Add url_hash to articles (seen-URL index)
+    try:
+        print("Checking articles table for url_hash...")
+        try:
+            cursor.execute("ALTER TABLE articles ADD COLUMN url_hash BIGINT")
+            print("✅ Added url_hash to articles")
+        except sqlite3.OperationalError as e:
+            if "duplicate column" in str(e):
+                print("ℹ️ url_hash already exists")
+            else:
+                print(f"⚠️ Error adding url_hash: {e}")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_articles_url_hash ON articles (url_hash)")
+
+        from url_index import url_hash
+        rows = cursor.execute("SELECT id, url FROM articles WHERE url_hash IS NULL").fetchall()
+        cursor.executemany("UPDATE articles SET url_hash = ? WHERE id = ?", [(url_hash(url), i) for i, url in rows])
+        conn.commit()
+        print(f"✅ Backfilled url_hash for {len(rows)} articles")
+    except Exception as e:
+        print(f"Error checking url_hash: {e}")
+        conn.rollback()
+
+    # Add near-duplicate clustering columns to articles
+    for column, ddl in (("simhash", "BIGINT"), ("story_cluster_id", "INTEGER")):
+        try:
+            cursor.execute(f"ALTER TABLE articles ADD COLUMN {column} {ddl}")
+            print(f"✅ Added {column} to articles")
+        except sqlite3.OperationalError as e:
+            if "duplicate column" in str(e):
+                print(f"ℹ️ {column} already exists")
+            else:
+                print(f"⚠️ Error adding {column}: {e}")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_articles_story_cluster_id ON articles (story_cluster_id)")
+    conn.commit()
+    # Signatures for existing rows are computed by story_index.rebuild() at startup
+
+    # Add background extraction state to articles
+    for column, ddl in (("extraction_status", "VARCHAR(20) DEFAULT 'complete'"), ("extraction_error", "VARCHAR(255)")):
+        try:
+            cursor.execute(f"ALTER TABLE articles ADD COLUMN {column} {ddl}")
+            print(f"✅ Added {column} to articles")
+        except sqlite3.OperationalError as e:
+            if "duplicate column" in str(e):
+                print(f"ℹ️ {column} already exists")
+            else:
+                print(f"⚠️ Error adding {column}: {e}")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_articles_extraction_status ON articles (extraction_status)")
+    conn.commit()
+
+    # Add memoized text-analysis keys to articles
+    for column in ("content_hash", "analysis_version"):
+        try:
+            cursor.execute(f"ALTER TABLE articles ADD COLUMN {column} VARCHAR(64)")
+            print(f"✅ Added {column} to articles")
+        except sqlite3.OperationalError as e:
+            if "duplicate column" in str(e):
+                print(f"ℹ️ {column} already exists")
+            else:
+                print(f"⚠️ Error adding {column}: {e}")
+    conn.commit()
+
+    # Add running community-score aggregates (community.py)
+    for table, column in (
+        ("articles", "community_weighted_sum"),
+        ("articles", "community_total_weight"),
+        ("ratings", "applied_weight"),
+    ):
+        try:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} FLOAT")
+            print(f"✅ Added {column} to {table}")
+        except sqlite3.OperationalError as e:
+            if "duplicate column" in str(e):
+                print(f"ℹ️ {column} already exists")
+            else:
+                print(f"⚠️ Error adding {column}: {e}")
+    conn.commit()
+    # Left NULL: built per article on next scoring, or all at once by POST /api/admin/community/reconcile
+
+    # Add rolling rating-anomaly state (rating_stats.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS article_rating_stats (
+            article_id INTEGER NOT NULL PRIMARY KEY REFERENCES articles (id),
+            rating_count INTEGER DEFAULT 0,
+            rating_mean FLOAT DEFAULT 0.0,
+            rating_m2 FLOAT DEFAULT 0.0,
+            extreme_count INTEGER DEFAULT 0,
+            recent_buckets TEXT DEFAULT '{}',
+            new_account_buckets TEXT DEFAULT '{}',
+            ip_counters TEXT DEFAULT '{}',
+            ip_decrements INTEGER DEFAULT 0,
+            updated_at DATETIME
+        )
+    """)
+    print("✅ article_rating_stats ready")
+    conn.commit()
+    # Rows are built per article from its ratings on next scoring
+
+    # Durable rescore flag (rescoring.py)
+    try:
+        cursor.execute("ALTER TABLE articles ADD COLUMN rescore_pending INTEGER DEFAULT 0")
+        print("✅ Added rescore_pending to articles")
+    except sqlite3.OperationalError as e:
+        if "duplicate column" in str(e):
+            print("ℹ️ rescore_pending already exists")
+        else:
+            print(f"⚠️ Error adding rescore_pending: {e}")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_articles_rescore_pending ON articles (rescore_pending)")
+    conn.commit()
+
     conn.close()
     print("Migration check complete.")
 
@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
@@ -6,10 +6,14 @@ from database import engine, SessionLocal
 from models import Base, User
 import bcrypt
 import nltk_setup
+import fix_schema
 
 
 load_dotenv()
 
+# Bring an existing database up to date first: create_all only adds missing tables
+fix_schema.migrate(engine.url.database)
+
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
@@ -84,12 +88,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Load ML artifacts once per process before serving traffic
+@app.on_event("startup")
+def warm_models():
+    try:
+        from ml_models.registry import registry
+        registry.warm_up()
+    except ImportError as e:
+        print(f"⚠️  ML registry unavailable: {e}")
+
+# Rebuild the seen-URL Bloom filter and story-cluster index from the articles table
+@app.on_event("startup")
+def load_article_indexes():
+    from url_index import seen_urls
+    from story_clusters import story_index
+    db = SessionLocal()
+    try:
+        count = seen_urls.rebuild(db)
+        story_index.rebuild(db)
+        print(f"✅ Seen-URL and story indexes loaded ({count} articles)")
+    except Exception as e:
+        print(f"⚠️  Could not build article indexes: {e}")
+    finally:
+        db.close()
+
 # Health check
 @app.get("/api/health")
 @app.get("/api/health")
 def health():
     return {"status": "Backend running!", "service": "HackMatrix API"}
 
+@app.get("/api/health/ready")
+def readiness(response: Response):
+    """Readiness probe: 503 until the model registry has been warmed"""
+    try:
+        from ml_models.registry import registry
+        model_status = registry.status()
+    except ImportError:
+        model_status = {"ready": True, "model_loaded": False, "artifacts": []}
+    if not model_status["ready"]:
+        response.status_code = 503
+    return {"status": "ready" if model_status["ready"] else "warming", "models": model_status}
+
 @app.get("/")
 def root():
     return {"message": "TruthLens API is Live! Check /api/health for status."}
@@ -111,6 +151,48 @@ app.include_router(sources_router, prefix="/api/sources", tags=["Sources"])
 from rss import router as rss_router
 app.include_router(rss_router, prefix="/api/rss", tags=["RSS"])
 
+from rss_service import feed_poller
+import outbound
+
+@app.on_event("startup")
+async def start_feed_poller():
+    try:
+        import feed_registry
+        feed_registry.attach(feed_poller)
+    except Exception as e:
+        print(f"⚠️  Feed registry unavailable, polling built-in feeds: {e}")
+    feed_poller.start()
+
+from extraction import extraction_queue
+from rescoring import rescore_queue
+
+@app.on_event("startup")
+async def start_extraction_workers():
+    extraction_queue.start()
+    try:
+        pending = extraction_queue.recover()
+        if pending:
+            print(f"✅ Re-queued {pending} pending content extractions")
+    except Exception as e:
+        print(f"⚠️  Could not re-queue pending extractions: {e}")
+
+@app.on_event("startup")
+async def start_rescore_queue():
+    rescore_queue.start()
+    try:
+        flagged = rescore_queue.recover()
+        if flagged:
+            print(f"✅ Re-queued {flagged} articles awaiting a rescore")
+    except Exception as e:
+        print(f"⚠️  Could not re-queue flagged articles: {e}")
+
+@app.on_event("shutdown")
+async def stop_feed_poller():
+    await feed_poller.stop()
+    await extraction_queue.stop()
+    await rescore_queue.stop()
+    await outbound.close()
+
 from comments import router as comments_router
 app.include_router(comments_router, prefix="/api/comments", tags=["Comments"])
 
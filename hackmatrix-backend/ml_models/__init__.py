@@ -1,2 +1,4 @@
 from .inference import NewsInference
+from .registry import ModelRegistry, registry, get_inference
 from .preprocess import clean_text
+from .document import AnalyzedDocument
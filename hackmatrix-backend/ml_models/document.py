@@ -0,0 +1,66 @@
+"""
+One article's text, analyzed once for every scoring component.
+
+AnalyzedDocument lowercases the text, runs the shared keyword scan (which
+also reports numbers and quote marks) and splits sentences up front; the
+model's cleaned text and token stream are derived from the lowercased copy
+on first use. The nlp heuristic, fact/opinion ratio, signal extractors,
+vectorizer and claim extraction all read from it instead of rescanning.
+"""
+import re
+from typing import List, Optional, Tuple
+
+from .keywords import KeywordHits, matcher, sentence_spans
+from .preprocess import clean_lowercased
+
+# Same as the claim extractor's re.findall(r'(\d+(?:%| percent| million| billion))'),
+# tried where the keyword scan found a number
+STATISTIC = re.compile(r'\d+(?:%| percent| million| billion)')
+
+Span = Tuple[int, int]
+
+
+class AnalyzedDocument:
+    """Normalized text, sentence spans, keyword hits, tokens and number/quote spans"""
+
+    def __init__(self, text: Optional[str]):
+        self.text = text or ""
+        self.normalized = self.text.lower()
+        self.keywords: KeywordHits = matcher.scan(self.text, self.normalized)
+        self.sentences: List[Span] = sentence_spans(self.text)
+        self._cleaned: Optional[str] = None
+
+    @property
+    def cleaned(self) -> str:
+        """clean_text(text): the vectorizer's input"""
+        if self._cleaned is None:
+            self._cleaned = clean_lowercased(self.normalized)
+        return self._cleaned
+
+    @property
+    def tokens(self) -> List[str]:
+        return self.cleaned.split()
+
+    @property
+    def numbers(self) -> List[Span]:
+        """Runs of digits"""
+        return [(start, end) for start, end, _ in self.keywords.hits.get("number", ())]
+
+    @property
+    def statistics(self) -> List[Span]:
+        """Numbers followed by %, percent, million or billion"""
+        spans = []
+        for start, _ in self.numbers:
+            found = STATISTIC.match(self.text, start)
+            if found:
+                spans.append(found.span())
+        return spans
+
+    @property
+    def quotes(self) -> List[Span]:
+        """Text between each pair of double quote marks, marks excluded"""
+        marks = [start for start, _, _ in self.keywords.hits.get("quote", ())]
+        return [(marks[i] + 1, marks[i + 1]) for i in range(0, len(marks) - 1, 2)]
+
+    def sentence_texts(self) -> List[str]:
+        return [self.text[start:end] for start, end in self.sentences]
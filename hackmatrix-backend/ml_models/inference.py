@@ -1,26 +1,40 @@
+import hashlib
 import os
 import pickle
 from .preprocess import clean_text
+from .document import AnalyzedDocument
+
+# Use absolute paths relative to this file
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL_PATH = os.path.join(BASE_DIR, 'model.pkl')
+DEFAULT_VECTORIZER_PATH = os.path.join(BASE_DIR, 'vectorizer.pkl')
 
 class NewsInference:
     def __init__(self, model_path=None, vectorizer_path=None):
-        # Use absolute paths relative to this file
-        base_dir = os.path.dirname(os.path.abspath(__file__))
+        base_dir = BASE_DIR
         
         if model_path is None:
-            model_path = os.path.join(base_dir, 'model.pkl')
+            model_path = DEFAULT_MODEL_PATH
         if vectorizer_path is None:
-            vectorizer_path = os.path.join(base_dir, 'vectorizer.pkl')
+            vectorizer_path = DEFAULT_VECTORIZER_PATH
             
         try:
             with open(model_path, 'rb') as f:
-                self.model = pickle.load(f)
+                model_bytes = f.read()
             with open(vectorizer_path, 'rb') as f:
-                self.vectorizer = pickle.load(f)
+                vectorizer_bytes = f.read()
+            self.model = pickle.loads(model_bytes)
+            self.vectorizer = pickle.loads(vectorizer_bytes)
+            # Identifies the exact artifacts, so stored analysis can be reused until they change
+            digest = hashlib.blake2b(digest_size=8)
+            digest.update(model_bytes)
+            digest.update(vectorizer_bytes)
+            self.version = digest.hexdigest()
             print(f"ML Models loaded successfully from {base_dir}")
         except Exception as e:
             self.model = None
             self.vectorizer = None
+            self.version = None
             print(f"Warning: Failed to load ML models from {base_dir}. using fallback heuristics. Error: {e}")
 
     def predict(self, text):
@@ -32,43 +46,58 @@ class NewsInference:
                 "error": "Model not loaded"
             }
             
-        cleaned_text = clean_text(text)
-        features = self.vectorizer.transform([cleaned_text])
-        prediction = self.model.predict(features)[0]
-        probability = self.model.predict_proba(features)[0]
+        return self.predict_batch([text])[0]
+
+    def predict_batch(self, texts, documents=None):
+        """
+        Score many texts at once: one sparse matrix, one predict_proba call.
+        The label is the most probable class, same as model.predict.
+        Pass the texts' AnalyzedDocuments to reuse their cleaned text.
+        """
+        if not self.model or not self.vectorizer:
+            return [self.predict(text) for text in texts]
+        if not texts:
+            return []
+            
+        if documents is not None:
+            cleaned = [document.cleaned for document in documents]
+        else:
+            cleaned = [clean_text(text) for text in texts]
+        features = self.vectorizer.transform(cleaned)
+        probabilities = self.model.predict_proba(features)
+        best = probabilities.argmax(axis=1)
+        predictions = self.model.classes_[best]
         
-        return {
-            "prediction": int(prediction),
-            "confidence": float(max(probability)),
-            "label": "Credible" if prediction == 1 else "Unreliable"
-        }
+        return [
+            {
+                "prediction": int(prediction),
+                "confidence": float(probabilities[i, best[i]]),
+                "label": "Credible" if prediction == 1 else "Unreliable"
+            }
+            for i, prediction in enumerate(predictions)
+        ]
 
-    def extract_signals(self, text):
+    def extract_signals(self, text, document=None):
         """
         Heuristic method to identify hype and factual sentences.
         Returns: { "hype_sentences": [], "factual_sentences": [], "hype_count": 0, "factual_count": 0 }
         """
-        import re
-        
-        # Split text into sentences (rudimentary)
-        sentences = re.split(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s', text)
+        document = document or AnalyzedDocument(text)
+        hits = document.keywords
         
         hype_sentences = []
         factual_sentences = []
         
-        hype_keywords = ["shocking", "bombshell", "destroyed", "eviscerated", "you won't believe", "miracle", "secret", "exposed", "shameful", "betrayal"]
-        factual_keywords = ["according to", "reported by", "study shows", "data indicates", "percent", "%", "evidence", "confirmed", "official"]
-        
-        for sent in sentences:
-            s_lower = sent.lower()
+        for start, end in document.sentences:
+            sent = text[start:end]
             
             # Hype detection
-            if any(k in s_lower for k in hype_keywords) or (sent.isupper() and len(sent) > 20) or "!!!" in sent:
+            if hits.within("model_hype", start, end) or (sent.isupper() and len(sent) > 20):
                 hype_sentences.append(sent)
                 continue
                 
             # Factual detection
-            if any(k in s_lower for k in factual_keywords) or re.search(r'\d+', sent): # Contains numbers
+            if hits.within("model_factual", start, end) or hits.within("number", start, end): # Contains numbers
                 factual_sentences.append(sent)
                 
         return {
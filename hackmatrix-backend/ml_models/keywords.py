@@ -0,0 +1,203 @@
+"""
+Keyword matcher shared by the credibility heuristics.
+
+Every keyword list used by the engine and by NewsInference is compiled into
+one regex at import. A single scan of the lowercased text reports each hit
+with its position and the categories it belongs to, so callers count
+distinct patterns or look up hits per sentence instead of re-scanning the
+text once per keyword.
+"""
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+# Literal keywords, matched as plain substrings (same as `keyword in text`)
+KEYWORDS = {
+    # CredibilityEngine._heuristic_nlp_score
+    "sensational": [
+        "shocking", "amazing", "unbelievable", "viral", "explosive",
+        "exclusive", "breaking", "urgent", "scandal", "bizarre"
+    ],
+    "nlp_factual": ["according to", "research shows", "study found", "data indicates"],
+    # CredibilityEngine._analyze_fact_opinion_ratio
+    "fact": ["according to", "report", "study", "evidence", "data", "statistics", "record", "official"],
+    "opinion": [
+        "i think", "believe", "feel", "opinion", "should",
+        "must", "best", "worst", "amazing", "terrible", "wrong"
+    ],
+    # CredibilityEngine._extract_signals
+    "hype": [
+        "shocking", "bombshell", "destroyed", "eviscerated", "you won't believe",
+        "miracle", "secret", "exposed", "shameful", "betrayal", "crisis",
+        "catastrophe", "urgent", "breaking", "nightmare", "!!!"
+    ],
+    "factual": [
+        "according to", "reported by", "study shows", "data indicates",
+        "percent", "%", "evidence", "confirmed", "official", "stated",
+        "researchers", "statistics"
+    ],
+    # NewsInference.extract_signals
+    "model_hype": [
+        "shocking", "bombshell", "destroyed", "eviscerated", "you won't believe",
+        "miracle", "secret", "exposed", "shameful", "betrayal", "!!!"
+    ],
+    "model_factual": [
+        "according to", "reported by", "study shows", "data indicates",
+        "percent", "%", "evidence", "confirmed", "official"
+    ],
+    # CredibilityEngine._extract_claims: quoted passages run from one mark to the next
+    "quote": ['"'],
+}
+
+# Numeric patterns, tried where a run of digits or a "$" starts (same as re.search)
+NUMERIC_PATTERNS = {
+    "nlp_factual": [r'\b\d+%\b', r'\b\d{4}-\d{2}-\d{2}\b'],
+    "fact": [r'\d+%', r'\d{4}', r'\$'],
+    # Signal extractors ("contains a number") and statistic claims
+    "number": [r'\d+'],
+}
+
+# The signal extractors' rudimentary splitter, (?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s,
+# written to start with a literal so the regex engine can skip ahead; the
+# boundary is the final whitespace character
+SENTENCE_BOUNDARY = re.compile(r'[.?](?<!\w\.\w.)(?<![A-Z][a-z]\.)\s')
+
+
+def _trie_pattern(words: List[str], extra: List[str] = ()) -> str:
+    """
+    Alternation factored by common prefix; the longest keyword at a position
+    wins. `extra` regex branches join the top-level alternation, which keeps
+    the leading character set the regex engine uses to skip ahead.
+    """
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict, extra: List[str] = ()) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        branches.extend(extra)
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie, extra)
+
+
+class KeywordHits:
+    """Result of one scan: (start, end, pattern) hits per category, in text order"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.hits: Dict[str, List[Tuple[int, int, str]]] = defaultdict(list)
+        self._starts: Dict[str, List[int]] = {}
+
+    def patterns(self, category: str) -> Set[str]:
+        """Distinct patterns of the category found anywhere in the text"""
+        return {pattern for _, _, pattern in self.hits.get(category, ())}
+
+    def count(self, category: str) -> int:
+        return len(self.patterns(category))
+
+    def within(self, category: str, start: int, end: int) -> bool:
+        """True if a hit of the category lies entirely inside text[start:end]"""
+        hits = self.hits.get(category)
+        if not hits:
+            return False
+        starts = self._starts.get(category)
+        if starts is None:
+            starts = self._starts[category] = [hit[0] for hit in hits]
+        i = bisect_left(starts, start)
+        while i < len(hits) and hits[i][0] < end:
+            if hits[i][1] <= end:
+                return True
+            i += 1
+        return False
+
+
+class KeywordMatcher:
+    """All keyword categories compiled into one regex"""
+
+    def __init__(self, keywords: Dict[str, List[str]], numeric: Dict[str, List[str]]):
+        self.literal_categories: Dict[str, List[str]] = defaultdict(list)
+        for category, words in keywords.items():
+            for word in words:
+                self.literal_categories[word].append(category)
+        literals = list(self.literal_categories)
+        # The regex consumes the longest keyword at a position. Shorter keywords lying
+        # inside it are listed up front; scanning resumes where a keyword could start
+        # inside the match and run past its end (e.g. "unbelievable" / "evidence").
+        self.inside: Dict[str, List[Tuple[int, str]]] = {}
+        self.resume: Dict[str, int] = {}
+        for word in literals:
+            resume = next(
+                (i for i in range(1, len(word))
+                 if any(w.startswith(word[i:]) and len(w) > len(word) - i for w in literals)),
+                len(word),
+            )
+            self.resume[word] = resume
+            self.inside[word] = [
+                (i, w) for i in range(resume) for w in literals if word.startswith(w, i)
+            ]
+
+        self.numeric: List[Tuple[re.Pattern, str, List[str]]] = []
+        numeric_categories: Dict[str, List[str]] = defaultdict(list)
+        for category, patterns in numeric.items():
+            for pattern in patterns:
+                numeric_categories[pattern].append(category)
+        for pattern, categories in numeric_categories.items():
+            self.numeric.append((re.compile(pattern), pattern, categories))
+
+        self.pattern = re.compile(_trie_pattern(literals, [r"\d+", r"\$"]))
+
+    def scan(self, text: str, lowered: Optional[str] = None) -> KeywordHits:
+        """Match every category against text in one pass; positions index into text"""
+        if lowered is None:
+            lowered = text.lower()
+        result = KeywordHits(text)
+        hits = result.hits
+        search = self.pattern.search
+        match = search(lowered)
+        while match:
+            pos = match.start()
+            word = match.group()
+            if word not in self.literal_categories:
+                for regex, pattern, categories in self.numeric:
+                    found = regex.match(lowered, pos)
+                    if found:
+                        for category in categories:
+                            hits[category].append((pos, found.end(), pattern))
+                match = search(lowered, match.end())
+                continue
+            for offset, keyword in self.inside[word]:
+                start = pos + offset
+                for category in self.literal_categories[keyword]:
+                    hits[category].append((start, start + len(keyword), keyword))
+            match = search(lowered, pos + self.resume[word])
+        if len(lowered) != len(text):
+            # A few characters lowercase to two ("İ" -> "i" + combining dot);
+            # map offsets in the lowered text back to the original characters
+            origin = [i for i, ch in enumerate(text) for _ in ch.lower()]
+            origin.append(len(text))
+            for category, found in hits.items():
+                hits[category] = [(origin[start], origin[end - 1] + 1, pattern) for start, end, pattern in found]
+        return result
+
+
+def sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """(start, end) of each sentence; text[start:end] equals re.split's pieces"""
+    spans = []
+    start = 0
+    for boundary in SENTENCE_BOUNDARY.finditer(text):
+        spans.append((start, boundary.end() - 1))
+        start = boundary.end()
+    spans.append((start, len(text)))
+    return spans
+
+
+matcher = KeywordMatcher(KEYWORDS, NUMERIC_PATTERNS)
+
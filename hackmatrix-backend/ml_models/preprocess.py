@@ -1,6 +1,8 @@
 import re
 import string
 
+PUNCTUATION = str.maketrans('', '', string.punctuation)
+
 def clean_text(text):
     """
     Basic text cleaning for NLP.
@@ -9,10 +11,14 @@ def clean_text(text):
         return ""
     
     # Lowercase
-    text = text.lower()
-    
+    return clean_lowercased(text.lower())
+
+def clean_lowercased(text):
+    """
+    clean_text for text that is already lowercased (AnalyzedDocument.normalized).
+    """
     # Remove punctuation
-    text = text.translate(str.maketrans('', '', string.punctuation))
+    text = text.translate(PUNCTUATION)
     
     # Remove numbers
     text = re.sub(r'\d+', '', text)
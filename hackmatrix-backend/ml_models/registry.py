@@ -0,0 +1,84 @@
+"""
+Process-wide model registry.
+Each model/vectorizer pair is unpickled once per process and shared by every
+CredibilityEngine, instead of being reloaded on every scoring request.
+"""
+import os
+import threading
+import time
+
+from .inference import NewsInference, DEFAULT_MODEL_PATH, DEFAULT_VECTORIZER_PATH
+
+
+class ModelRegistry:
+    """Lazily loads and caches NewsInference handles keyed by artifact paths"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._instances = {}
+        self._load_stats = {}
+        self._warmed = False
+
+    def _key(self, model_path=None, vectorizer_path=None):
+        return (
+            os.path.abspath(model_path or DEFAULT_MODEL_PATH),
+            os.path.abspath(vectorizer_path or DEFAULT_VECTORIZER_PATH),
+        )
+
+    def get(self, model_path=None, vectorizer_path=None) -> NewsInference:
+        """Return the shared inference handle, loading it on first use"""
+        key = self._key(model_path, vectorizer_path)
+        inference = self._instances.get(key)
+        if inference is not None:
+            return inference
+
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            inference = self._instances.get(key)
+            if inference is None:
+                started = time.perf_counter()
+                inference = NewsInference(model_path=key[0], vectorizer_path=key[1])
+                self._load_stats[key] = {
+                    "model_path": key[0],
+                    "vectorizer_path": key[1],
+                    "loaded": inference.model is not None and inference.vectorizer is not None,
+                    "version": inference.version,
+                    "load_time_ms": round((time.perf_counter() - started) * 1000, 2),
+                    "loaded_at": time.time(),
+                }
+                self._instances[key] = inference
+        return inference
+
+    def warm_up(self) -> bool:
+        """Load the default artifacts eagerly (call at startup). Returns True if the model loaded."""
+        inference = self.get()
+        self._warmed = True
+        return inference.model is not None and inference.vectorizer is not None
+
+    def is_ready(self) -> bool:
+        """True once warm-up has run, whether or not the model could be loaded"""
+        return self._warmed
+
+    def status(self) -> dict:
+        """Readiness and load stats for the health endpoint"""
+        default = self._load_stats.get(self._key())
+        return {
+            "ready": self._warmed,
+            "model_loaded": bool(default and default["loaded"]),
+            "artifacts": list(self._load_stats.values()),
+        }
+
+    def reset(self):
+        """Drop all cached handles (used by benchmarks and after retraining)"""
+        with self._lock:
+            self._instances.clear()
+            self._load_stats.clear()
+            self._warmed = False
+
+
+registry = ModelRegistry()
+
+
+def get_inference(model_path=None, vectorizer_path=None) -> NewsInference:
+    """Shared NewsInference for this process"""
+    return registry.get(model_path, vectorizer_path)
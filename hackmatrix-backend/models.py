@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, Enum, Table
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Boolean, DateTime, ForeignKey, Text, Enum, Table
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -62,6 +62,45 @@ class Source(Base):
     
     # Relationships
     articles = relationship("Article", back_populates="source", secondary=article_source_association)
+    feeds = relationship("Feed", back_populates="source")
+
+
+class Feed(Base):
+    __tablename__ = "feeds"
+    
+    id = Column(Integer, primary_key=True)
+    source_id = Column(Integer, ForeignKey('sources.id'), nullable=True)
+    name = Column(String(100), nullable=False)
+    url = Column(String(500), unique=True, nullable=False)
+    category = Column(String(50), default="General")
+    is_active = Column(Boolean, default=True)
+    
+    # Scheduling (seconds); adapted by the poller, backed off on failure
+    poll_interval = Column(Float, default=300.0)
+    next_poll_at = Column(DateTime, nullable=True)
+    consecutive_failures = Column(Integer, default=0)
+    
+    # Conditional GET validators
+    etag = Column(String(255), nullable=True)
+    last_modified = Column(String(100), nullable=True)
+    
+    # Health counters
+    last_status = Column(Integer, nullable=True)
+    fetch_count = Column(Integer, default=0)
+    error_count = Column(Integer, default=0)
+    not_modified_count = Column(Integer, default=0)
+    change_count = Column(Integer, default=0)
+    last_latency_ms = Column(Float, nullable=True)
+    total_latency_ms = Column(Float, default=0.0)
+    last_error = Column(String(255), nullable=True)
+    last_fetched_at = Column(DateTime, nullable=True)
+    last_changed_at = Column(DateTime, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    source = relationship("Source", back_populates="feeds")
 
 
 class StatusEnum(str, enum.Enum):
@@ -77,6 +116,7 @@ class Article(Base):
     title = Column(String(500), nullable=False)
     content = Column(Text, nullable=False)
     url = Column(String(500), unique=True, nullable=False)
+    url_hash = Column(BigInteger, index=True, nullable=True)  # url_index.url_hash(url), for integer lookups
     
     # Source info
     source_id = Column(Integer, ForeignKey('sources.id'))
@@ -103,10 +143,26 @@ class Article(Base):
     soft_lock_reason = Column(String(255), nullable=True)
     suspicious_activity_detected = Column(Boolean, default=False)
     
+    # Background content extraction (extraction.py): pending, complete, failed
+    extraction_status = Column(String(20), default="complete", index=True)
+    extraction_error = Column(String(255), nullable=True)
+    
+    # Near-duplicate clustering (story_clusters.py)
+    simhash = Column(BigInteger, nullable=True)
+    story_cluster_id = Column(Integer, index=True, nullable=True)  # id of the first article of this story
+    
+    # Running community aggregates (community.py); NULL on rows from before they existed, until built
+    community_weighted_sum = Column(Float, default=0.0, nullable=True)  # sum of rating x weight
+    community_total_weight = Column(Float, default=0.0, nullable=True)  # sum of weights
+    rescore_pending = Column(Integer, default=0, index=True)  # votes since last scored (rescoring.py)
+    
     # NLP Analysis details
     fact_opinion_ratio = Column(Float, default=0.5)  # 0.0 (opinion) to 1.0 (fact)
     hype_sentences = Column(Text, default="[]")  # JSON list
     factual_sentences = Column(Text, default="[]")  # JSON list
+    # What the text-derived fields above were computed from (reused until either changes)
+    content_hash = Column(String(64), nullable=True)  # sha256 of content
+    analysis_version = Column(String(64), nullable=True)  # heuristics version : model artifact hash
     
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -133,6 +189,7 @@ class Rating(Base):
     
     # Vote weight based on user credibility and category
     vote_weight = Column(Float, default=1.0)
+    applied_weight = Column(Float, nullable=True)  # weight counted in the article's community aggregates
     
     # Anti-Manipulation
     ip_address = Column(String(45), nullable=True)  # IPv4 or IPv6
@@ -145,6 +202,29 @@ class Rating(Base):
     user = relationship("User", back_populates="ratings")
 
 
+class ArticleRatingStats(Base):
+    """Rolling per-article rating signals for manipulation checks (rating_stats.py)"""
+    __tablename__ = "article_rating_stats"
+    
+    article_id = Column(Integer, ForeignKey('articles.id'), primary_key=True)
+    
+    # Online variance (Welford)
+    rating_count = Column(Integer, default=0)
+    rating_mean = Column(Float, default=0.0)
+    rating_m2 = Column(Float, default=0.0)  # sum of squared deviations from the mean
+    extreme_count = Column(Integer, default=0)  # ratings > 75 or < 25
+    
+    # Minute buckets, dropped once outside their window
+    recent_buckets = Column(Text, default="{}")  # JSON: {minute: ratings created then}, last hour
+    new_account_buckets = Column(Text, default="{}")  # JSON: {minute: ratings by accounts created then}, last day
+    
+    # Misra-Gries heavy hitters over rater IPs; counts are lower bounds, short by at most ip_decrements
+    ip_counters = Column(Text, default="{}")  # JSON: {ip: count}
+    ip_decrements = Column(Integer, default=0)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class Comment(Base):
     __tablename__ = "comments"
     
@@ -0,0 +1,266 @@
+"""
+Shared outbound HTTP layer.
+One pooled httpx.AsyncClient (keep-alive, timeouts) plus per-host
+concurrency limits, so fetching many feeds never ties up FastAPI's threadpool.
+
+Every host also has a circuit breaker: after BREAKER_FAILURE_THRESHOLD
+consecutive failures (transport errors or 5xx) it opens and calls fail fast
+with CircuitOpenError. Once BREAKER_RESET_SECONDS have passed, one half-open
+probe is let through; success closes the circuit, failure reopens it for
+twice as long (capped at BREAKER_MAX_RESET_SECONDS).
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+USER_AGENT = "Mozilla/5.0 (compatible; TruthLensBot/1.0; +https://hackmatrix-frontend.onrender.com)"
+
+MAX_CONNECTIONS = int(os.getenv("OUTBOUND_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OUTBOUND_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("OUTBOUND_KEEPALIVE_EXPIRY", "30"))
+PER_HOST_LIMIT = int(os.getenv("OUTBOUND_PER_HOST_LIMIT", "4"))
+CONNECT_TIMEOUT = float(os.getenv("OUTBOUND_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("OUTBOUND_READ_TIMEOUT", "10"))
+# How long a request may wait for one of its host's PER_HOST_LIMIT slots
+QUEUE_TIMEOUT = float(os.getenv("OUTBOUND_QUEUE_TIMEOUT", "10"))
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("OUTBOUND_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("OUTBOUND_BREAKER_RESET", "30"))
+BREAKER_MAX_RESET_SECONDS = float(os.getenv("OUTBOUND_BREAKER_MAX_RESET", "600"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised without touching the network while a host's circuit is open"""
+
+
+class HostBusyError(httpx.TransportError):
+    """Raised when no per-host slot frees up within QUEUE_TIMEOUT"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one host"""
+
+    def __init__(self, host: str):
+        self.host = host
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.reset_timeout = BREAKER_RESET_SECONDS
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+        # Metrics
+        self.requests = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.times_opened = 0
+        self.in_flight = 0
+        self.waiting = 0
+        self.total_latency_ms = 0.0
+        self.last_latency_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def before_request(self):
+        """Raise CircuitOpenError unless a request may go out now"""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.short_circuited += 1
+                raise CircuitOpenError(f"Circuit open for {self.host}")
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self.probe_in_flight:
+                self.short_circuited += 1
+                raise CircuitOpenError(f"Circuit half-open for {self.host}, probe in flight")
+            self.probe_in_flight = True
+
+    def record(self, ok: bool, latency_ms: float, error: Optional[str] = None):
+        self.requests += 1
+        self.total_latency_ms += latency_ms
+        self.last_latency_ms = round(latency_ms, 2)
+        probe = self.state == HALF_OPEN
+        self.probe_in_flight = False
+        if ok:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.reset_timeout = BREAKER_RESET_SECONDS
+            return
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = error
+        if probe:
+            # Still down: stay open for longer this time
+            self.reset_timeout = min(self.reset_timeout * 2, BREAKER_MAX_RESET_SECONDS)
+            self._open()
+        elif self.state == CLOSED and self.consecutive_failures >= BREAKER_FAILURE_THRESHOLD:
+            self._open()
+
+    def release_probe(self):
+        """The probe ended without an outcome (e.g. cancelled): allow another one"""
+        self.probe_in_flight = False
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def metrics(self) -> Dict:
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+        return {
+            "host": self.host,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in_seconds": retry_in,
+            "requests": self.requests,
+            "failures": self.failures,
+            "error_rate": round(self.failures / self.requests, 3) if self.requests else None,
+            "short_circuited": self.short_circuited,
+            "times_opened": self.times_opened,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "avg_latency_ms": round(self.total_latency_ms / self.requests, 2) if self.requests else None,
+            "last_latency_ms": self.last_latency_ms,
+            "last_error": self.last_error,
+        }
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+# Not tied to an event loop, so breaker state survives client re-creation
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def host_of(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the process-wide client, creating it for the running event loop"""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+        )
+        _client_loop = loop
+        _host_semaphores.clear()
+    return _client
+
+
+def host_semaphore(host: str) -> asyncio.Semaphore:
+    semaphore = _host_semaphores.get(host)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(PER_HOST_LIMIT)
+        _host_semaphores[host] = semaphore
+    return semaphore
+
+
+def breaker_for(host: str) -> CircuitBreaker:
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = CircuitBreaker(host)
+        _breakers[host] = breaker
+    return breaker
+
+
+def _is_failure(response: Optional[httpx.Response], error: Optional[BaseException]) -> bool:
+    if error is not None:
+        return isinstance(error, httpx.TransportError)
+    return response is not None and response.status_code >= 500
+
+
+@asynccontextmanager
+async def _guarded(url: str):
+    """Per-host breaker check, slot acquisition and outcome recording around one request"""
+    host = host_of(url)
+    breaker = breaker_for(host)
+    breaker.before_request()
+    semaphore = host_semaphore(host)
+    breaker.waiting += 1
+    try:
+        await asyncio.wait_for(semaphore.acquire(), QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        breaker.release_probe()
+        raise HostBusyError(f"No free connection slot for {host} within {QUEUE_TIMEOUT}s")
+    except BaseException:
+        breaker.release_probe()
+        raise
+    finally:
+        breaker.waiting -= 1
+
+    breaker.in_flight += 1
+    started = time.perf_counter()
+    outcome = {"response": None}
+    try:
+        yield outcome
+    except BaseException as e:
+        if isinstance(e, httpx.TransportError) and not isinstance(e, (CircuitOpenError, HostBusyError)):
+            breaker.record(False, (time.perf_counter() - started) * 1000, str(e) or type(e).__name__)
+        elif outcome["response"] is not None:
+            # The caller failed on its own (e.g. a parse error): the host answered
+            response = outcome["response"]
+            breaker.record(not _is_failure(response, None), (time.perf_counter() - started) * 1000)
+        else:
+            breaker.release_probe()
+        raise
+    else:
+        response = outcome["response"]
+        error = None if response is None or response.status_code < 500 else f"HTTP {response.status_code}"
+        breaker.record(not _is_failure(response, None), (time.perf_counter() - started) * 1000, error)
+    finally:
+        breaker.in_flight -= 1
+        semaphore.release()
+
+
+async def fetch(url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+    """GET a URL through the shared pool, respecting the per-host cap and circuit breaker"""
+    client = get_async_client()
+    async with _guarded(url) as outcome:
+        outcome["response"] = await client.get(url, headers=headers)
+        return outcome["response"]
+
+
+@asynccontextmanager
+async def stream(url: str, headers: Optional[Dict[str, str]] = None):
+    """Streaming GET; the body is only read as far as the caller iterates it"""
+    client = get_async_client()
+    async with _guarded(url) as outcome:
+        async with client.stream("GET", url, headers=headers) as response:
+            outcome["response"] = response
+            yield response
+
+
+def metrics() -> Dict:
+    """Per-host breaker state, concurrency and latency, for the admin dashboard"""
+    hosts = [b.metrics() for b in _breakers.values()]
+    return {
+        "per_host_limit": PER_HOST_LIMIT,
+        "failure_threshold": BREAKER_FAILURE_THRESHOLD,
+        "open_circuits": sum(1 for h in hosts if h["state"] != CLOSED),
+        "hosts": sorted(hosts, key=lambda h: (h["state"] == CLOSED, h["host"])),
+    }
+
+
+async def close():
+    """Close the pooled client (call from the app shutdown hook)"""
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+    _host_semaphores.clear()
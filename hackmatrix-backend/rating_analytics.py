@@ -0,0 +1,195 @@
+"""
+Columnar rating analytics.
+Full passes over ratings (admin audits, the corpus-wide manipulation sweep,
+the ratings breakdown) load the columns they need with one query into
+NumPy arrays grouped by article and compute every signal vectorized,
+instead of walking Rating objects and lazily loading each rater. The
+manipulation rules are the ones _detect_manipulation applies;
+rating_stats.py keeps the same signals incrementally for per-vote scoring.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models import Rating, User
+from source_registry import LOOKUP_CHUNK, chunked
+
+SPIKE_WINDOW = np.timedelta64(3600, "s")
+NEW_ACCOUNT_WINDOW = np.timedelta64(86400, "s")
+
+# Upper edges of the breakdown bins: very_low < 25 <= low < 50 <= neutral < 75 <= high
+BREAKDOWN_EDGES = [25, 50, 75]
+BREAKDOWN_BINS = ["very_low", "low", "neutral", "high"]
+
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+NAT = np.iinfo(np.int64).min
+
+
+def _datetimes(values) -> np.ndarray:
+    """datetime64[us] array from naive datetimes; 5x faster than letting NumPy convert each object"""
+    return np.array(
+        [(value - EPOCH) // MICROSECOND if value is not None else NAT for value in values], dtype=np.int64
+    ).view("datetime64[us]")
+
+
+@dataclass
+class RatingColumns:
+    """Ratings of one or more articles as arrays, sorted by article"""
+    article_ids: np.ndarray  # distinct article ids, ascending
+    starts: np.ndarray  # offset of each article's first rating
+    counts: np.ndarray  # ratings per article
+    values: np.ndarray  # credibility_rating
+    created_at: np.ndarray  # datetime64, NaT when unknown
+    account_created_at: np.ndarray  # the rater's User.created_at
+    ip_codes: np.ndarray  # index into ips, -1 when unknown
+    ips: np.ndarray  # distinct IP addresses
+
+    def per_article(self, mask: np.ndarray) -> np.ndarray:
+        """Sum a per-rating array within each article"""
+        if not len(self.starts):
+            return np.zeros(0, dtype=np.asarray(mask).dtype)
+        return np.add.reduceat(mask, self.starts)
+
+    def index(self, article_id: int) -> Optional[int]:
+        i = int(np.searchsorted(self.article_ids, article_id))
+        if i < len(self.article_ids) and self.article_ids[i] == article_id:
+            return i
+        return None
+
+
+def load(db: Session, article_ids: Optional[List[int]] = None) -> RatingColumns:
+    """
+    Ratings of the given articles (every article when None) with their
+    raters' account age, one query per LOOKUP_CHUNK articles
+    """
+    query = (
+        select(Rating.article_id, Rating.credibility_rating, Rating.created_at, Rating.ip_address, User.created_at)
+        .outerjoin(User, User.id == Rating.user_id)
+        .order_by(Rating.article_id)
+    )
+    if article_ids is None:
+        rows = db.execute(query).all()
+    else:
+        ids = sorted(set(article_ids))
+        rows = []
+        for chunk in chunked(ids, LOOKUP_CHUNK):
+            rows.extend(db.execute(query.where(Rating.article_id.in_(chunk))).all())
+
+    if rows:
+        article_col, value_col, created_col, ip_col, account_col = zip(*rows)
+    else:
+        article_col = value_col = created_col = ip_col = account_col = ()
+    article_col = np.array(article_col, dtype=np.int64)
+    unique_ids, starts, counts = np.unique(article_col, return_index=True, return_counts=True)
+
+    # Missing addresses sort first as "" and become -1
+    ips, ip_codes = np.unique(np.array([ip or "" for ip in ip_col], dtype=object), return_inverse=True)
+    ip_codes = ip_codes.astype(np.int64)
+    if len(ips) and ips[0] == "":
+        ips, ip_codes = ips[1:], ip_codes - 1
+
+    return RatingColumns(
+        article_ids=unique_ids,
+        starts=starts,
+        counts=counts,
+        values=np.array(value_col, dtype=np.float64),
+        created_at=_datetimes(created_col),
+        account_created_at=_datetimes(account_col),
+        ip_codes=ip_codes,
+        ips=ips,
+    )
+
+
+def variance(columns: RatingColumns) -> np.ndarray:
+    """Population variance of each article's ratings"""
+    if not len(columns.counts):
+        return np.zeros(0)
+    means = columns.per_article(columns.values) / columns.counts
+    deviations = columns.values - np.repeat(means, columns.counts)
+    return columns.per_article(deviations ** 2) / columns.counts
+
+
+def extreme_share(columns: RatingColumns) -> np.ndarray:
+    """Share of each article's ratings above 75 or below 25"""
+    extreme = (columns.values > 75) | (columns.values < 25)
+    return columns.per_article(extreme.astype(np.int64)) / np.maximum(columns.counts, 1)
+
+
+def top_ip_count(columns: RatingColumns) -> np.ndarray:
+    """Ratings from each article's most frequent IP address (0 when none is known)"""
+    top = np.zeros(len(columns.article_ids), dtype=np.int64)
+    known = columns.ip_codes >= 0
+    if not known.any():
+        return top
+    article_index = np.repeat(np.arange(len(columns.article_ids)), columns.counts)[known]
+    # One run per (article, ip) pair, sorted by article
+    pairs, pair_counts = np.unique(article_index * len(columns.ips) + columns.ip_codes[known], return_counts=True)
+    np.maximum.at(top, pairs // len(columns.ips), pair_counts)
+    return top
+
+
+def time_histogram(columns: RatingColumns, now: Optional[datetime] = None,
+                   bin_seconds: int = 3600, bins: int = 24) -> np.ndarray:
+    """
+    Ratings per article per time bin, most recent bin last: shape
+    (articles, bins), covering the last bins * bin_seconds before now
+    """
+    now = np.datetime64(now or datetime.utcnow(), "us")
+    age = (now - columns.created_at) / np.timedelta64(bin_seconds, "s")
+    bin_index = bins - 1 - np.floor(age)
+    valid = (bin_index >= 0) & (bin_index < bins)  # NaT compares False
+    article_index = np.repeat(np.arange(len(columns.article_ids)), columns.counts)
+    flat = article_index[valid] * bins + bin_index[valid].astype(np.int64)
+    return np.bincount(flat, minlength=len(columns.article_ids) * bins).reshape(-1, bins)
+
+
+def manipulation_signals(columns: RatingColumns, now: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+    """
+    One boolean array per _detect_manipulation rule, aligned with
+    columns.article_ids. An article is suspicious if any is set.
+    """
+    now = np.datetime64(now or datetime.utcnow(), "us")
+    n = columns.counts
+    enough = n >= 3
+    recent = columns.per_article((now - columns.created_at < SPIKE_WINDOW).astype(np.int64))
+    # Same as (now - created).days < 1, including accounts dated in the future
+    new_accounts = columns.per_article((now - columns.account_created_at < NEW_ACCOUNT_WINDOW).astype(np.int64))
+    top_ip = top_ip_count(columns)
+    return {
+        "voting_spike": enough & (recent >= 5) & (recent > n * 0.7),
+        "new_accounts": enough & (n >= 5) & (new_accounts > n * 0.5),
+        "low_variance": enough & (n >= 5) & (variance(columns) < 50),
+        "extreme_scores": enough & (n >= 10) & (extreme_share(columns) > 0.8),
+        "ip_clustering": enough & (n >= 5) & (top_ip > n * 0.4) & (top_ip > 2),
+    }
+
+
+def suspicious(signals: Dict[str, np.ndarray]) -> np.ndarray:
+    """Articles with any manipulation signal set"""
+    return np.logical_or.reduce(list(signals.values()))
+
+
+def breakdown(values: np.ndarray) -> Dict:
+    """Count, mean and bin counts of one article's ratings (get_ratings_breakdown)"""
+    if not len(values):
+        return {"total_ratings": 0, "average_rating": 0, "distribution": {}}
+    counts = np.bincount(np.searchsorted(BREAKDOWN_EDGES, values, side="right"), minlength=len(BREAKDOWN_BINS))
+    return {
+        "total_ratings": int(len(values)),
+        "average_rating": round(float(values.mean()), 2),
+        "distribution": {name: int(count) for name, count in zip(BREAKDOWN_BINS, counts)},
+    }
+
+
+def rating_values(db: Session, article_id: int) -> np.ndarray:
+    """One article's credibility ratings as an array"""
+    return np.fromiter(
+        db.scalars(select(Rating.credibility_rating).where(Rating.article_id == article_id)),
+        dtype=np.float64,
+    )
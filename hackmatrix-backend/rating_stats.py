@@ -0,0 +1,276 @@
+"""
+Streaming rating-anomaly state.
+The manipulation check used to reload every rating of an article, and each
+rater's account, on every score update to rebuild its signals. Each article
+now keeps them as rolling state in article_rating_stats, updated in the
+rating's transaction as votes are added, changed or removed:
+
+- ratings per minute over the last hour (voting spikes)
+- ratings per account-creation minute over the last day (new accounts)
+- count, mean and M2 of the ratings (Welford's online variance)
+- how many ratings are extreme (>75 or <25)
+- Misra-Gries heavy-hitter counters over rater IPs (brigading)
+
+Minute buckets that fall out of their window can no longer count and are
+dropped, so the state stays small however many votes an article gets. A
+missing row means "not built yet" (articles rated before this existed, or
+a row deleted to rebuild it): the engine builds it from the ratings the
+first time it checks the article.
+"""
+import json
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session, joinedload
+
+from models import ArticleRatingStats, Rating, User
+from source_registry import LOOKUP_CHUNK, chunked
+
+BUCKET_SECONDS = 60
+SPIKE_WINDOW_MINUTES = 60
+NEW_ACCOUNT_WINDOW_MINUTES = 24 * 60
+IP_COUNTERS = 32  # any IP with more than 1/33 of the votes is tracked
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _minute(moment: datetime) -> int:
+    return int((moment - EPOCH).total_seconds()) // BUCKET_SECONDS
+
+
+def _is_extreme(value: float) -> bool:
+    return value > 75 or value < 25
+
+
+class _State:
+    """The JSON columns of a stats row, decoded for a batch of updates"""
+
+    def __init__(self, stats: ArticleRatingStats, now: datetime):
+        self.stats = stats
+        self.now_minute = _minute(now)
+        self.recent = {int(m): n for m, n in json.loads(stats.recent_buckets or "{}").items()}
+        self.new_accounts = {int(m): n for m, n in json.loads(stats.new_account_buckets or "{}").items()}
+        self.ips: Dict[str, int] = json.loads(stats.ip_counters or "{}")
+
+    def apply(self, value: float, created_at: Optional[datetime], ip: Optional[str],
+              account_created_at: Optional[datetime], sign: int):
+        """Count (sign=1) or uncount (sign=-1) one rating"""
+        stats = self.stats
+        if value is not None:
+            count = stats.rating_count or 0
+            mean = stats.rating_mean or 0.0
+            m2 = stats.rating_m2 or 0.0
+            if sign > 0:
+                count += 1
+                delta = value - mean
+                mean += delta / count
+                m2 += delta * (value - mean)
+            elif count <= 1:
+                count, mean, m2 = 0, 0.0, 0.0
+            else:
+                count -= 1
+                old_mean = mean
+                mean -= (value - mean) / count
+                m2 = max(m2 - (value - old_mean) * (value - mean), 0.0)
+            stats.rating_count, stats.rating_mean, stats.rating_m2 = count, mean, m2
+            if _is_extreme(value):
+                stats.extreme_count = (stats.extreme_count or 0) + sign
+
+        # A bucket outside its window never counts again, whichever way the vote went
+        if created_at is not None:
+            _bump(self.recent, _minute(created_at), sign, self.now_minute - SPIKE_WINDOW_MINUTES)
+        if account_created_at is not None:
+            _bump(self.new_accounts, _minute(account_created_at), sign, self.now_minute - NEW_ACCOUNT_WINDOW_MINUTES)
+
+        if ip:
+            if sign < 0:
+                if ip in self.ips:
+                    self.ips[ip] -= 1
+                    if self.ips[ip] <= 0:
+                        del self.ips[ip]
+            elif ip in self.ips:
+                self.ips[ip] += 1
+            elif len(self.ips) < IP_COUNTERS:
+                self.ips[ip] = 1
+            else:
+                # Misra-Gries: no free counter, so every tracked count drops by one
+                self.ips = {tracked: n - 1 for tracked, n in self.ips.items() if n > 1}
+                stats.ip_decrements = (stats.ip_decrements or 0) + 1
+
+    def save(self):
+        self.recent = _prune(self.recent, self.now_minute - SPIKE_WINDOW_MINUTES)
+        self.new_accounts = _prune(self.new_accounts, self.now_minute - NEW_ACCOUNT_WINDOW_MINUTES)
+        self.stats.recent_buckets = json.dumps(self.recent)
+        self.stats.new_account_buckets = json.dumps(self.new_accounts)
+        self.stats.ip_counters = json.dumps(self.ips)
+
+
+def _bump(buckets: Dict[int, int], minute: int, sign: int, cutoff: int):
+    if minute <= cutoff:
+        return
+    buckets[minute] = buckets.get(minute, 0) + sign
+    if buckets[minute] <= 0:
+        del buckets[minute]
+
+
+def _prune(buckets: Dict[int, int], cutoff: int) -> Dict[int, int]:
+    return {minute: n for minute, n in buckets.items() if minute > cutoff}
+
+
+def _in_window(raw: Optional[str], cutoff: int) -> int:
+    return sum(n for minute, n in json.loads(raw or "{}").items() if int(minute) > cutoff)
+
+
+def _update(db: Session, article_id: int, changes):
+    # Callers update the community aggregates first; on SQLite that UPDATE holds
+    # the write lock, so this read-modify-write cannot interleave with another vote's
+    stats = (
+        db.query(ArticleRatingStats)
+        .filter(ArticleRatingStats.article_id == article_id)
+        .with_for_update()
+        .first()
+    )
+    if stats is None:
+        return  # not built yet; the build will read this rating from the table
+    state = _State(stats, datetime.utcnow())
+    for change in changes:
+        state.apply(*change)
+    state.save()
+
+
+def add_rating(db: Session, rating: Rating, user: User):
+    """Count a new rating in its article's rolling state"""
+    if rating.created_at is None:
+        rating.created_at = datetime.utcnow()  # stamped now so its bucket matches the stored time
+    _update(db, rating.article_id, [
+        (rating.credibility_rating, rating.created_at, rating.ip_address, user.created_at, 1),
+    ])
+
+
+def remove_rating(db: Session, rating: Rating, user: User):
+    """Take a rating out of its article's rolling state, before deleting it"""
+    _update(db, rating.article_id, [
+        (rating.credibility_rating, rating.created_at, rating.ip_address, user.created_at, -1),
+    ])
+
+
+def change_rating(db: Session, rating: Rating, user: User, old_value: float, old_ip: Optional[str]):
+    """Re-count a rating whose value (and IP) changed from old_value / old_ip"""
+    _update(db, rating.article_id, [
+        (old_value, rating.created_at, old_ip, user.created_at, -1),
+        (rating.credibility_rating, rating.created_at, rating.ip_address, user.created_at, 1),
+    ])
+
+
+def build(db: Session, article_ids: Iterable[int]) -> Dict[int, ArticleRatingStats]:
+    """
+    Build the rolling state of articles that have none yet; returns the stats
+    row of each article. Rows are claimed with INSERT ... ON CONFLICT DO
+    NOTHING, which on SQLite takes the write lock, and the ratings are read
+    after it: a vote committed earlier (which found no row to update) is in
+    the table, a later one waits and updates the built row, and a row another
+    worker built first is returned as it is. Does not commit.
+    """
+    article_ids = sorted(set(article_ids))
+    claimed = set()
+    for chunk in chunked(article_ids, LOOKUP_CHUNK):
+        claimed.update(db.scalars(
+            insert(ArticleRatingStats)
+            .values([{"article_id": article_id} for article_id in chunk])
+            .on_conflict_do_nothing(index_elements=["article_id"])
+            .returning(ArticleRatingStats.article_id)
+        ))
+
+    rows = {}
+    ratings = {article_id: [] for article_id in claimed}
+    for chunk in chunked(article_ids, LOOKUP_CHUNK):
+        rows.update((stats.article_id, stats) for stats in
+                    db.query(ArticleRatingStats).filter(ArticleRatingStats.article_id.in_(chunk)))
+        built = [article_id for article_id in chunk if article_id in claimed]
+        if built:
+            for rating in db.query(Rating).options(joinedload(Rating.user)).filter(Rating.article_id.in_(built)):
+                ratings[rating.article_id].append(rating)
+    for article_id in claimed:
+        _fill(rows[article_id], ratings[article_id])
+    return rows
+
+
+def _fill(stats: ArticleRatingStats, ratings):
+    """Set a stats row from the article's ratings (with users loaded)"""
+    stats.rating_count, stats.rating_mean, stats.rating_m2 = 0, 0.0, 0.0
+    stats.extreme_count = 0
+    stats.ip_decrements = 0
+    stats.recent_buckets = stats.new_account_buckets = stats.ip_counters = "{}"
+    state = _State(stats, datetime.utcnow())
+    for rating in ratings:
+        account_created_at = rating.user.created_at if rating.user else None
+        state.apply(rating.credibility_rating, rating.created_at, rating.ip_address, account_created_at, 1)
+    state.save()
+
+
+def is_suspicious(db: Session, stats: ArticleRatingStats) -> bool:
+    """
+    Detect suspicious activity patterns:
+    - Sudden voting spikes
+    - New account mass voting
+    - Coordinated rating patterns
+    - Extreme score divergence
+    - IP clustering (brigading)
+    """
+    count = stats.rating_count or 0
+    if count < 3:
+        return False
+    now_minute = _minute(datetime.utcnow())
+
+    # 1. 70% of ratings in the last hour
+    recent = _in_window(stats.recent_buckets, now_minute - SPIKE_WINDOW_MINUTES)
+    if recent >= 5 and recent > count * 0.7:
+        return True
+
+    # 2. Over half the ratings from accounts less than a day old
+    new_accounts = _in_window(stats.new_account_buckets, now_minute - NEW_ACCOUNT_WINDOW_MINUTES)
+    if new_accounts > count * 0.5 and count >= 5:
+        return True
+
+    # 3. Very low variance = coordinated voting
+    if count >= 5 and (stats.rating_m2 or 0.0) / count < 50:
+        return True
+
+    # 4. More than 80% of ratings are extreme
+    if count >= 10 and (stats.extreme_count or 0) / count > 0.8:
+        return True
+
+    # 5. Any single IP accounts for > 40% of votes
+    if count >= 5 and _ip_heavy_hitter(db, stats, max(count * 0.4, 2)):
+        return True
+
+    return False
+
+
+def _ip_heavy_hitter(db: Session, stats: ArticleRatingStats, threshold: float) -> bool:
+    """
+    Whether some IP cast more than threshold votes. Counters never overcount
+    and undercount by at most ip_decrements, so only IPs within that slack of
+    the threshold need an exact count from the ratings table.
+    """
+    counters = json.loads(stats.ip_counters or "{}")
+    if any(n > threshold for n in counters.values()):
+        return True
+    slack = stats.ip_decrements or 0
+    if not slack:
+        return False
+
+    query = (
+        select(func.count())
+        .where(Rating.article_id == stats.article_id, Rating.ip_address.isnot(None))
+        .group_by(Rating.ip_address)
+    )
+    if slack <= threshold:
+        # An untracked IP has at most `slack` votes; check the near misses only
+        candidates = [ip for ip, n in counters.items() if n + slack > threshold]
+        if not candidates:
+            return False
+        query = query.where(Rating.ip_address.in_(candidates))
+    return any(n > threshold for n in db.scalars(query))
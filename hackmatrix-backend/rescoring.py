@@ -0,0 +1,260 @@
+"""
+Debounced article rescoring.
+Votes no longer rescore the article on the request thread: rate_article
+commits the rating, marks the article dirty here and returns. One asyncio
+task waits RESCORE_DEBOUNCE_SECONDS after an article is first marked, then
+rescores everything marked in that window with a single
+update_scores_batch call, so a burst of votes on a trending article costs
+one recompute, one audit row and one commit instead of one per vote.
+
+The queue itself lives in memory; Article.rescore_pending is the durable
+copy. Each vote increments it in its own transaction and scoring resets
+it, so articles still flagged after a crash or restart are re-queued by
+recover(), in one process only. A batch that fails is retried one article at a time; articles
+that keep failing are retried with exponential backoff, then parked until
+the next restart (they stay flagged).
+
+A full-corpus rescore goes through the same queue (POST
+/api/admin/articles/rescore), or runs offline from the command line:
+
+    python rescoring.py [--chunk-size 200]
+"""
+import argparse
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+from credibility_engine import CredibilityScoreManager
+from database import SessionLocal
+from models import Article
+from source_registry import LOOKUP_CHUNK, chunked
+
+try:
+    import fcntl
+except ImportError:  # Windows: the dev server runs a single process
+    fcntl = None
+
+RESCORE_DEBOUNCE_SECONDS = float(os.getenv("RESCORE_DEBOUNCE_SECONDS", "2"))
+RESCORE_BATCH_SIZE = int(os.getenv("RESCORE_BATCH_SIZE", "200"))
+RESCORE_MAX_ATTEMPTS = int(os.getenv("RESCORE_MAX_ATTEMPTS", "5"))
+
+
+_recovery_lock = None
+
+
+def _recovery_leader() -> bool:
+    """
+    Whether this process recovers flagged articles. gunicorn workers share
+    the database; the first to take an exclusive lock on a file next to it
+    recovers, and holds the lock for as long as it lives.
+    """
+    global _recovery_lock
+    if _recovery_lock is not None:
+        return True
+    bind = SessionLocal.kw.get("bind")
+    path = bind.url.database if bind is not None else None
+    if fcntl is None or not path or path == ":memory:":
+        return True
+    lock = open(f"{path}.rescore-recovery.lock", "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return False
+    _recovery_lock = lock
+    return True
+
+
+def rescore_articles(article_ids: List[int]) -> int:
+    """Rescore the given articles in one session and one commit; returns how many exist"""
+    db = SessionLocal()
+    try:
+        articles = []
+        for chunk in chunked(article_ids, LOOKUP_CHUNK):
+            articles.extend(db.query(Article).filter(Article.id.in_(chunk)).all())
+        if articles:
+            CredibilityScoreManager(db).update_scores_batch(articles)
+        return len(articles)
+    finally:
+        db.close()
+
+
+class RescoreQueue:
+    """
+    Set of dirty article ids drained by one asyncio task. mark() is safe to
+    call from FastAPI's sync endpoint threads; marking an article that is
+    already waiting is free. Articles still dirty at shutdown are rescored
+    by stop().
+    """
+
+    def __init__(self, debounce: float = RESCORE_DEBOUNCE_SECONDS, batch_size: int = RESCORE_BATCH_SIZE):
+        self.debounce = debounce
+        self.batch_size = batch_size
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        # article id -> loop time it was first marked; insertion order is age order
+        self._dirty: Dict[int, float] = {}
+        # article id -> consecutive failed rescores
+        self._failures: Dict[int, int] = {}
+        self.marked = 0
+        self.coalesced = 0
+        self.rescored = 0
+        self.batches = 0
+        self.failed = 0
+        self.parked = 0
+
+    def start(self):
+        """Spawn the rescoring task on the running loop (call from the app startup hook)"""
+        if self._task:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._dirty:
+            await self._rescore(list(self._dirty))
+            self._dirty.clear()
+        self._loop = None
+
+    def recover(self) -> int:
+        """
+        Re-queue every article still flagged for rescoring (e.g. after a
+        restart). Only one process does this; elsewhere it returns 0.
+        """
+        if not _recovery_leader():
+            return 0
+        db = SessionLocal()
+        try:
+            article_ids = [article_id for article_id, in
+                           db.query(Article.id).filter(Article.rescore_pending > 0).order_by(Article.id)]
+        finally:
+            db.close()
+        for article_id in article_ids:
+            self._mark(article_id)
+        return len(article_ids)
+
+    def mark(self, article_id: int) -> bool:
+        """Schedule a rescore of the article; False if the queue is not running"""
+        if self._loop is None or self._loop.is_closed():
+            return False
+        self._loop.call_soon_threadsafe(self._mark, article_id)
+        return True
+
+    def mark_many(self, article_ids: List[int]) -> bool:
+        """mark() for many articles in one hop onto the loop; False if the queue is not running"""
+        if self._loop is None or self._loop.is_closed():
+            return False
+        self._loop.call_soon_threadsafe(self._mark_many, list(article_ids))
+        return True
+
+    def _mark_many(self, article_ids: List[int]):
+        for article_id in article_ids:
+            self._mark(article_id)
+
+    def _mark(self, article_id: int):
+        self.marked += 1
+        if article_id in self._dirty:
+            self.coalesced += 1
+            return
+        self._dirty[article_id] = self._loop.time()
+        self._wakeup.set()
+
+    def _take_due(self) -> List[int]:
+        """Pop up to batch_size articles whose window has passed, oldest first"""
+        cutoff = self._loop.time() - self.debounce
+        due = []
+        for article_id, marked_at in self._dirty.items():
+            if marked_at > cutoff or len(due) >= self.batch_size:
+                break
+            due.append(article_id)
+        for article_id in due:
+            del self._dirty[article_id]
+        return due
+
+    async def _rescore(self, article_ids: List[int]):
+        try:
+            self.rescored += await asyncio.to_thread(rescore_articles, article_ids)
+            self.batches += 1
+            for article_id in article_ids:
+                self._failures.pop(article_id, None)
+            return
+        except Exception as e:
+            if len(article_ids) == 1:
+                self._failed(article_ids[0], e)
+                return
+            print(f"Rescoring {len(article_ids)} articles failed, retrying one by one: {e}")
+
+        # Isolate the articles that break the batch; the rest are scored now
+        for article_id in article_ids:
+            try:
+                self.rescored += await asyncio.to_thread(rescore_articles, [article_id])
+                self._failures.pop(article_id, None)
+            except Exception as e:
+                self._failed(article_id, e)
+
+    def _failed(self, article_id: int, error: Exception):
+        """Retry a failed article after an exponential backoff, or park it (it stays flagged)"""
+        self.failed += 1
+        attempts = self._failures.get(article_id, 0) + 1
+        self._failures[article_id] = attempts
+        if attempts >= RESCORE_MAX_ATTEMPTS:
+            self.parked += 1
+            print(f"Rescoring article {article_id} failed {attempts} times, parked until restart: {error}")
+            return
+        delay = self.debounce * 2 ** attempts
+        print(f"Rescoring article {article_id} failed, retrying in {delay:.1f}s: {error}")
+        self._loop.call_later(delay, self._retry, article_id)
+
+    def _retry(self, article_id: int):
+        if self._task is not None:
+            self._mark(article_id)
+
+    async def _run(self):
+        while True:
+            if not self._dirty:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            oldest = next(iter(self._dirty.values()))
+            delay = oldest + self.debounce - self._loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            due = self._take_due()
+            if due:
+                # Votes arriving meanwhile mark the article again for the next window
+                await self._rescore(due)
+
+    def stats(self) -> Dict:
+        return {
+            "running": self._task is not None,
+            "debounce_seconds": self.debounce,
+            "dirty": len(self._dirty),
+            "marked": self.marked,
+            "coalesced": self.coalesced,
+            "rescored": self.rescored,
+            "batches": self.batches,
+            "failed": self.failed,
+            "parked": self.parked,
+        }
+
+
+rescore_queue = RescoreQueue()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rescore every article")
+    parser.add_argument("--chunk-size", type=int, default=RESCORE_BATCH_SIZE, help="articles per batch")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        count = CredibilityScoreManager(db).rescore_all(max(1, args.chunk_size))
+    finally:
+        db.close()
+    print(f"✅ Rescored {count} articles")
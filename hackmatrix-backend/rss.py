@@ -1,10 +1,60 @@
-from fastapi import APIRouter
-from rss_service import get_all_feeds
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from rss_service import feed_poller
+from typing import List, Dict, Any, Optional
+import json
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 100
+
+STREAM_MEDIA_TYPES = {
+    "sse": "text/event-stream",
+    "ndjson": "application/x-ndjson",
+}
+
 @router.get("/feed", response_model=List[Dict[str, Any]])
 async def get_live_feed():
-    """Get aggregated live news feed from RSS"""
-    return await get_all_feeds()
+    """Get aggregated live news feed from RSS (served from the poller snapshot)"""
+    return await feed_poller.get_items()
+
+@router.get("/feed/page")
+async def get_live_feed_page(limit: int = 20, cursor: Optional[str] = None):
+    """
+    Cursor-paginated live feed. Pass the returned next_cursor to get the
+    following page; it is null on the last page.
+    """
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    try:
+        return await feed_poller.get_page(limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/stream")
+async def stream_live_feed(request: Request, format: str = "sse"):
+    """
+    Stream the live feed item by item (Server-Sent Events or NDJSON).
+    Items are sent as each feed arrives, then new items as the poller finds them.
+    """
+    if format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be 'sse' or 'ndjson'")
+
+    async def events():
+        async for item in feed_poller.stream():
+            if await request.is_disconnected():
+                break
+            if item is None:
+                # Idle heartbeat keeps proxies from closing the connection
+                if format == "sse":
+                    yield ": keepalive\n\n"
+                continue
+            payload = json.dumps(jsonable_encoder(item))
+            yield f"data: {payload}\n\n" if format == "sse" else payload + "\n"
+
+    return StreamingResponse(
+        events(),
+        media_type=STREAM_MEDIA_TYPES[format],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
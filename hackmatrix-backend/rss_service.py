@@ -1,8 +1,18 @@
 import feedparser
 import asyncio
-from typing import List, Dict
+from typing import List, Dict, Optional, Set, Tuple, Iterator, AsyncIterator
 from datetime import datetime
 import time
+import calendar
+import os
+import base64
+import heapq
+import itertools
+import json
+import xml.etree.ElementTree as ET
+
+import outbound
+from feed_parser import IncrementalFeedParser
 
 # Trusted Sources
 FEEDS = [
@@ -12,64 +22,423 @@ FEEDS = [
     {"name": "The Economic Times", "url": "https://economictimes.indiatimes.com/rssfeedsdefault.cms", "category": "Business"},
 ]
 
+# Default per-feed poll interval; each feed then adapts between MIN and MAX
+POLL_INTERVAL_SECONDS = int(os.getenv("RSS_POLL_INTERVAL", "300"))
+MIN_POLL_INTERVAL = 60
+MAX_POLL_INTERVAL = 3600
+MAX_BACKOFF_SECONDS = 6 * 3600
+# How often the scheduler checks for due feeds
+SCHEDULER_TICK_SECONDS = 5
+MAX_ITEMS_PER_FEED = 10
+STREAM_HEARTBEAT_SECONDS = 15
+SUBSCRIBER_QUEUE_SIZE = 1000
+
 def parse_date(entry):
     if hasattr(entry, 'published_parsed'):
         try:
-            return datetime.fromtimestamp(time.mktime(entry.published_parsed))
+            # published_parsed is a UTC struct_time; keep it naive UTC like feed_parser
+            return datetime.utcfromtimestamp(calendar.timegm(entry.published_parsed))
         except:
             pass
     return datetime.utcnow()
 
+def normalize_entries(feed, feed_info: Dict) -> List[Dict]:
+    """Turn parsed feed entries into the item dicts served by /api/rss/feed"""
+    items = []
+    for entry in feed.entries[:MAX_ITEMS_PER_FEED]: # Limit to top 10 per feed
+        # Normalize fields
+        image_url = None
+        # Try to find image in media_content or links
+        if 'media_content' in entry:
+             image_url = entry.media_content[0]['url']
+        elif 'links' in entry:
+            for link in entry.links:
+                if link.get('type', '').startswith('image/'):
+                    image_url = link['href']
+                    break
+        
+        summary = getattr(entry, 'summary', '')
+        # Basic cleanup if summary contains HTML (simple tag stripping if needed, but keeping raw is often okay for now)
+        
+        items.append({
+            "title": entry.title,
+            "link": entry.link,
+            "summary": summary,
+            "published_at": parse_date(entry),
+            "source": feed_info["name"],
+            "category": feed_info["category"],
+            "image_url": image_url
+        })
+    return items
+
 async def fetch_feed(feed_info: Dict) -> List[Dict]:
     """Fetch and parse a single feed asynchronously"""
-    # feedparser is blocking, so run in executor
-    loop = asyncio.get_event_loop()
-    
-    def fetch():
-        return feedparser.parse(feed_info["url"])
+    result = await fetch_feed_conditional(feed_info)
+    return result["items"] or []
+
+async def fetch_feed_conditional(feed_info: Dict, etag: Optional[str] = None, modified: Optional[str] = None) -> Dict:
+    """
+    Fetch a feed with If-None-Match / If-Modified-Since validators.
+    Returns: { "items": list or None (None = not modified / failed), "status", "etag", "modified" }
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
         
     try:
-        feed = await loop.run_in_executor(None, fetch)
-        
-        items = []
-        for entry in feed.entries[:10]: # Limit to top 10 per feed
-            # Normalize fields
-            image_url = None
-            # Try to find image in media_content or links
-            if 'media_content' in entry:
-                 image_url = entry.media_content[0]['url']
-            elif 'links' in entry:
-                for link in entry.links:
-                    if link.get('type', '').startswith('image/'):
-                        image_url = link['href']
-                        break
-            
-            summary = getattr(entry, 'summary', '')
-            # Basic cleanup if summary contains HTML (simple tag stripping if needed, but keeping raw is often okay for now)
-            
-            items.append({
-                "title": entry.title,
-                "link": entry.link,
-                "summary": summary,
-                "published_at": parse_date(entry),
-                "source": feed_info["name"],
-                "category": feed_info["category"],
-                "image_url": image_url
-            })
-        return items
+        async with outbound.stream(feed_info["url"], headers=headers) as response:
+            result = {
+                "items": None,
+                "status": response.status_code,
+                "etag": response.headers.get("etag") or etag,
+                "modified": response.headers.get("last-modified") or modified,
+            }
+            if response.status_code == 304:
+                return result
+            response.raise_for_status()
+            result["items"] = await parse_feed_stream(response, feed_info)
+        return result
     except Exception as e:
         print(f"Error fetching {feed_info['name']}: {e}")
-        return []
+        return {"items": None, "status": None, "etag": etag, "modified": modified, "error": str(e) or type(e).__name__}
+
+async def parse_feed_stream(response, feed_info: Dict) -> List[Dict]:
+    """
+    Parse the body incrementally as it downloads and stop reading once
+    MAX_ITEMS_PER_FEED items are out. Falls back to feedparser for documents
+    that are not well-formed XML.
+    """
+    parser = IncrementalFeedParser(feed_info, MAX_ITEMS_PER_FEED)
+    chunks = response.aiter_bytes()
+    received = []
+    items = []
+    try:
+        async for chunk in chunks:
+            received.append(chunk)
+            items.extend(parser.feed(chunk))
+            if parser.done:
+                # The rest of the document is never downloaded or parsed
+                return items
+        items.extend(parser.close())
+        return items
+    except ET.ParseError:
+        async for chunk in chunks:
+            received.append(chunk)
+        feed = feedparser.parse(b"".join(received), response_headers=dict(response.headers))
+        return normalize_entries(feed, feed_info)
+
+def item_key(item: Dict) -> Tuple[datetime, str]:
+    """Feed ordering: newest first, link as a stable tiebreak"""
+    return (item['published_at'], item['link'])
+
+def sort_run(items: List[Dict]) -> List[Dict]:
+    """Sort one feed's items newest first (feeds are nearly sorted already, so this is ~linear)"""
+    return sorted(items, key=item_key, reverse=True)
+
+def merge_runs(runs: List[List[Dict]]) -> Iterator[Dict]:
+    """Lazily k-way merge per-feed sorted runs with a heap"""
+    return heapq.merge(*runs, key=item_key, reverse=True)
 
-async def get_all_feeds() -> List[Dict]:
-    """Fetch all feeds and combine them"""
-    tasks = [fetch_feed(feed) for feed in FEEDS]
+def encode_cursor(item: Dict) -> str:
+    raw = json.dumps([item['published_at'].isoformat(), item['link']])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Raises ValueError for malformed cursors"""
+    try:
+        published_at, link = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (datetime.fromisoformat(published_at), link)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+def _first_after(run: List[Dict], cursor_key: Tuple[datetime, str]) -> int:
+    """Index of the first item strictly older than the cursor in a newest-first run"""
+    lo, hi = 0, len(run)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if item_key(run[mid]) < cursor_key:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+def paginate_runs(runs: List[List[Dict]], limit: int, cursor: Optional[str] = None) -> Dict:
+    """
+    One page of the merged feed. Each run is bisected past the cursor and
+    only `limit` items are pulled from the heap, so the cost is
+    O(k log n + limit log k) rather than sorting everything.
+    """
+    if cursor:
+        cursor_key = decode_cursor(cursor)
+        runs = [run[_first_after(run, cursor_key):] for run in runs]
+    page = list(itertools.islice(merge_runs(runs), limit + 1))
+    has_more = len(page) > limit
+    page = page[:limit]
+    return {
+        "items": page,
+        "next_cursor": encode_cursor(page[-1]) if has_more and page else None,
+    }
+
+async def get_all_feeds(feeds: Optional[List[Dict]] = None) -> List[Dict]:
+    """Fetch all feeds (default: FEEDS) and combine them"""
+    tasks = [fetch_feed(feed) for feed in (feeds or FEEDS)]
     results = await asyncio.gather(*tasks)
     
-    # Flatten list
-    all_items = [item for sublist in results for item in sublist]
-    
-    # Sort by date (newest first)
-    all_items.sort(key=lambda x: x['published_at'], reverse=True)
-    
-    return all_items
+    # Merge the per-feed sorted runs (newest first)
+    return list(merge_runs([sort_run(items) for items in results]))
+
+
+class FeedState:
+    """Validators, parsed items, schedule and health counters for one feed"""
+
+    def __init__(self, feed_info: Dict):
+        self.feed_info = feed_info
+        self.feed_id: Optional[int] = feed_info.get("id")
+        self.etag: Optional[str] = feed_info.get("etag")
+        self.modified: Optional[str] = feed_info.get("last_modified")
+        self.items: List[Dict] = []
+        self.last_status: Optional[int] = None
+        self.fetched_at: Optional[float] = None
+
+        # Scheduling
+        self.poll_interval: float = feed_info.get("poll_interval") or POLL_INTERVAL_SECONDS
+        self.consecutive_failures: int = feed_info.get("consecutive_failures") or 0
+        self.next_poll_at: float = 0.0  # due immediately on process start
+
+        # Health
+        self.fetch_count = 0
+        self.error_count = 0
+        self.not_modified_count = 0
+        self.change_count = 0
+        self.last_latency_ms: Optional[float] = None
+        self.total_latency_ms = 0.0
+        self.last_error: Optional[str] = None
+        self.last_changed_at: Optional[float] = None
+
+    def schedule_success(self, changed: bool, now: float):
+        """Poll feeds that change more often, back off feeds that don't"""
+        self.consecutive_failures = 0
+        self.last_error = None
+        if changed:
+            self.poll_interval = max(MIN_POLL_INTERVAL, self.poll_interval / 2)
+        else:
+            self.poll_interval = min(MAX_POLL_INTERVAL, self.poll_interval * 1.5)
+        self.next_poll_at = now + self.poll_interval
+
+    def schedule_failure(self, error: Optional[str], now: float):
+        """Exponential backoff so a dead feed stops costing a timeout every cycle"""
+        self.consecutive_failures += 1
+        self.error_count += 1
+        self.last_error = (error or "fetch failed")[:255]
+        backoff = self.poll_interval * (2 ** self.consecutive_failures)
+        self.next_poll_at = now + min(MAX_BACKOFF_SECONDS, backoff)
+
+
+class FeedPoller:
+    """
+    Background poller that keeps an in-memory snapshot of all feeds.
+    Each feed has its own schedule (adaptive interval, exponential backoff on
+    failure); fetches are conditional (ETag / Last-Modified), and the
+    endpoint is served from the snapshot with stale-while-revalidate.
+    `on_polled` (async, optional) receives the polled states after each pass,
+    e.g. to persist health stats.
+    """
+
+    def __init__(self, feeds: List[Dict], tick: float = SCHEDULER_TICK_SECONDS, on_polled=None):
+        self.tick = tick
+        self.on_polled = on_polled
+        self.states: Dict[str, FeedState] = {}
+        self.set_feeds(feeds)
+        self._snapshot: List[Dict] = []
+        self._refreshed_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    def set_feeds(self, feeds: List[Dict]):
+        """Replace the feed list, keeping state for feeds we already track"""
+        states = {}
+        for feed in feeds:
+            state = self.states.get(feed["url"])
+            if state is None:
+                state = FeedState(feed)
+            else:
+                state.feed_info = feed
+                state.feed_id = feed.get("id", state.feed_id)
+            states[feed["url"]] = state
+        self.states = states
+
+    async def refresh_feed(self, state: FeedState) -> bool:
+        """Conditionally refetch one feed. Returns True if its items changed."""
+        # Validators are only useful if we still hold the items they refer to
+        etag, modified = (state.etag, state.modified) if state.items else (None, None)
+        started = time.perf_counter()
+        result = await fetch_feed_conditional(state.feed_info, etag, modified)
+        now = time.time()
+
+        state.last_latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        state.total_latency_ms += state.last_latency_ms
+        state.fetch_count += 1
+        state.last_status = result["status"]
+        state.etag = result["etag"]
+        state.modified = result["modified"]
+        state.fetched_at = now
+
+        if result["status"] == 304:
+            state.not_modified_count += 1
+            state.schedule_success(False, now)
+            return False
+        if result["items"] is None:
+            # Fetch error: keep serving what we have and back off
+            state.schedule_failure(result.get("error"), now)
+            return False
+
+        known = {item["link"] for item in state.items}
+        state.items = sort_run(result["items"])
+        new_items = [item for item in state.items if item["link"] not in known]
+        if new_items:
+            state.change_count += 1
+            state.last_changed_at = now
+        state.schedule_success(bool(new_items), now)
+        self._publish(new_items)
+        return bool(new_items)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue that receives every newly discovered item"""
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def _publish(self, items: List[Dict]):
+        for queue in self._subscribers:
+            for item in items:
+                try:
+                    queue.put_nowait(item)
+                except asyncio.QueueFull:
+                    # Slow consumer: drop rather than hold up the poller
+                    break
+
+    async def stream(self, heartbeat: float = STREAM_HEARTBEAT_SECONDS) -> AsyncIterator[Optional[Dict]]:
+        """
+        Yield items as soon as each feed has them, then keep yielding new items
+        as the poller discovers them. Feeds already in the snapshot are emitted
+        immediately; cold feeds are fetched concurrently and emitted in
+        completion order, so one slow publisher never delays the others.
+        Yields None after `heartbeat` idle seconds so callers can keep the
+        connection alive.
+        """
+        queue = self.subscribe()
+        sent = set()
+        try:
+            cold = []
+            for state in self.states.values():
+                if state.fetched_at is None:
+                    cold.append(state)
+                    continue
+                for item in state.items:
+                    sent.add(item["link"])
+                    yield item
+
+            async def load(state: FeedState) -> FeedState:
+                await self.refresh_feed(state)
+                return state
+
+            for next_done in asyncio.as_completed([load(s) for s in cold]):
+                state = await next_done
+                for item in state.items:
+                    if item["link"] not in sent:
+                        sent.add(item["link"])
+                        yield item
+
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if item["link"] not in sent:
+                    sent.add(item["link"])
+                    yield item
+        finally:
+            self.unsubscribe(queue)
+
+    async def poll_due(self, force: bool = False):
+        """Refresh the feeds whose schedule is due and rebuild the snapshot if anything changed"""
+        now = time.time()
+        due = [s for s in self.states.values() if force or s.next_poll_at <= now]
+        changed = await asyncio.gather(*(self.refresh_feed(s) for s in due))
+        if any(changed) or self._refreshed_at is None:
+            self._snapshot = list(merge_runs(self.runs()))
+        self._refreshed_at = time.time()
+        if due and self.on_polled is not None:
+            try:
+                await self.on_polled(due)
+            except Exception as e:
+                print(f"RSS poller on_polled hook failed: {e}")
+
+    async def refresh_all(self):
+        """Refresh every feed regardless of schedule"""
+        await self.poll_due(force=True)
+
+    def _revalidate(self) -> asyncio.Task:
+        """Start a poll of due feeds unless one is already in flight"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.poll_due())
+        return self._refresh_task
+
+    def runs(self) -> List[List[Dict]]:
+        """Per-feed sorted item lists"""
+        return [s.items for s in self.states.values() if s.items]
+
+    def is_stale(self) -> bool:
+        now = time.time()
+        return self._refreshed_at is None or any(s.next_poll_at <= now for s in self.states.values())
+
+    async def get_items(self) -> List[Dict]:
+        """Serve the current snapshot; only the very first call waits on upstream"""
+        if self._refreshed_at is None:
+            # Shielded: a client disconnecting must not cancel the shared refresh
+            await asyncio.shield(self._revalidate())
+        elif self.is_stale():
+            self._revalidate()
+        return self._snapshot
+
+    async def get_page(self, limit: int, cursor: Optional[str] = None) -> Dict:
+        """Cursor-paginated view of the snapshot, merged lazily from the per-feed runs"""
+        if self._refreshed_at is None:
+            await asyncio.shield(self._revalidate())
+        elif self.is_stale():
+            self._revalidate()
+        return paginate_runs(self.runs(), limit, cursor)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.shield(self._revalidate())
+            except asyncio.CancelledError:
+                if self._loop_task is not asyncio.current_task():
+                    raise  # stop() cancelled the poller itself
+                print("RSS poller refresh was cancelled; retrying next tick")
+            except Exception as e:
+                print(f"RSS poller refresh failed: {e}")
+            await asyncio.sleep(self.tick)
+
+    def start(self):
+        """Begin polling in the background (call from the app startup hook)"""
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        for task in (self._loop_task, self._refresh_task):
+            if task and not task.done():
+                task.cancel()
+        self._loop_task = None
+        self._refresh_task = None
+
+
+feed_poller = FeedPoller(FEEDS)
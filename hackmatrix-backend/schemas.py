@@ -57,6 +57,19 @@ class ArticleCreate(BaseModel):
     source_name: str
     published_date: Optional[datetime] = None
 
+class ArticleBatchCreate(BaseModel):
+    articles: List[ArticleCreate]
+
+class ArticleBatchResult(BaseModel):
+    index: int
+    url: str
+    status: str  # created, existing, duplicate (repeated in this batch), error
+    article_id: Optional[int] = None
+    overall_credibility: Optional[float] = None
+    credibility_status: Optional[str] = None
+    extraction_status: Optional[str] = None
+    error: Optional[str] = None
+
 class ArticleUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
@@ -88,6 +101,8 @@ class ArticleResponse(BaseModel):
     is_soft_locked: bool
     soft_lock_reason: Optional[str]
     
+    extraction_status: Optional[str] = "complete"
+    
     created_at: datetime
     updated_at: datetime
     
@@ -0,0 +1,41 @@
+"""
+Bulk Source lookups shared by the web routes, the feed registry and the
+ingestion worker, so importing them does not pull in the RSS stack; also
+home of the chunking every IN (...) lookup in the backend goes through.
+"""
+from typing import Dict, Iterable, List
+
+from sqlalchemy.orm import Session
+
+from models import Source
+
+# Stay well under SQLite's bound-parameter limit for IN (...) lookups
+LOOKUP_CHUNK = 500
+
+
+def source_domain(source_name: str) -> str:
+    """Placeholder domain for auto-created sources"""
+    return source_name.replace(" ", "").lower() + ".com"
+
+
+def chunked(values: List, size: int) -> Iterable[List]:
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def resolve_sources(db: Session, names: Iterable[str]) -> Dict[str, Source]:
+    """Get or create every named Source with one lookup and one flush"""
+    names = sorted(set(names))
+    sources = {}
+    for chunk in chunked(names, LOOKUP_CHUNK):
+        sources.update({s.name: s for s in db.query(Source).filter(Source.name.in_(chunk))})
+
+    missing = [
+        Source(name=name, domain=source_domain(name), url=name, credibility_score=50.0)
+        for name in names if name not in sources
+    ]
+    if missing:
+        db.add_all(missing)
+        db.flush()
+        sources.update({s.name: s for s in missing})
+    return sources
@@ -0,0 +1,197 @@
+"""
+Near-duplicate story clustering.
+Each article gets a 64-bit SimHash of its title + text. Signatures are split
+into LSH bands so a new article only compares against articles sharing a
+band (sub-linear), and anything within MAX_HAMMING_DISTANCE bits joins that
+article's story cluster. The same wire story from BBC, The Hindu, etc. then
+shares one cluster id (the id of the first copy we saw).
+"""
+import hashlib
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from models import Article
+from source_registry import LOOKUP_CHUNK, chunked
+
+SIGNATURE_BITS = 64
+NUM_BANDS = 4  # 4 x 16-bit bands: any pair within 3 bits shares at least one band
+BAND_BITS = SIGNATURE_BITS // NUM_BANDS
+MAX_HAMMING_DISTANCE = 3
+SHINGLE_SIZE = 3
+
+_WORD_RE = re.compile(r"\w+")
+_MASK = (1 << SIGNATURE_BITS) - 1
+
+
+def _to_signed(value: int) -> int:
+    return value - (1 << SIGNATURE_BITS) if value >= 1 << (SIGNATURE_BITS - 1) else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value & _MASK
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str) -> int:
+    """Signed 64-bit SimHash over word shingles (stored in Article.simhash)"""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) >= SHINGLE_SIZE:
+        features = Counter(" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+    else:
+        features = Counter(words)
+
+    vector = [0] * SIGNATURE_BITS
+    for feature, weight in features.items():
+        h = _feature_hash(feature)
+        for bit in range(SIGNATURE_BITS):
+            vector[bit] += weight if h >> bit & 1 else -weight
+
+    value = 0
+    for bit, total in enumerate(vector):
+        if total > 0:
+            value |= 1 << bit
+    return _to_signed(value)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(_to_unsigned(a) ^ _to_unsigned(b)).count("1")
+
+
+def _bands(signature: int) -> List[Tuple[int, int]]:
+    value = _to_unsigned(signature)
+    mask = (1 << BAND_BITS) - 1
+    return [(i, value >> (i * BAND_BITS) & mask) for i in range(NUM_BANDS)]
+
+
+def article_text(title: str, content: str) -> str:
+    return f"{title or ''} {content or ''}"
+
+
+class StoryIndex:
+    """In-memory LSH index over article signatures, rebuilt from the articles table"""
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self._signatures: Dict[int, Tuple[int, int]] = {}  # article_id -> (simhash, cluster_id)
+        self.max_article_id = 0
+        self._lock = threading.Lock()
+
+    def add(self, article_id: int, signature: int, cluster_id: int):
+        with self._lock:
+            self._signatures[article_id] = (signature, cluster_id)
+            for band in _bands(signature):
+                self._buckets[band].append(article_id)
+            self.max_article_id = max(self.max_article_id, article_id)
+
+    def find_cluster(self, signature: int) -> Optional[int]:
+        """Cluster id of the closest indexed article within MAX_HAMMING_DISTANCE, if any"""
+        best = None
+        with self._lock:
+            candidates: Set[int] = set()
+            for band in _bands(signature):
+                candidates.update(self._buckets.get(band, ()))
+            for article_id in candidates:
+                other, cluster_id = self._signatures[article_id]
+                distance = hamming_distance(signature, other)
+                if distance <= MAX_HAMMING_DISTANCE and (best is None or distance < best[0]):
+                    best = (distance, cluster_id)
+        return best[1] if best else None
+
+    def rebuild(self, db: Session) -> int:
+        """Reload every signature (computing missing ones for older rows)"""
+        with self._lock:
+            self._buckets.clear()
+            self._signatures.clear()
+            self.max_article_id = 0
+        return self.sync(db)
+
+    def sync(self, db: Session) -> int:
+        """Index articles added by other processes since the last rebuild/sync"""
+        rows = (
+            db.query(Article.id, Article.simhash, Article.story_cluster_id)
+            .filter(Article.id > self.max_article_id)
+            .order_by(Article.id)
+            .all()
+        )
+        missing = []
+        for article_id, signature, cluster_id in rows:
+            if signature is None:
+                missing.append(article_id)
+            else:
+                self.add(article_id, signature, cluster_id or article_id)
+        # Rows written before signatures existed: load their text only now,
+        # a chunk at a time (assign_clusters commits each)
+        for chunk in chunked(missing, LOOKUP_CHUNK):
+            backfill = db.query(Article.id, Article.title, Article.content).filter(Article.id.in_(chunk)).all()
+            assign_clusters(db, backfill, index=self)
+        return len(rows)
+
+
+story_index = StoryIndex()
+
+
+def assign_clusters(db: Session, articles: Iterable[Tuple[int, str, str]], index: StoryIndex = story_index) -> Dict[int, int]:
+    """
+    Compute signatures for freshly inserted (id, title, content) rows, attach
+    each to an existing story cluster or start a new one, and write both
+    columns in one bulk UPDATE. Returns {article_id: cluster_id}.
+    """
+    assigned = {}
+    updates = []
+    for article_id, title, content in articles:
+        signature = simhash(article_text(title, content))
+        cluster_id = index.find_cluster(signature) or article_id
+        index.add(article_id, signature, cluster_id)
+        assigned[article_id] = cluster_id
+        updates.append({"id": article_id, "simhash": signature, "story_cluster_id": cluster_id})
+    if updates:
+        db.execute(update(Article), updates)
+        db.commit()
+    return assigned
+
+
+SHARED_ANALYSIS_FIELDS = ("nlp_score", "fact_opinion_ratio", "hype_sentences", "factual_sentences")
+
+
+def share_representative_scores(db: Session, assigned: Dict[int, int]) -> int:
+    """
+    Copy text-analysis results from each cluster's first article to its new
+    copies, if that article has really been analyzed (analysis_version set);
+    until then its fields are demo placeholders, not shared analysis
+    """
+    members = {article_id: cluster_id for article_id, cluster_id in assigned.items() if article_id != cluster_id}
+    if not members:
+        return 0
+    columns = [getattr(Article, name) for name in SHARED_ANALYSIS_FIELDS]
+    reps = {
+        row.id: row
+        for row in db.query(Article.id, *columns).filter(
+            Article.id.in_(set(members.values())),
+            Article.analysis_version.isnot(None),
+        )
+    }
+    updates = [
+        {"id": article_id, **{name: getattr(reps[cluster_id], name) for name in SHARED_ANALYSIS_FIELDS}}
+        for article_id, cluster_id in members.items() if cluster_id in reps
+    ]
+    if updates:
+        db.execute(update(Article), updates)
+        db.commit()
+    return len(updates)
+
+
+def cluster_source_count(db: Session, cluster_id: Optional[int]) -> int:
+    """Number of distinct sources that carried this story"""
+    if cluster_id is None:
+        return 0
+    return db.query(func.count(func.distinct(Article.source_id))).filter(
+        Article.story_cluster_id == cluster_id
+    ).scalar() or 0
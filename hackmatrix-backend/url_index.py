@@ -0,0 +1,150 @@
+"""
+Seen-URL index.
+A Bloom filter in front of the hashed Article.url_hash column lets the feed
+pipeline and create_article skip links we already ingested without running
+a string-compare query against the unique `url` column.
+
+    not in bloom            -> definitely new, no query at all
+    in bloom                -> confirm with an integer url_hash lookup
+"""
+import hashlib
+import math
+import threading
+from typing import Dict, Iterable, Set
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from models import Article
+from source_registry import LOOKUP_CHUNK, chunked
+
+DEFAULT_CAPACITY = 100_000
+DEFAULT_ERROR_RATE = 0.01
+
+
+def url_hash(url: str) -> int:
+    """Stable signed 64-bit hash of a URL (fits SQLite INTEGER / BigInteger)"""
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over a 128-bit blake2b digest"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.bits)
+
+    def expected_false_positive_rate(self) -> float:
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class SeenUrlIndex:
+    """Process-local membership index over Article.url, rebuilt from the articles table"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE):
+        self.error_rate = error_rate
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.max_article_id = 0
+        self._lock = threading.Lock()
+
+    def rebuild(self, db: Session) -> int:
+        """Load every article URL into a freshly sized filter. Returns the count."""
+        backfill_url_hashes(db)
+        total = db.query(Article).count()
+        bloom = BloomFilter(max(DEFAULT_CAPACITY, total * 2), self.error_rate)
+        max_id = 0
+        for article_id, url in db.query(Article.id, Article.url).yield_per(10_000):
+            bloom.add(url)
+            max_id = max(max_id, article_id)
+        with self._lock:
+            self.bloom = bloom
+            self.max_article_id = max_id
+        return total
+
+    def sync(self, db: Session) -> int:
+        """Add articles inserted by other processes since the last rebuild/sync"""
+        added = 0
+        rows = db.query(Article.id, Article.url).filter(Article.id > self.max_article_id)
+        with self._lock:
+            for article_id, url in rows:
+                self.bloom.add(url)
+                self.max_article_id = max(self.max_article_id, article_id)
+                added += 1
+        return added
+
+    def add(self, url: str):
+        with self._lock:
+            self.bloom.add(url)
+
+    def might_contain(self, url: str) -> bool:
+        return url in self.bloom
+
+    def known_urls(self, db: Session, urls: Iterable[str]) -> Set[str]:
+        """Subset of urls that already exist as articles"""
+        candidates: Dict[int, str] = {}
+        for url in urls:
+            if self.might_contain(url):
+                candidates[url_hash(url)] = url
+        if not candidates:
+            return set()
+
+        found = set()
+        hashes = list(candidates)
+        for chunk in chunked(hashes, LOOKUP_CHUNK):
+            found.update(h for (h,) in db.query(Article.url_hash).filter(Article.url_hash.in_(chunk)))
+        return {candidates[h] for h in found}
+
+    def find_article(self, db: Session, url: str):
+        """Existing Article for url, or None. Skips the query when the filter says new."""
+        if not self.might_contain(url):
+            return None
+        for article in db.query(Article).filter(Article.url_hash == url_hash(url)):
+            if article.url == url:
+                return article
+        return None
+
+    def stats(self) -> Dict:
+        return {
+            "urls": self.bloom.count,
+            "capacity": self.bloom.capacity,
+            "memory_bytes": self.bloom.memory_bytes,
+            "hash_functions": self.bloom.num_hashes,
+            "expected_false_positive_rate": round(self.bloom.expected_false_positive_rate(), 6),
+        }
+
+
+def backfill_url_hashes(db: Session) -> int:
+    """Fill url_hash for rows written before the column existed"""
+    rows = db.query(Article.id, Article.url).filter(Article.url_hash.is_(None)).all()
+    if rows:
+        db.execute(update(Article), [{"id": i, "url_hash": url_hash(u)} for i, u in rows])
+        db.commit()
+    return len(rows)
+
+
+seen_urls = SeenUrlIndex()
@@ -0,0 +1,128 @@
+"""
+User credibility from rating accuracy.
+A rating is accurate when it is within ACCURACY_MARGIN points of the
+article's overall credibility; a user's score maps their accuracy onto
+40-80 once they have MIN_RATINGS ratings. Accuracy comes from one
+aggregate join of ratings against articles, so recompute_all() refreshes
+every user in one pass: new scores are written with bulk UPDATEs, a chunk
+of users per transaction, and users whose credibility tier changed have
+their votes re-weighed in the community aggregates.
+
+    python user_credibility.py [--chunk-size 1000]
+"""
+import argparse
+import os
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+
+import community
+from models import Article, Rating, User
+from source_registry import chunked
+
+MIN_RATINGS = 5
+ACCURACY_MARGIN = 10
+CHUNK_SIZE = int(os.getenv("USER_CREDIBILITY_CHUNK", "1000"))
+
+
+def credibility_from_accuracy(accurate: int, total: int) -> float:
+    accuracy_percentage = (accurate / total) * 100
+    # Map accuracy to credibility score (40-80 range)
+    return 40 + (accuracy_percentage / 100) * 40
+
+
+def _accuracy_query():
+    """(user_id, ratings, accurate ratings) per user"""
+    accurate = case(
+        (func.abs(Rating.credibility_rating - Article.overall_credibility) < ACCURACY_MARGIN, 1),
+        else_=0,
+    )
+    return (
+        select(Rating.user_id, func.count(Rating.id).label("ratings"), func.sum(accurate).label("accurate"))
+        .join(Article, Article.id == Rating.article_id)
+        .group_by(Rating.user_id)
+    )
+
+
+def rating_accuracy(db: Session, user_id: int) -> Tuple[int, int]:
+    """(ratings, accurate ratings) of one user"""
+    row = db.execute(_accuracy_query().where(Rating.user_id == user_id)).first()
+    return (row[1], row[2] or 0) if row else (0, 0)
+
+
+def _print_progress(done: int, total: int):
+    print(f"👥 User credibility: {done}/{total} users")
+
+
+def recompute_all(
+    db: Session,
+    chunk_size: int = CHUNK_SIZE,
+    progress: Optional[Callable[[int, int], None]] = _print_progress,
+) -> Dict:
+    """
+    Recompute every user's credibility score. Users with fewer than
+    MIN_RATINGS ratings keep theirs. Commits once per chunk. Returns counts
+    and the ids of articles whose community aggregates moved (to rescore).
+    """
+    accuracy = _accuracy_query().having(func.count(Rating.id) >= MIN_RATINGS).subquery()
+    rows = db.execute(
+        select(User.id, User.credibility_score, accuracy.c.ratings, accuracy.c.accurate)
+        .join(accuracy, accuracy.c.user_id == User.id)
+        .order_by(User.id)
+    ).all()
+
+    updated = 0
+    tier_changes = 0
+    moved = set()
+    done = 0
+    for chunk in chunked(rows, chunk_size):
+        changes = []
+        reweigh = []
+        for user_id, old_score, total, accurate in chunk:
+            credibility = credibility_from_accuracy(accurate or 0, total)
+            if old_score is not None and abs(old_score - credibility) < 1e-9:
+                continue
+            changes.append({"id": user_id, "credibility_score": credibility})
+            if community.user_impact(credibility) != community.user_impact(old_score):
+                reweigh.append(user_id)
+        if changes:
+            db.execute(update(User), changes)
+        if reweigh:
+            # Tier changed: re-weigh these users' votes in the community aggregates
+            moved.update(community.reweigh_users(db, reweigh))
+        db.commit()
+        updated += len(changes)
+        tier_changes += len(reweigh)
+        done += len(chunk)
+        if progress:
+            progress(done, len(rows))
+
+    return {
+        "users_scored": len(rows),
+        "users_updated": updated,
+        "tier_changes": tier_changes,
+        "articles_moved": sorted(moved),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute every user's credibility score")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="users per transaction")
+    args = parser.parse_args()
+
+    from database import SessionLocal
+    from rescoring import rescore_articles, RESCORE_BATCH_SIZE
+
+    db = SessionLocal()
+    try:
+        result = recompute_all(db, max(1, args.chunk_size))
+    finally:
+        db.close()
+    print(f"✅ {result['users_updated']} of {result['users_scored']} users updated, "
+          f"{result['tier_changes']} changed tier")
+    if result["articles_moved"]:
+        moved = result["articles_moved"]
+        print(f"🔄 Rescoring {len(moved)} articles")
+        for chunk in chunked(moved, RESCORE_BATCH_SIZE):
+            rescore_articles(chunk)